@@ -0,0 +1,92 @@
+from typing import Optional
+
+import orjson
+import structlog
+
+from src.redis_client import get_redis_client, open_redis_client
+from src.settings import config
+
+logger = structlog.get_logger(__name__)
+
+BASELINE_CACHE_KEY_PREFIX = "watcher:anomaly_baseline"
+
+
+def _cache_enabled() -> bool:
+    return bool(config.REDIS_URL) and bool(
+        config.WATCHER_ANOMALY_BASELINE_CACHE_TTL_SECONDS
+    )
+
+
+def _baseline_cache_key(pipeline_id: int, hour_recorded: int) -> str:
+    return f"{BASELINE_CACHE_KEY_PREFIX}:{pipeline_id}:{hour_recorded}"
+
+
+async def cache_baseline_bounds(
+    pipeline_id: int, hour_recorded: int, bounds: dict[str, tuple[float, float]]
+) -> None:
+    """Store the threshold range of every active rule for a pipeline hour"""
+    if not _cache_enabled():
+        return
+
+    client = open_redis_client()
+    try:
+        await client.set(
+            _baseline_cache_key(pipeline_id, hour_recorded),
+            orjson.dumps(bounds),
+            ex=config.WATCHER_ANOMALY_BASELINE_CACHE_TTL_SECONDS,
+        )
+    except Exception as e:
+        logger.warning(
+            f"Error caching anomaly baseline for pipeline {pipeline_id}: {e}"
+        )
+    finally:
+        await client.aclose()
+
+
+async def invalidate_baseline_bounds(pipeline_id: int) -> None:
+    """Drop every cached hour for a pipeline, used when its rules change"""
+    if not _cache_enabled():
+        return
+
+    try:
+        await get_redis_client().delete(
+            *(_baseline_cache_key(pipeline_id, hour) for hour in range(24))
+        )
+    except Exception as e:
+        logger.warning(
+            f"Error invalidating anomaly baseline for pipeline {pipeline_id}: {e}"
+        )
+
+
+async def within_cached_baseline_bounds(
+    pipeline_id: int, hour_recorded: int, metrics: dict[str, Optional[float]]
+) -> bool:
+    """True only when a cached baseline exists and every metric is inside it.
+
+    A missing or expired entry, or any Redis error, returns False so the
+    caller falls back to full anomaly detection.
+    """
+    if not _cache_enabled():
+        return False
+
+    try:
+        cached = await get_redis_client().get(
+            _baseline_cache_key(pipeline_id, hour_recorded)
+        )
+    except Exception as e:
+        logger.warning(
+            f"Error reading anomaly baseline for pipeline {pipeline_id}: {e}"
+        )
+        return False
+
+    if cached is None:
+        return False
+
+    for metric_field, (threshold_min, threshold_max) in orjson.loads(cached).items():
+        value = metrics.get(metric_field)
+        if value is None:
+            continue
+        if not threshold_min <= float(value) <= threshold_max:
+            return False
+
+    return True
@@ -122,3 +122,15 @@ celery.conf.beat_schedule = {
         ),
     },
 }
+
+if config.WATCHER_TIMELINESS_DEADLINE_CHECK_SECONDS:
+    celery.conf.beat_schedule["scheduled-timeliness-deadline-check"] = {
+        "task": "src.celery_tasks.scheduled_timeliness_deadline_check",
+        "schedule": float(config.WATCHER_TIMELINESS_DEADLINE_CHECK_SECONDS),
+    }
+
+if config.WATCHER_FRESHNESS_DEADLINE_CHECK_SECONDS:
+    celery.conf.beat_schedule["scheduled-freshness-deadline-check"] = {
+        "task": "src.celery_tasks.scheduled_freshness_deadline_check",
+        "schedule": float(config.WATCHER_FRESHNESS_DEADLINE_CHECK_SECONDS),
+    }
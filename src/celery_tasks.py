@@ -1,22 +1,59 @@
 # src/celery_tasks.py
+from typing import Optional
+
+import pendulum
 import structlog
 from asgiref.sync import async_to_sync  # So annoying
+from celery import chord
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.celery_app import celery
-from src.database.address_lineage_utils import db_rebuild_closure_table_incremental
+from src.closure_rebuilds import (
+    pop_pending_closure_rebuild,
+    restore_pending_closure_rebuild,
+)
+from src.database.address_lineage_utils import db_maintain_closure_components
 from src.database.anomaly_detection_utils import (
+    db_backfill_anomalies_for_pipelines,
     db_detect_anomalies_for_pipeline_execution,
 )
-from src.database.freshness_utils import db_check_pipeline_freshness
+from src.database.freshness_utils import (
+    FRESHNESS_CHECK_NAME,
+    db_check_pipeline_freshness,
+    db_check_pipeline_freshness_deadlines,
+    db_check_pipeline_freshness_shard,
+    db_complete_pipeline_freshness_shards,
+    db_get_pipeline_freshness_deadlines,
+)
 from src.database.pipeline_execution_utils import (
     db_maintain_pipeline_execution_closure_table,
 )
-from src.database.timeliness_utils import db_check_pipeline_execution_timeliness
+from src.database.timeliness_utils import (
+    TIMELINESS_CHECK_NAME,
+    db_check_pipeline_execution_timeliness,
+    db_check_pipeline_execution_timeliness_deadlines,
+    db_check_pipeline_execution_timeliness_shard,
+    db_complete_pipeline_execution_timeliness_shards,
+)
+from src.freshness_deadlines import (
+    freshness_deadlines_enabled,
+    pop_expired_freshness_deadlines,
+    requeue_pending_freshness_deadlines,
+)
 from src.notifier import AlertLevel, send_slack_message
+from src.running_executions import (
+    reconcile_running_executions,
+    running_executions_mirror_enabled,
+)
 from src.settings import config, get_database_config
+from src.single_flight import (
+    single_flight_enabled,
+    single_flight_lease,
+    start_single_flight,
+)
+from src.timeliness_deadlines import pop_expired_timeliness_deadlines
 
 logger = structlog.get_logger(__name__)
 
@@ -78,15 +115,96 @@ async def _run_async_anomaly_detection(pipeline_id: int, pipeline_execution_id:
         await engine.dispose()
 
 
+@celery.task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+    soft_time_limit=3300,
+    time_limit=3600,
+)
+def anomaly_detection_backfill_task(
+    self, pipeline_ids: list[int], start_date: str, end_date: str
+):
+    """Re-score historical executions for a chunk of pipelines"""
+    try:
+        self.update_state(
+            state="PROGRESS", meta={"status": "Starting anomaly detection backfill..."}
+        )
+
+        result = async_to_sync(_run_async_anomaly_detection_backfill)(
+            pipeline_ids, start_date, end_date
+        )
+
+        self.update_state(
+            state="SUCCESS", meta={"status": "Anomaly detection backfill completed"}
+        )
+        return result
+
+    except Exception as exc:
+        logger.error(f"Anomaly detection backfill failed: {exc}")
+
+        self.update_state(
+            state="FAILURE",
+            meta={
+                "exc_type": type(exc).__name__,
+                "exc_message": str(exc),
+                "retry_count": self.request.retries,
+                "max_retries": self.max_retries,
+            },
+        )
+        raise self.retry(exc=exc)
+
+
+async def _run_async_anomaly_detection_backfill(
+    pipeline_ids: list[int], start_date: str, end_date: str
+):
+    """Async function that creates its own database connection"""
+    db_config = get_database_config()
+    engine = create_async_engine(
+        url=db_config["sqlalchemy.url"],
+        echo=db_config["sqlalchemy.echo"],
+        future=db_config["sqlalchemy.future"],
+        connect_args=db_config.get("sqlalchemy.connect_args", {}),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        celery_sessionmaker = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with celery_sessionmaker() as session:
+            summary = await db_backfill_anomalies_for_pipelines(
+                session,
+                pipeline_ids,
+                pendulum.parse(start_date),
+                pendulum.parse(end_date),
+            )
+        return {
+            "status": "success",
+            "message": "Anomaly detection backfill completed",
+            **summary,
+        }
+    finally:
+        await engine.dispose()
+
+
 @celery.task(bind=True, rate_limit="1/s", max_retries=3, default_retry_delay=60)
-def timeliness_check_task(self, lookback_minutes: int = 60):
+def timeliness_check_task(
+    self, lookback_minutes: int = 60, single_flight_token: Optional[str] = None
+):
     """Rate-limited timeliness check task with retries"""
     try:
         self.update_state(
             state="PROGRESS", meta={"status": "Starting timeliness check..."}
         )
 
-        result = async_to_sync(_run_async_timeliness_check)(lookback_minutes)
+        with single_flight_lease(
+            TIMELINESS_CHECK_NAME,
+            single_flight_token,
+            keep_on_error=self.request.retries < self.max_retries,
+        ):
+            result = async_to_sync(_run_async_timeliness_check)(lookback_minutes)
 
         self.update_state(
             state="SUCCESS", meta={"status": "Timeliness check completed"}
@@ -128,20 +246,84 @@ async def _run_async_timeliness_check(lookback_minutes: int):
             await db_check_pipeline_execution_timeliness(
                 session, None, lookback_minutes
             )
+            if running_executions_mirror_enabled():
+                await reconcile_running_executions(session)
         return {"status": "success", "message": "Timeliness check completed"}
     finally:
         await engine.dispose()
 
 
+@celery.task(bind=True, max_retries=3, default_retry_delay=60)
+def timeliness_deadline_check_task(self, pipeline_execution_ids: list[int]):
+    """Timeliness check for executions whose deadline has passed"""
+    try:
+        self.update_state(
+            state="PROGRESS", meta={"status": "Starting timeliness deadline check..."}
+        )
+
+        result = async_to_sync(_run_async_timeliness_deadline_check)(
+            pipeline_execution_ids
+        )
+
+        self.update_state(
+            state="SUCCESS", meta={"status": "Timeliness deadline check completed"}
+        )
+        return result
+
+    except Exception as exc:
+        logger.error(f"Timeliness deadline check failed: {exc}")
+
+        self.update_state(
+            state="FAILURE",
+            meta={
+                "exc_type": type(exc).__name__,
+                "exc_message": str(exc),
+                "retry_count": self.request.retries,
+                "max_retries": self.max_retries,
+            },
+        )
+        raise self.retry(exc=exc)
+
+
+async def _run_async_timeliness_deadline_check(pipeline_execution_ids: list[int]):
+    """Async function that creates its own database connection"""
+    db_config = get_database_config()
+    engine = create_async_engine(
+        url=db_config["sqlalchemy.url"],
+        echo=db_config["sqlalchemy.echo"],
+        future=db_config["sqlalchemy.future"],
+        connect_args=db_config.get("sqlalchemy.connect_args", {}),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        celery_sessionmaker = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with celery_sessionmaker() as session:
+            await db_check_pipeline_execution_timeliness_deadlines(
+                session, pipeline_execution_ids
+            )
+        return {"status": "success", "message": "Timeliness deadline check completed"}
+    finally:
+        await engine.dispose()
+
+
 @celery.task(bind=True, rate_limit="1/s", max_retries=3, default_retry_delay=60)
-def freshness_check_task(self):
+def freshness_check_task(self, single_flight_token: Optional[str] = None):
     """Rate-limited freshness check task with retries"""
     try:
         self.update_state(
             state="PROGRESS", meta={"status": "Starting freshness check..."}
         )
 
-        result = async_to_sync(_run_async_freshness_check)()
+        with single_flight_lease(
+            FRESHNESS_CHECK_NAME,
+            single_flight_token,
+            keep_on_error=self.request.retries < self.max_retries,
+        ):
+            result = async_to_sync(_run_async_freshness_check)()
 
         self.update_state(state="SUCCESS", meta={"status": "Freshness check completed"})
         return result
@@ -179,14 +361,336 @@ async def _run_async_freshness_check():
         )
         async with celery_sessionmaker() as session:
             await db_check_pipeline_freshness(session)
+            if freshness_deadlines_enabled():
+                await _seed_freshness_deadlines(session)
         return {"status": "success", "message": "Freshness check completed"}
     finally:
         await engine.dispose()
 
 
+async def _seed_freshness_deadlines(session: AsyncSession):
+    """Register every pending freshness deadline, covering pipelines whose
+    deadline was never synced to Redis"""
+    now = pendulum.now("UTC")
+    await requeue_pending_freshness_deadlines(
+        await db_get_pipeline_freshness_deadlines(session, after=now), now
+    )
+
+
+@celery.task(bind=True, max_retries=3, default_retry_delay=60)
+def freshness_deadline_check_task(self, pipeline_ids: list[int]):
+    """Freshness check for pipelines whose deadline has passed"""
+    try:
+        self.update_state(
+            state="PROGRESS", meta={"status": "Starting freshness deadline check..."}
+        )
+
+        result = async_to_sync(_run_async_freshness_deadline_check)(pipeline_ids)
+
+        self.update_state(
+            state="SUCCESS", meta={"status": "Freshness deadline check completed"}
+        )
+        return result
+
+    except Exception as exc:
+        logger.error(f"Freshness deadline check failed: {exc}")
+
+        self.update_state(
+            state="FAILURE",
+            meta={
+                "exc_type": type(exc).__name__,
+                "exc_message": str(exc),
+                "retry_count": self.request.retries,
+                "max_retries": self.max_retries,
+            },
+        )
+        raise self.retry(exc=exc)
+
+
+async def _run_async_freshness_deadline_check(pipeline_ids: list[int]):
+    """Async function that creates its own database connection"""
+    db_config = get_database_config()
+    engine = create_async_engine(
+        url=db_config["sqlalchemy.url"],
+        echo=db_config["sqlalchemy.echo"],
+        future=db_config["sqlalchemy.future"],
+        connect_args=db_config.get("sqlalchemy.connect_args", {}),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        celery_sessionmaker = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with celery_sessionmaker() as session:
+            await db_check_pipeline_freshness_deadlines(session, pipeline_ids)
+            deadlines = await db_get_pipeline_freshness_deadlines(
+                session, pipeline_ids=pipeline_ids
+            )
+        await requeue_pending_freshness_deadlines(deadlines, pendulum.now("UTC"))
+        return {"status": "success", "message": "Freshness deadline check completed"}
+    finally:
+        await engine.dispose()
+
+
+@celery.task(bind=True, max_retries=3, default_retry_delay=60)
+def timeliness_check_shard_task(
+    self,
+    shard: int,
+    shard_count: int,
+    lookback_minutes: int,
+    now_time: str,
+    single_flight_token: Optional[str] = None,
+):
+    """One shard of a scheduled timeliness check, returns its alert payload"""
+    try:
+        self.update_state(
+            state="PROGRESS", meta={"status": "Starting timeliness check shard..."}
+        )
+
+        # The chord callback releases the lease
+        with single_flight_lease(
+            TIMELINESS_CHECK_NAME, single_flight_token, release=False
+        ):
+            result = async_to_sync(_run_async_timeliness_check_shard)(
+                shard, shard_count, lookback_minutes, now_time
+            )
+
+        self.update_state(
+            state="SUCCESS", meta={"status": "Timeliness check shard completed"}
+        )
+        return result
+
+    except Exception as exc:
+        logger.error(f"Timeliness check shard failed: {exc}")
+
+        self.update_state(
+            state="FAILURE",
+            meta={
+                "exc_type": type(exc).__name__,
+                "exc_message": str(exc),
+                "retry_count": self.request.retries,
+                "max_retries": self.max_retries,
+            },
+        )
+        raise self.retry(exc=exc)
+
+
+async def _run_async_timeliness_check_shard(
+    shard: int, shard_count: int, lookback_minutes: int, now_time: str
+):
+    """Async function that creates its own database connection"""
+    db_config = get_database_config()
+    engine = create_async_engine(
+        url=db_config["sqlalchemy.url"],
+        echo=db_config["sqlalchemy.echo"],
+        future=db_config["sqlalchemy.future"],
+        connect_args=db_config.get("sqlalchemy.connect_args", {}),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        celery_sessionmaker = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with celery_sessionmaker() as session:
+            return await db_check_pipeline_execution_timeliness_shard(
+                session, shard, shard_count, lookback_minutes, pendulum.parse(now_time)
+            )
+    finally:
+        await engine.dispose()
+
+
+@celery.task(bind=True, max_retries=3, default_retry_delay=60)
+def timeliness_check_complete_task(
+    self,
+    shard_results: list[dict],
+    now_time: str,
+    single_flight_token: Optional[str] = None,
+):
+    """Chord callback that alerts once for every timeliness check shard"""
+    try:
+        self.update_state(
+            state="PROGRESS", meta={"status": "Combining timeliness check shards..."}
+        )
+
+        with single_flight_lease(
+            TIMELINESS_CHECK_NAME,
+            single_flight_token,
+            keep_on_error=self.request.retries < self.max_retries,
+        ):
+            result = async_to_sync(_run_async_timeliness_check_complete)(
+                shard_results, now_time
+            )
+
+        self.update_state(
+            state="SUCCESS", meta={"status": "Timeliness check completed"}
+        )
+        return result
+
+    except Exception as exc:
+        logger.error(f"Timeliness check completion failed: {exc}")
+
+        self.update_state(
+            state="FAILURE",
+            meta={
+                "exc_type": type(exc).__name__,
+                "exc_message": str(exc),
+                "retry_count": self.request.retries,
+                "max_retries": self.max_retries,
+            },
+        )
+        raise self.retry(exc=exc)
+
+
+async def _run_async_timeliness_check_complete(
+    shard_results: list[dict], now_time: str
+):
+    """Async function that creates its own database connection"""
+    db_config = get_database_config()
+    engine = create_async_engine(
+        url=db_config["sqlalchemy.url"],
+        echo=db_config["sqlalchemy.echo"],
+        future=db_config["sqlalchemy.future"],
+        connect_args=db_config.get("sqlalchemy.connect_args", {}),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        celery_sessionmaker = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with celery_sessionmaker() as session:
+            result = await db_complete_pipeline_execution_timeliness_shards(
+                session, shard_results, pendulum.parse(now_time)
+            )
+            if running_executions_mirror_enabled():
+                await reconcile_running_executions(session)
+            return result
+    finally:
+        await engine.dispose()
+
+
+@celery.task(bind=True, max_retries=3, default_retry_delay=60)
+def freshness_check_shard_task(
+    self, shard: int, shard_count: int, single_flight_token: Optional[str] = None
+):
+    """One shard of a scheduled freshness check, returns its alert payload"""
+    try:
+        self.update_state(
+            state="PROGRESS", meta={"status": "Starting freshness check shard..."}
+        )
+
+        # The chord callback releases the lease
+        with single_flight_lease(
+            FRESHNESS_CHECK_NAME, single_flight_token, release=False
+        ):
+            result = async_to_sync(_run_async_freshness_check_shard)(shard, shard_count)
+
+        self.update_state(
+            state="SUCCESS", meta={"status": "Freshness check shard completed"}
+        )
+        return result
+
+    except Exception as exc:
+        logger.error(f"Freshness check shard failed: {exc}")
+
+        self.update_state(
+            state="FAILURE",
+            meta={
+                "exc_type": type(exc).__name__,
+                "exc_message": str(exc),
+                "retry_count": self.request.retries,
+                "max_retries": self.max_retries,
+            },
+        )
+        raise self.retry(exc=exc)
+
+
+async def _run_async_freshness_check_shard(shard: int, shard_count: int):
+    """Async function that creates its own database connection"""
+    db_config = get_database_config()
+    engine = create_async_engine(
+        url=db_config["sqlalchemy.url"],
+        echo=db_config["sqlalchemy.echo"],
+        future=db_config["sqlalchemy.future"],
+        connect_args=db_config.get("sqlalchemy.connect_args", {}),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        celery_sessionmaker = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with celery_sessionmaker() as session:
+            return await db_check_pipeline_freshness_shard(session, shard, shard_count)
+    finally:
+        await engine.dispose()
+
+
+@celery.task(bind=True, max_retries=3, default_retry_delay=60)
+def freshness_check_complete_task(
+    self, shard_results: list[dict], single_flight_token: Optional[str] = None
+):
+    """Chord callback that alerts once for every freshness check shard"""
+    try:
+        with single_flight_lease(
+            FRESHNESS_CHECK_NAME,
+            single_flight_token,
+            keep_on_error=self.request.retries < self.max_retries,
+        ):
+            return async_to_sync(_run_async_freshness_check_complete)(shard_results)
+
+    except Exception as exc:
+        logger.error(f"Freshness check completion failed: {exc}")
+
+        self.update_state(
+            state="FAILURE",
+            meta={
+                "exc_type": type(exc).__name__,
+                "exc_message": str(exc),
+                "retry_count": self.request.retries,
+                "max_retries": self.max_retries,
+            },
+        )
+        raise self.retry(exc=exc)
+
+
+async def _run_async_freshness_check_complete(shard_results: list[dict]):
+    """Async function that creates its own database connection"""
+    db_config = get_database_config()
+    engine = create_async_engine(
+        url=db_config["sqlalchemy.url"],
+        echo=db_config["sqlalchemy.echo"],
+        future=db_config["sqlalchemy.future"],
+        connect_args=db_config.get("sqlalchemy.connect_args", {}),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        celery_sessionmaker = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with celery_sessionmaker() as session:
+            result = await db_complete_pipeline_freshness_shards(session, shard_results)
+            if freshness_deadlines_enabled():
+                await _seed_freshness_deadlines(session)
+        return result
+    finally:
+        await engine.dispose()
+
+
 @celery.task(bind=True, rate_limit="5/s", max_retries=3, default_retry_delay=60)
 def address_lineage_closure_rebuild_task(
-    self, connected_addresses: list[int], pipeline_id: int
+    self,
+    connected_addresses: list[int],
+    pipeline_id: int,
+    changed_edges: Optional[list[list[int]]] = None,
 ):
     """Rate-limited closure table rebuild task with retries"""
     try:
@@ -195,7 +699,8 @@ def address_lineage_closure_rebuild_task(
         )
 
         result = async_to_sync(_run_async_address_lineage_closure_rebuild)(
-            connected_addresses, pipeline_id
+            {address_id: pipeline_id for address_id in connected_addresses},
+            {tuple(edge) for edge in changed_edges or []},
         )
 
         self.update_state(
@@ -208,7 +713,7 @@ def address_lineage_closure_rebuild_task(
 
         # Send Slack notification only on final failure (no more retries left)
         if self.request.retries >= self.max_retries - 1:
-            send_slack_message(
+            async_to_sync(send_slack_message)(
                 level=AlertLevel.ERROR,
                 title="Address Lineage Closure Table Rebuild Failed",
                 message=f"Pipeline {pipeline_id} failed to rebuild closure table after {self.max_retries} retries: {str(exc)}",
@@ -233,8 +738,67 @@ def address_lineage_closure_rebuild_task(
         raise self.retry(exc=exc)
 
 
+@celery.task(bind=True, max_retries=3, default_retry_delay=60)
+def pending_address_lineage_closure_rebuild_task(self):
+    """Rebuild the closure for every lineage post buffered in the debounce window"""
+    address_pipelines = {}
+    try:
+        self.update_state(
+            state="PROGRESS", meta={"status": "Claiming pending closure rebuilds..."}
+        )
+
+        address_pipelines, changed_edges = async_to_sync(pop_pending_closure_rebuild)()
+        result = {"status": "success", "message": "No closure rebuild pending"}
+        if address_pipelines:
+            try:
+                result = async_to_sync(_run_async_address_lineage_closure_rebuild)(
+                    address_pipelines, changed_edges
+                )
+            except Exception:
+                # Claimed work goes back for the retry to pick up
+                async_to_sync(restore_pending_closure_rebuild)(
+                    address_pipelines, changed_edges
+                )
+                raise
+
+        self.update_state(
+            state="SUCCESS", meta={"status": "Pending closure rebuilds completed"}
+        )
+        return result
+
+    except Exception as exc:
+        logger.error(f"Pending closure table rebuild failed: {exc}")
+
+        # Send Slack notification only on final failure (no more retries left)
+        if self.request.retries >= self.max_retries - 1:
+            pipeline_ids = sorted(set(address_pipelines.values()))
+            async_to_sync(send_slack_message)(
+                level=AlertLevel.ERROR,
+                title="Address Lineage Closure Table Rebuild Failed",
+                message=f"Pipelines {pipeline_ids} failed to rebuild closure table after {self.max_retries} retries: {str(exc)}",
+                details={
+                    "pipeline_ids": pipeline_ids,
+                    "connected_addresses": sorted(address_pipelines),
+                    "error_type": type(exc).__name__,
+                    "retry_count": self.request.retries,
+                    "max_retries": self.max_retries,
+                },
+            )
+
+        self.update_state(
+            state="FAILURE",
+            meta={
+                "exc_type": type(exc).__name__,
+                "exc_message": str(exc),
+                "retry_count": self.request.retries,
+                "max_retries": self.max_retries,
+            },
+        )
+        raise self.retry(exc=exc)
+
+
 async def _run_async_address_lineage_closure_rebuild(
-    connected_addresses: list[int], pipeline_id: int
+    address_pipelines: dict[int, int], changed_edges: set[tuple[int, int]]
 ):
     """Async function that creates its own database connection"""
     db_config = get_database_config()
@@ -252,10 +816,13 @@ async def _run_async_address_lineage_closure_rebuild(
             engine, class_=AsyncSession, expire_on_commit=False
         )
         async with celery_sessionmaker() as session:
-            await db_rebuild_closure_table_incremental(
-                session, set(connected_addresses), pipeline_id
+            components = await db_maintain_closure_components(
+                session, address_pipelines, changed_edges
             )
-        return {"status": "success", "message": "Closure table rebuild completed"}
+        return {
+            "status": "success",
+            "message": f"Closure table maintained for {components} components",
+        }
     finally:
         await engine.dispose()
 
@@ -328,15 +895,81 @@ async def _run_async_pipeline_execution_closure_maintenance(
 @celery.task(bind=True, max_retries=3, default_retry_delay=60, queue="scheduled")
 def scheduled_freshness_check(self):
     """Scheduled task to check freshness for all active pipelines"""
-    return freshness_check_task.delay()
+    single_flight_token = None
+    if single_flight_enabled():
+        single_flight_token = start_single_flight(FRESHNESS_CHECK_NAME)
+        if single_flight_token is None:
+            return None
+
+    shard_count = config.WATCHER_MONITOR_CHECK_SHARDS or 1
+    if shard_count == 1:
+        return freshness_check_task.delay(single_flight_token=single_flight_token)
+
+    return chord(
+        freshness_check_shard_task.s(
+            shard, shard_count, single_flight_token=single_flight_token
+        )
+        for shard in range(shard_count)
+    )(freshness_check_complete_task.s(single_flight_token=single_flight_token))
 
 
 @celery.task(bind=True, max_retries=3, default_retry_delay=60, queue="scheduled")
 def scheduled_timeliness_check(self):
     """Scheduled task to check timeliness for all active pipelines"""
-    return timeliness_check_task.delay(
-        lookback_minutes=config.WATCHER_TIMELINESS_CHECK_LOOKBACK_MINUTES
+    single_flight_token = None
+    if single_flight_enabled():
+        single_flight_token = start_single_flight(TIMELINESS_CHECK_NAME)
+        if single_flight_token is None:
+            return None
+
+    shard_count = config.WATCHER_MONITOR_CHECK_SHARDS or 1
+    if shard_count == 1:
+        return timeliness_check_task.delay(
+            lookback_minutes=config.WATCHER_TIMELINESS_CHECK_LOOKBACK_MINUTES,
+            single_flight_token=single_flight_token,
+        )
+
+    # Every shard evaluates up to the same instant, the callback then moves
+    # the high-water mark there once all of them succeeded
+    now_time = pendulum.now("UTC").isoformat()
+    return chord(
+        timeliness_check_shard_task.s(
+            shard,
+            shard_count,
+            config.WATCHER_TIMELINESS_CHECK_LOOKBACK_MINUTES,
+            now_time,
+            single_flight_token=single_flight_token,
+        )
+        for shard in range(shard_count)
+    )(
+        timeliness_check_complete_task.s(
+            now_time=now_time, single_flight_token=single_flight_token
+        )
+    )
+
+
+@celery.task(bind=True, max_retries=3, default_retry_delay=60, queue="scheduled")
+def scheduled_timeliness_deadline_check(self):
+    """Scheduled task to alert on executions whose deadline just expired"""
+    pipeline_execution_ids = async_to_sync(pop_expired_timeliness_deadlines)(
+        pendulum.now("UTC")
     )
+    if not pipeline_execution_ids:
+        return None
+
+    return timeliness_deadline_check_task.delay(
+        pipeline_execution_ids=pipeline_execution_ids
+    )
+
+
+@celery.task(bind=True, max_retries=3, default_retry_delay=60, queue="scheduled")
+def scheduled_freshness_deadline_check(self):
+    """Scheduled task to alert on pipelines whose deadline just expired"""
+    pipeline_ids = async_to_sync(pop_expired_freshness_deadlines)(pendulum.now("UTC"))
+    if not pipeline_ids:
+        return None
+
+    return freshness_deadline_check_task.delay(pipeline_ids=pipeline_ids)
 
 
 @celery.task(bind=True, max_retries=3, default_retry_delay=60, queue="scheduled")
@@ -0,0 +1,120 @@
+from typing import Iterable, Optional, Tuple
+
+import structlog
+
+from src.redis_client import get_redis_client, open_redis_client
+from src.settings import config
+
+logger = structlog.get_logger(__name__)
+
+# Hash of address to the pipeline whose lineage post touched it last
+PENDING_ADDRESSES_KEY = "watcher:closure_rebuild:addresses"
+# Set of "source:target" edges added or removed since the last rebuild
+PENDING_EDGES_KEY = "watcher:closure_rebuild:edges"
+# Present while a debounced rebuild is waiting to run
+REBUILD_SCHEDULED_KEY = "watcher:closure_rebuild:scheduled"
+
+# How many debounce windows the scheduled marker outlives a lost rebuild task
+SCHEDULED_MARKER_WINDOWS = 10
+
+
+def closure_rebuild_debounce_enabled() -> bool:
+    return bool(config.REDIS_URL) and bool(
+        config.WATCHER_CLOSURE_REBUILD_DEBOUNCE_SECONDS
+    )
+
+
+def _encode_edge(edge: Tuple[int, int]) -> str:
+    return f"{edge[0]}:{edge[1]}"
+
+
+def _decode_edge(member: str) -> Tuple[int, int]:
+    source_address_id, target_address_id = member.split(":")
+    return int(source_address_id), int(target_address_id)
+
+
+async def buffer_closure_rebuild(
+    address_ids: Iterable[int],
+    changed_edges: Iterable[Tuple[int, int]],
+    pipeline_id: int,
+) -> Optional[bool]:
+    """Add a lineage post to the pending closure rebuild.
+
+    Returns True when no rebuild was waiting yet and the caller has to
+    schedule one, False when the waiting rebuild will pick this post up, and
+    None when Redis failed so the caller should rebuild right away.
+    """
+    addresses = {str(address_id): pipeline_id for address_id in address_ids}
+    edges = [_encode_edge(edge) for edge in changed_edges]
+
+    try:
+        async with get_redis_client().pipeline(transaction=True) as pipe:
+            pipe.hset(PENDING_ADDRESSES_KEY, mapping=addresses)
+            if edges:
+                pipe.sadd(PENDING_EDGES_KEY, *edges)
+            pipe.set(
+                REBUILD_SCHEDULED_KEY,
+                pipeline_id,
+                nx=True,
+                ex=config.WATCHER_CLOSURE_REBUILD_DEBOUNCE_SECONDS
+                * SCHEDULED_MARKER_WINDOWS,
+            )
+            results = await pipe.execute()
+        return bool(results[-1])
+    except Exception as e:
+        logger.warning(
+            f"Error buffering closure rebuild for pipeline {pipeline_id}: {e}"
+        )
+        return None
+
+
+async def pop_pending_closure_rebuild() -> tuple[dict[int, int], set[Tuple[int, int]]]:
+    """Claim every pending address and edge change.
+
+    The scheduled marker goes first, so a post landing after the claim
+    schedules a new rebuild instead of being left behind.
+    """
+    client = open_redis_client()
+    try:
+        await client.delete(REBUILD_SCHEDULED_KEY)
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.hgetall(PENDING_ADDRESSES_KEY)
+            pipe.smembers(PENDING_EDGES_KEY)
+            pipe.delete(PENDING_ADDRESSES_KEY, PENDING_EDGES_KEY)
+            addresses, edges, _ = await pipe.execute()
+    finally:
+        await client.aclose()
+
+    return (
+        {
+            int(address_id): int(pipeline_id)
+            for address_id, pipeline_id in addresses.items()
+        },
+        {_decode_edge(member) for member in edges},
+    )
+
+
+async def restore_pending_closure_rebuild(
+    address_pipelines: dict[int, int], changed_edges: set[Tuple[int, int]]
+) -> None:
+    """Put a claimed rebuild back after it failed, for its retry to claim again"""
+    if not address_pipelines:
+        return
+
+    client = open_redis_client()
+    try:
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                PENDING_ADDRESSES_KEY,
+                mapping={
+                    str(address_id): pipeline_id
+                    for address_id, pipeline_id in address_pipelines.items()
+                },
+            )
+            if changed_edges:
+                pipe.sadd(
+                    PENDING_EDGES_KEY, *(_encode_edge(edge) for edge in changed_edges)
+                )
+            await pipe.execute()
+    finally:
+        await client.aclose()
@@ -1,22 +1,64 @@
+import os
 import time
-from typing import List, Set, Tuple
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from queue import Empty, Queue
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
 
 import structlog
 from fastapi import Response
-from sqlalchemy import select
+from sqlalchemy import select, text, tuple_
 from sqlmodel import Session
 
 from src.database.address_utils import db_get_or_create_address
-from src.database.models.address_lineage import AddressLineage, AddressLineageClosure
+from src.database.models.address_lineage import (
+    AddressLineage,
+    AddressLineageChange,
+    AddressLineageClosure,
+)
 from src.database.models.pipeline import Pipeline
 from src.models.address import AddressPostInput, AddressPostOutput
 from src.models.address_lineage import (
+    AddressLineageCycle,
     AddressLineagePostInput,
     AddressLineagePostOutput,
 )
+from src.settings import config
 
 logger = structlog.get_logger(__name__)
 
+CLOSURE_STAGING_TABLE = "address_lineage_closure_staging"
+CLOSURE_DIFF_TABLE = "address_lineage_closure_diff"
+
+# Most edge changes a closure task applies in place before rebuilding the
+# component instead
+CLOSURE_INCREMENTAL_EDGE_LIMIT = 100
+
+# First key of the advisory locks serializing closure writes per component
+CLOSURE_LOCK_NAMESPACE = 4210
+# Second key a full closure rebuild locks exclusively and component writes
+# share, no component is keyed 0 since address IDs start at 1
+CLOSURE_FULL_REBUILD_LOCK_ID = 0
+# Most addresses a full rebuild hands to one worker process at a time, small
+# components are batched up to it
+CLOSURE_REBUILD_BATCH_ADDRESSES = 10000
+# Closure rows a full rebuild worker hands back at a time, so however many
+# paths a component has they never pile up in one list
+CLOSURE_REBUILD_CHUNK_ROWS = 10000
+
+# Advisory lock serializing lineage writes, so lineage versions commit in order
+LINEAGE_CHANGE_LOCK_ID = 4211
+# Lineage changes kept for in-process indexes to catch up from
+LINEAGE_CHANGE_RETENTION = 10000
+
+CLOSURE_COLUMNS = [
+    "source_address_id",
+    "target_address_id",
+    "depth",
+    "lineage_path",
+]
+
 
 async def _process_address_lists(
     session: Session,
@@ -53,53 +95,226 @@ async def _create_address_lineage_relationships(
     pipeline_id: int,
     source_address_ids: Set[int],
     target_address_ids: Set[int],
-) -> tuple[int, Set[int], int]:
+) -> tuple[int, Set[int], int, Set[Tuple[int, int]]]:
     logger.info(
         f"Creating {len(source_address_ids)} x {len(target_address_ids)} = {len(source_address_ids) * len(target_address_ids)} lineage relationships for pipeline {pipeline_id}"
     )
 
-    # Create lineage records
-    lineage_relationships = []
-    for source_address_id in source_address_ids:
-        for target_address_id in target_address_ids:
-            lineage_relationships.append(
-                {
-                    "pipeline_id": pipeline_id,
-                    "source_address_id": source_address_id,
-                    "target_address_id": target_address_id,
-                }
+    edges = {
+        (source_address_id, target_address_id)
+        for source_address_id in source_address_ids
+        for target_address_id in target_address_ids
+    }
+
+    previous_edges = {
+        (source_address_id, target_address_id)
+        for source_address_id, target_address_id in (
+            await session.exec(
+                select(
+                    AddressLineage.source_address_id, AddressLineage.target_address_id
+                ).where(AddressLineage.pipeline_id == pipeline_id)
             )
+        ).all()
+    }
+    added_edges = edges - previous_edges
+    removed_edges = previous_edges - edges
+
+    # Nothing to write and no closure to rebuild when the lineage is unchanged
+    if not added_edges and not removed_edges:
+        logger.info(f"Lineage unchanged for pipeline {pipeline_id}")
+        return len(edges), set(), pipeline_id, set()
 
-    # Delete + Insert to ensure lineage is always accurate
+    # Only write the differences, the rest of the lineage stays in place
     savepoint = await session.begin_nested()
     try:
-        delete_result = await session.exec(
-            AddressLineage.__table__.delete().where(
-                AddressLineage.pipeline_id == pipeline_id
+        deleted = 0
+        if removed_edges:
+            delete_result = await session.exec(
+                AddressLineage.__table__.delete()
+                .where(AddressLineage.pipeline_id == pipeline_id)
+                .where(
+                    tuple_(
+                        AddressLineage.source_address_id,
+                        AddressLineage.target_address_id,
+                    ).in_(removed_edges)
+                )
             )
-        )
-        insert_result = await session.exec(
-            AddressLineage.__table__.insert().values(lineage_relationships)
-        )
+            deleted = delete_result.rowcount
+
+        inserted = 0
+        if added_edges:
+            insert_result = await session.exec(
+                AddressLineage.__table__.insert().values(
+                    [
+                        {
+                            "pipeline_id": pipeline_id,
+                            "source_address_id": source_address_id,
+                            "target_address_id": target_address_id,
+                        }
+                        for source_address_id, target_address_id in added_edges
+                    ]
+                )
+            )
+            inserted = insert_result.rowcount
 
         logger.info(
-            f"Lineage operations for pipeline {pipeline_id}: deleted {delete_result.rowcount} existing records, inserted {insert_result.rowcount} new records"
+            f"Lineage operations for pipeline {pipeline_id}: deleted {deleted} removed records, inserted {inserted} new records, kept {len(edges) - inserted} unchanged"
         )
 
+        await _log_lineage_changes(session, added_edges, removed_edges)
+
         await savepoint.commit()
         await session.commit()
     except Exception:
         await savepoint.rollback()
         raise
 
-    # Return relationships count, affected address IDs, and pipeline ID for background processing
+    # Return relationships count, affected address IDs, pipeline ID and the
+    # edge changes for background processing
     affected_address_ids = source_address_ids.union(target_address_ids)
-    return len(lineage_relationships), affected_address_ids, pipeline_id
+    return len(edges), affected_address_ids, pipeline_id, added_edges | removed_edges
+
+
+async def _log_lineage_changes(
+    session: Session,
+    added_edges: Set[Tuple[int, int]],
+    removed_edges: Set[Tuple[int, int]],
+) -> None:
+    """Append the edge changes to address_lineage_change under the next versions.
+
+    The lock is held until commit, so a version is never visible before the
+    ones below it and an index that saw version n has seen every change up
+    to n.
+    """
+    await session.exec(
+        text("SELECT pg_advisory_xact_lock(:lock_id)"),
+        params={"lock_id": LINEAGE_CHANGE_LOCK_ID},
+    )
+    await session.exec(
+        AddressLineageChange.__table__.insert().values(
+            [
+                {
+                    "source_address_id": source_address_id,
+                    "target_address_id": target_address_id,
+                    "removed": True,
+                }
+                for source_address_id, target_address_id in sorted(removed_edges)
+            ]
+            + [
+                {
+                    "source_address_id": source_address_id,
+                    "target_address_id": target_address_id,
+                    "removed": False,
+                }
+                for source_address_id, target_address_id in sorted(added_edges)
+            ]
+        )
+    )
+    await session.exec(
+        text(
+            """
+            DELETE FROM address_lineage_change
+            WHERE id <= (SELECT max(id) FROM address_lineage_change) - :retention
+            """
+        ),
+        params={"retention": LINEAGE_CHANGE_RETENTION},
+    )
+
+
+async def db_get_lineage_snapshot(
+    session: Session,
+) -> tuple[int, List[int], List[int]]:
+    """The lineage version and every edge at it, as source and target lists
+    sorted by source then target. One statement, so both agree."""
+    row = (
+        await session.exec(
+            text(
+                """
+                SELECT
+                    (SELECT coalesce(max(id), 0) FROM address_lineage_change) AS version,
+                    ARRAY(
+                        SELECT source_address_id FROM address_lineage
+                        ORDER BY source_address_id, target_address_id
+                    ) AS source_address_ids,
+                    ARRAY(
+                        SELECT target_address_id FROM address_lineage
+                        ORDER BY source_address_id, target_address_id
+                    ) AS target_address_ids
+                """
+            )
+        )
+    ).one()
+    return row.version, row.source_address_ids, row.target_address_ids
+
+
+async def db_get_lineage_versions(session: Session) -> tuple[int, int]:
+    """The oldest and latest lineage change still logged, 0 when none are"""
+    row = (
+        await session.exec(
+            text(
+                """
+                SELECT
+                    coalesce(min(id), 0) AS oldest_version,
+                    coalesce(max(id), 0) AS latest_version
+                FROM address_lineage_change
+                """
+            )
+        )
+    ).one()
+    return row.oldest_version, row.latest_version
+
+
+async def db_get_lineage_changes(
+    session: Session, after_version: int
+) -> List[Tuple[int, int, int, bool]]:
+    """Lineage changes past a version as (version, source, target, removed)"""
+    return [
+        tuple(row)
+        for row in (
+            await session.exec(
+                select(
+                    AddressLineageChange.id,
+                    AddressLineageChange.source_address_id,
+                    AddressLineageChange.target_address_id,
+                    AddressLineageChange.removed,
+                )
+                .where(AddressLineageChange.id > after_version)
+                .order_by(AddressLineageChange.id)
+            )
+        ).all()
+    ]
+
+
+async def db_filter_addresses_by_type(
+    session: Session, address_ids: Iterable[int], address_type_name: str
+) -> Set[int]:
+    """The addresses among address_ids whose address type is address_type_name"""
+    return set(
+        (
+            await session.exec(
+                text(
+                    """
+                    SELECT a.id
+                    FROM address AS a
+                    INNER JOIN address_type AS at ON at.id = a.address_type_id
+                    WHERE a.id = ANY(CAST(:address_ids AS INTEGER[]))
+                    AND at.name = :address_type_name
+                    """
+                ),
+                params={
+                    "address_ids": list(address_ids),
+                    "address_type_name": address_type_name.lower(),
+                },
+            )
+        )
+        .scalars()
+        .all()
+    )
 
 
 async def db_create_address_lineage(
     session: Session, lineage_input: AddressLineagePostInput, response: Response
-) -> tuple[AddressLineagePostOutput, Set[int], int]:
+) -> tuple[AddressLineagePostOutput, Set[int], int, Set[Tuple[int, int]]]:
     pipeline = await session.get(Pipeline, lineage_input.pipeline_id)
     if not pipeline or not pipeline.load_lineage:
         response.status_code = 200
@@ -111,6 +326,7 @@ async def db_create_address_lineage(
             },
             set(),
             lineage_input.pipeline_id,
+            set(),
         )
 
     source_address_ids, target_address_ids = await _process_address_lists(
@@ -124,6 +340,7 @@ async def db_create_address_lineage(
         relationships_created,
         affected_address_ids,
         pipeline_id,
+        changed_edges,
     ) = await _create_address_lineage_relationships(
         session, lineage_input.pipeline_id, source_address_ids, target_address_ids
     )
@@ -136,8 +353,384 @@ async def db_create_address_lineage(
         },
         affected_address_ids,
         pipeline_id,
+        changed_edges,
+    )
+
+
+async def db_get_address_lineage_cycles(
+    session: Session,
+) -> List[AddressLineageCycle]:
+    """Every cycle in address lineage, with the pipelines whose edges form it"""
+    lineage = (
+        await session.exec(
+            select(
+                AddressLineage.source_address_id,
+                AddressLineage.target_address_id,
+                AddressLineage.pipeline_id,
+            )
+        )
+    ).all()
+    cycles = find_lineage_cycles(
+        (),
+        (
+            (source_address_id, target_address_id)
+            for source_address_id, target_address_id, _ in lineage
+        ),
     )
 
+    cycle_ids = {
+        address_id: cycle_id
+        for cycle_id, cycle in enumerate(cycles)
+        for address_id in cycle
+    }
+    cycle_pipeline_ids = defaultdict(set)
+    for source_address_id, target_address_id, pipeline_id in lineage:
+        cycle_id = cycle_ids.get(source_address_id)
+        if cycle_id is not None and cycle_id == cycle_ids.get(target_address_id):
+            cycle_pipeline_ids[cycle_id].add(pipeline_id)
+
+    return [
+        {
+            "address_ids": cycle,
+            "pipeline_ids": sorted(cycle_pipeline_ids[cycle_id]),
+        }
+        for cycle_id, cycle in enumerate(cycles)
+    ]
+
+
+def compute_lineage_closure(
+    addresses: Iterable[int],
+    edges: Iterable[Tuple[int, int]],
+    max_paths: int = 0,
+) -> Iterator[Tuple[int, int, int, Tuple[int, ...]]]:
+    """Every path between the addresses as (source, target, depth, lineage_path).
+
+    Edges are indexed by source once, then each address is walked depth first
+    so an edge is only ever expanded from its own node. Includes the depth 0
+    self-reference of every address. A node already on the current path is
+    not revisited, which keeps a cycle from being walked forever. Paths are
+    yielded as they are found so callers can stream them.
+
+    With max_paths the walk is breadth first instead and only the max_paths
+    shortest depths of each (source, target) are yielded, one lowest path
+    each, so the work grows with the reachable pairs rather than the paths.
+    """
+    adjacency = defaultdict(list)
+    for source_address, target_address in edges:
+        adjacency[source_address].append(target_address)
+
+    if max_paths:
+        for target_addresses in adjacency.values():
+            target_addresses.sort()
+        for source_address in addresses:
+            yield from _shortest_lineage_paths(source_address, adjacency, max_paths)
+        return
+
+    for source_address in addresses:
+        yield (source_address, source_address, 0, (source_address,))
+        stack = [(source_address, (source_address,))]
+        while stack:
+            address, lineage_path = stack.pop()
+            for target_address in adjacency.get(address, ()):
+                if target_address in lineage_path:
+                    continue
+                target_path = lineage_path + (target_address,)
+                yield (source_address, target_address, len(lineage_path), target_path)
+                stack.append((target_address, target_path))
+
+
+def _shortest_lineage_paths(
+    source_address: int, adjacency: dict[int, list[int]], max_paths: int
+) -> Iterator[Tuple[int, int, int, Tuple[int, ...]]]:
+    """The max_paths shortest depths from source_address to every address.
+
+    Walks one depth at a time. An address already reached at max_paths
+    shorter depths is not expanded again, since anything past it is reached
+    sooner through those. Each depth is walked in path order over sorted
+    targets, so the first path reaching an address is the lowest one.
+    """
+    depths_found = defaultdict(int)
+    depths_found[source_address] = 1
+    frontier = [(source_address, (source_address,))]
+    depth = 0
+    while frontier:
+        next_frontier = []
+        reached = set()
+        for address, lineage_path in frontier:
+            yield (source_address, address, depth, lineage_path)
+            for target_address in adjacency.get(address, ()):
+                if (
+                    target_address in lineage_path
+                    or target_address in reached
+                    or depths_found[target_address] >= max_paths
+                ):
+                    continue
+                reached.add(target_address)
+                depths_found[target_address] += 1
+                next_frontier.append((target_address, lineage_path + (target_address,)))
+        frontier = next_frontier
+        depth += 1
+
+
+def find_lineage_cycles(
+    addresses: Iterable[int], edges: Iterable[Tuple[int, int]]
+) -> List[List[int]]:
+    """Groups of addresses that all reach each other through lineage.
+
+    Tarjan's strongly connected components algorithm, run iteratively so a
+    long chain cannot hit the recursion limit, visits every address and edge
+    once. Only components forming a cycle are returned, including an address
+    feeding itself, each as sorted address IDs.
+    """
+    adjacency = defaultdict(list)
+    for source_address, target_address in edges:
+        adjacency[source_address].append(target_address)
+
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    cycles = []
+
+    def visit(address):
+        index[address] = lowlink[address] = len(index)
+        stack.append(address)
+        on_stack.add(address)
+        return address, iter(adjacency.get(address, ()))
+
+    for root_address in sorted(set(addresses) | set(adjacency)):
+        if root_address in index:
+            continue
+        work = [visit(root_address)]
+        while work:
+            address, target_addresses = work[-1]
+            for target_address in target_addresses:
+                if target_address not in index:
+                    work.append(visit(target_address))
+                    break
+                if target_address in on_stack:
+                    lowlink[address] = min(lowlink[address], index[target_address])
+            else:
+                work.pop()
+                if work:
+                    parent_address = work[-1][0]
+                    lowlink[parent_address] = min(
+                        lowlink[parent_address], lowlink[address]
+                    )
+                if lowlink[address] != index[address]:
+                    continue
+
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == address:
+                        break
+                if len(component) > 1 or address in adjacency.get(address, ()):
+                    cycles.append(sorted(component))
+
+    return sorted(cycles)
+
+
+def _closure_max_paths(
+    addresses: Iterable[int], edges: Iterable[Tuple[int, int]], lineage_name: str
+) -> int:
+    """How many depths per (source, target) a closure computation keeps.
+
+    Diamond-heavy lineage has exponentially many paths, so when walking all
+    of them would go past WATCHER_LINEAGE_CLOSURE_PATH_LIMIT only the
+    shortest path of each pair is kept and a warning is logged, instead of
+    running into the task time limit. Inside a cycle every address reaches
+    every other one along a number of paths that explodes with its size, so
+    cyclic lineage is logged and always kept to the bounded walk. Acyclic
+    lineage has its paths counted without walking them.
+    """
+    max_paths = config.WATCHER_LINEAGE_CLOSURE_MAX_PATHS
+    cycles = find_lineage_cycles(addresses, edges)
+    if cycles:
+        logger.warning(
+            f"Lineage {lineage_name} has {len(cycles)} cycles, keeping only the shortest paths of each address pair: {cycles}"
+        )
+        return max_paths or 1
+
+    path_limit = config.WATCHER_LINEAGE_CLOSURE_PATH_LIMIT
+    if max_paths or not path_limit:
+        return max_paths
+
+    if _count_lineage_paths(addresses, edges, path_limit) > path_limit:
+        logger.warning(
+            f"Lineage closure {lineage_name} has more than {path_limit} paths, keeping only the shortest path of each address pair"
+        )
+        return 1
+    return 0
+
+
+def _count_lineage_paths(
+    addresses: Iterable[int], edges: Iterable[Tuple[int, int]], limit: int
+) -> int:
+    """How many paths compute_lineage_closure yields for acyclic lineage, once
+    past limit only that it is over it.
+
+    The paths leaving an address are itself plus the paths leaving each of
+    its targets, so every address is counted once, in reverse topological
+    order, instead of walking the paths.
+    """
+    adjacency = defaultdict(list)
+    for source_address, target_address in edges:
+        adjacency[source_address].append(target_address)
+
+    path_counts = {}
+    total = 0
+    for root_address in addresses:
+        work = [root_address]
+        while work:
+            address = work[-1]
+            if address in path_counts:
+                work.pop()
+                continue
+            pending = [
+                target_address
+                for target_address in adjacency.get(address, ())
+                if target_address not in path_counts
+            ]
+            if pending:
+                work.extend(pending)
+                continue
+            work.pop()
+            path_counts[address] = min(
+                1
+                + sum(
+                    path_counts[target_address]
+                    for target_address in adjacency.get(address, ())
+                ),
+                limit + 1,
+            )
+        total += path_counts[root_address]
+        if total > limit:
+            break
+    return total
+
+
+async def _copy_closure_to_staging(
+    session: Session, closure: Iterable[Tuple[int, int, int, Tuple[int, ...]]]
+) -> int:
+    """Stream closure rows into a temporary staging table with COPY.
+
+    Rows go straight from the generator to asyncpg in chunks, so memory does
+    not grow with the number of paths. The table is dropped on commit.
+    Returns how many rows were copied.
+    """
+    await session.exec(
+        text(f"""
+            CREATE TEMPORARY TABLE {CLOSURE_STAGING_TABLE} (
+                LIKE address_lineage_closure
+            ) ON COMMIT DROP
+        """)
+    )
+
+    copied = 0
+
+    def count_rows():
+        nonlocal copied
+        for row in closure:
+            copied += 1
+            yield row
+
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        CLOSURE_STAGING_TABLE,
+        records=count_rows(),
+        columns=CLOSURE_COLUMNS,
+    )
+    return copied
+
+
+async def _dedupe_staged_closure(session: Session) -> int:
+    """Keep the lowest lineage_path of every staged (source, target, depth).
+
+    The result goes to a second temporary table with the closure primary key,
+    so diffing it against address_lineage_closure is an index lookup. Returns
+    how many rows it holds.
+    """
+    columns = ", ".join(CLOSURE_COLUMNS)
+    await session.exec(
+        text(f"""
+            CREATE TEMPORARY TABLE {CLOSURE_DIFF_TABLE} (
+                LIKE address_lineage_closure INCLUDING INDEXES
+            ) ON COMMIT DROP
+        """)
+    )
+    result = await session.exec(
+        text(f"""
+            INSERT INTO {CLOSURE_DIFF_TABLE} ({columns})
+            SELECT DISTINCT ON (source_address_id, target_address_id, depth)
+                {columns}
+            FROM {CLOSURE_STAGING_TABLE}
+            ORDER BY source_address_id, target_address_id, depth, lineage_path
+        """)
+    )
+    await session.exec(text(f"ANALYZE {CLOSURE_DIFF_TABLE}"))
+    return result.rowcount
+
+
+async def _insert_staged_closure(session: Session) -> int:
+    """Insert the deduplicated rows missing from address_lineage_closure"""
+    columns = ", ".join(CLOSURE_COLUMNS)
+    result = await session.exec(
+        text(f"""
+            INSERT INTO address_lineage_closure ({columns})
+            SELECT {columns}
+            FROM {CLOSURE_DIFF_TABLE}
+            ON CONFLICT (source_address_id, target_address_id, depth) DO NOTHING
+        """)
+    )
+    return result.rowcount
+
+
+async def _get_lineage_component(
+    session: Session, address_ids: Set[int]
+) -> tuple[Set[int], Set[Tuple[int, int]]]:
+    """The connected component around address_ids, and every edge inside it.
+
+    Walks address_lineage in both directions with a recursive CTE, so the
+    whole component comes back in one query whatever its diameter. The seed
+    addresses are always part of the component, even without edges left.
+    """
+    component_query = text("""
+        WITH RECURSIVE component(address_id) AS (
+            SELECT unnest(CAST(:address_ids AS INTEGER[]))
+            UNION
+            SELECT neighbor.address_id
+            FROM component
+            CROSS JOIN LATERAL (
+                SELECT al.target_address_id
+                FROM address_lineage AS al
+                WHERE al.source_address_id = component.address_id
+                UNION ALL
+                SELECT al.source_address_id
+                FROM address_lineage AS al
+                WHERE al.target_address_id = component.address_id
+            ) AS neighbor(address_id)
+        )
+        SELECT
+            ARRAY(SELECT address_id FROM component) AS address_ids,
+            ARRAY(
+                SELECT ARRAY[al.source_address_id, al.target_address_id]
+                FROM address_lineage AS al
+                INNER JOIN component
+                    ON component.address_id = al.source_address_id
+            ) AS edges
+    """)
+    component = (
+        await session.exec(component_query, params={"address_ids": list(address_ids)})
+    ).one()
+    return set(component.address_ids), {
+        (source_address_id, target_address_id)
+        for source_address_id, target_address_id in component.edges
+    }
+
 
 async def db_rebuild_closure_table_incremental(
     session: Session, connected_addresses: Set[int], pipeline_id: int
@@ -145,48 +738,13 @@ async def db_rebuild_closure_table_incremental(
     logger.info(
         f"Rebuilding closure table for {len(connected_addresses)} addresses for pipeline {pipeline_id}"
     )
+    savepoint = None
     try:
-        # Traverse to find all connected addresses and collect edges simultaneously
+        # Find every connected address and its edges in one round trip
         start_time = time.time()
-        all_edges = set()
-        added = True
-        while added:
-            added = False
-
-            # Get new addresses where source is in connected_addresses - downstream edges
-            forward_edges = (
-                await session.exec(
-                    select(
-                        AddressLineage.source_address_id,
-                        AddressLineage.target_address_id,
-                    ).where(AddressLineage.source_address_id.in_(connected_addresses))
-                )
-            ).all()
-
-            # Get new addresses where target is in connected_addresses - upstream edges
-            backward_edges = (
-                await session.exec(
-                    select(
-                        AddressLineage.source_address_id,
-                        AddressLineage.target_address_id,
-                    ).where(AddressLineage.target_address_id.in_(connected_addresses))
-                )
-            ).all()
-
-            all_edges.update(forward_edges)
-            all_edges.update(backward_edges)
-
-            # Add new connected addresses from forward traversal - downstream addresses
-            for source_address, target_address in forward_edges:
-                if target_address not in connected_addresses:
-                    connected_addresses.add(target_address)
-                    added = True
-
-            # Add new connected addresses from backward traversal - upstream addresses
-            for source_address, target_address in backward_edges:
-                if source_address not in connected_addresses:
-                    connected_addresses.add(source_address)
-                    added = True
+        connected_addresses, all_edges = await _get_lineage_component(
+            session, connected_addresses
+        )
 
         # Log edge collection timing
         edge_collection_time = time.time() - start_time
@@ -194,107 +752,625 @@ async def db_rebuild_closure_table_incremental(
             f"Edge collection completed for pipeline {pipeline_id}: {len(connected_addresses)} addresses, {len(all_edges)} edges in {edge_collection_time:.3f}s"
         )
 
+        closure_start_time = time.time()
+        max_paths = _closure_max_paths(
+            connected_addresses, all_edges, f"for pipeline {pipeline_id}"
+        )
+        closure_count = await _copy_closure_to_staging(
+            session,
+            compute_lineage_closure(connected_addresses, all_edges, max_paths),
+        )
+
+        # Log closure algorithm timing
+        closure_time = time.time() - closure_start_time
+        logger.info(
+            f"Closure algorithm completed for pipeline {pipeline_id}: {closure_count} paths staged in {closure_time:.3f}s"
+        )
+
+        # Equal length paths through a diamond share a primary key, keep the
+        # lowest lineage_path of each
+        new_closure_count = await _dedupe_staged_closure(session)
+
         savepoint = await session.begin_nested()
-        # Delete all closure paths that involve any of the connected addresses
-        # Use two separate deletes to leverage indexes efficiently
+        # Only delete the closure paths that are not part of the new closure,
+        # unchanged rows are left alone. Two deletes to use the source and
+        # target indexes. A path ending inside the component but starting
+        # outside it cannot exist anymore, so the second one deletes outright.
         delete_result_1 = await session.exec(
-            AddressLineageClosure.__table__.delete().where(
-                AddressLineageClosure.source_address_id.in_(connected_addresses)
-            )
+            text(f"""
+                DELETE FROM address_lineage_closure AS alc
+                WHERE alc.source_address_id = ANY(:address_ids)
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM {CLOSURE_DIFF_TABLE} AS new_closure
+                    WHERE new_closure.source_address_id = alc.source_address_id
+                    AND new_closure.target_address_id = alc.target_address_id
+                    AND new_closure.depth = alc.depth
+                    AND new_closure.lineage_path = alc.lineage_path
+                )
+            """),
+            params={"address_ids": list(connected_addresses)},
         )
         delete_result_2 = await session.exec(
-            AddressLineageClosure.__table__.delete().where(
-                AddressLineageClosure.target_address_id.in_(connected_addresses)
-            )
+            AddressLineageClosure.__table__.delete()
+            .where(AddressLineageClosure.target_address_id.in_(connected_addresses))
+            .where(AddressLineageClosure.source_address_id.not_in(connected_addresses))
         )
 
         total_deleted = delete_result_1.rowcount + delete_result_2.rowcount
         logger.info(
-            f"Deleted {total_deleted} closure records (source: {delete_result_1.rowcount}, target: {delete_result_2.rowcount}) for pipeline {pipeline_id}"
+            f"Deleted {total_deleted} stale closure records (source: {delete_result_1.rowcount}, target: {delete_result_2.rowcount}) for pipeline {pipeline_id}"
         )
 
-        closure_start_time = time.time()
-        # Holds records for insertion into the closure table
-        closure = set()
-
-        # Add self-references (depth 0) - using tuple for hashability
-        for n in connected_addresses:
-            closure.add((n, n, 0, tuple([n])))
-
-        # Add direct relationships (depth 1) - using tuples for hashability
-        for source_address, target_address in all_edges:
-            closure.add(
-                (
-                    source_address,
-                    target_address,
-                    1,
-                    tuple([source_address, target_address]),
+        # Every row still in place is identical to its new version
+        insert_result = await _insert_staged_closure(session)
+
+        await savepoint.commit()
+        await session.commit()
+        logger.info(
+            f"Inserted {insert_result} new closure records for pipeline {pipeline_id}, kept {new_closure_count - insert_result} unchanged"
+        )
+    except Exception:
+        if savepoint is not None:
+            await savepoint.rollback()
+        raise
+
+
+async def _closure_edges_close_cycle(
+    session: Session, edges: Set[Tuple[int, int]]
+) -> bool:
+    """Whether any edge points back at an address that already reaches its source"""
+    if any(
+        source_address_id == target_address_id
+        for source_address_id, target_address_id in edges
+    ):
+        return True
+
+    source_address_ids, target_address_ids = zip(*edges)
+    cycle_query = text("""
+        SELECT EXISTS (
+            SELECT 1
+            FROM unnest(
+                CAST(:source_address_ids AS INTEGER[]),
+                CAST(:target_address_ids AS INTEGER[])
+            ) AS edge(source_address_id, target_address_id)
+            INNER JOIN address_lineage_closure AS alc
+                ON alc.source_address_id = edge.target_address_id
+                AND alc.target_address_id = edge.source_address_id
+        )
+    """)
+    return (
+        await session.exec(
+            cycle_query,
+            params={
+                "source_address_ids": list(source_address_ids),
+                "target_address_ids": list(target_address_ids),
+            },
+        )
+    ).scalar_one()
+
+
+async def _add_closure_edge(
+    session: Session, source_address_id: int, target_address_id: int
+) -> int:
+    """Join every path ending at the source with every path leaving the target.
+
+    In an acyclic graph the lowest new path of each (source, target, depth)
+    is the lowest path up to the edge followed by the lowest path after it,
+    so the stored paths are all that is needed. An existing row is only
+    replaced when the new path sorts lower. Returns how many rows changed.
+    """
+    columns = ", ".join(CLOSURE_COLUMNS)
+    await session.exec(
+        text(f"""
+            INSERT INTO address_lineage_closure ({columns})
+            SELECT address_id, address_id, 0, ARRAY[address_id]
+            FROM unnest(CAST(:address_ids AS INTEGER[])) AS address_id
+            ON CONFLICT (source_address_id, target_address_id, depth) DO NOTHING
+        """),
+        params={"address_ids": [source_address_id, target_address_id]},
+    )
+    result = await session.exec(
+        text(f"""
+            INSERT INTO address_lineage_closure ({columns})
+            SELECT DISTINCT ON (
+                upstream.source_address_id,
+                downstream.target_address_id,
+                upstream.depth + downstream.depth + 1
+            )
+                upstream.source_address_id,
+                downstream.target_address_id,
+                upstream.depth + downstream.depth + 1,
+                upstream.lineage_path || downstream.lineage_path
+            FROM address_lineage_closure AS upstream
+            INNER JOIN address_lineage_closure AS downstream
+                ON downstream.source_address_id = :target_address_id
+            WHERE upstream.target_address_id = :source_address_id
+            ORDER BY
+                upstream.source_address_id,
+                downstream.target_address_id,
+                upstream.depth + downstream.depth + 1,
+                upstream.lineage_path || downstream.lineage_path
+            ON CONFLICT (source_address_id, target_address_id, depth) DO UPDATE
+            SET lineage_path = EXCLUDED.lineage_path
+            WHERE EXCLUDED.lineage_path < address_lineage_closure.lineage_path
+        """),
+        params={
+            "source_address_id": source_address_id,
+            "target_address_id": target_address_id,
+        },
+    )
+    return result.rowcount
+
+
+async def _remove_closure_edges(
+    session: Session, edges: Set[Tuple[int, int]], pipeline_id: int
+) -> tuple[int, int]:
+    """Drop the paths running through edges, then restore the surviving ones.
+
+    Only paths from an ancestor of a removed edge to one of its descendants
+    can run through it. Those are deleted when they contain the edge, and
+    the ancestors are walked again over the remaining edges so a (source,
+    target, depth) that still has another path gets its next lowest one.
+    Returns how many rows were deleted and inserted.
+    """
+    source_address_ids, target_address_ids = zip(*edges)
+    params = {
+        "source_address_ids": list(source_address_ids),
+        "target_address_ids": list(target_address_ids),
+    }
+    removed_edges_sql = """
+        unnest(
+            CAST(:source_address_ids AS INTEGER[]),
+            CAST(:target_address_ids AS INTEGER[])
+        ) AS removed(source_address_id, target_address_id)
+    """
+
+    # Collected before the delete, while the closure still reaches every
+    # address the remaining paths can go through
+    affected_query = text(f"""
+        WITH ancestors AS (
+            SELECT DISTINCT alc.source_address_id AS address_id
+            FROM {removed_edges_sql}
+            INNER JOIN address_lineage_closure AS alc
+                ON alc.target_address_id = removed.source_address_id
+        )
+        SELECT
+            ARRAY(SELECT address_id FROM ancestors) AS ancestor_ids,
+            ARRAY(
+                SELECT DISTINCT alc.target_address_id
+                FROM {removed_edges_sql}
+                INNER JOIN address_lineage_closure AS alc
+                    ON alc.source_address_id = removed.target_address_id
+            ) AS descendant_ids,
+            ARRAY(
+                SELECT ARRAY[al.source_address_id, al.target_address_id]
+                FROM address_lineage AS al
+                WHERE al.source_address_id IN (
+                    SELECT alc.target_address_id
+                    FROM address_lineage_closure AS alc
+                    INNER JOIN ancestors
+                        ON ancestors.address_id = alc.source_address_id
                 )
+            ) AS edges
+    """)
+    affected = (await session.exec(affected_query, params=params)).one()
+    if not affected.ancestor_ids or not affected.descendant_ids:
+        return 0, 0
+
+    delete_result = await session.exec(
+        text(f"""
+            DELETE FROM address_lineage_closure AS alc
+            USING {removed_edges_sql}
+            WHERE alc.source_address_id = ANY(:ancestor_ids)
+            AND alc.target_address_id = ANY(:descendant_ids)
+            AND alc.lineage_path[
+                array_position(alc.lineage_path, removed.source_address_id) + 1
+            ] = removed.target_address_id
+        """),
+        params={
+            **params,
+            "ancestor_ids": affected.ancestor_ids,
+            "descendant_ids": affected.descendant_ids,
+        },
+    )
+
+    descendant_ids = set(affected.descendant_ids)
+    remaining_edges = {
+        (source_address_id, target_address_id)
+        for source_address_id, target_address_id in affected.edges
+    }
+    max_paths = _closure_max_paths(
+        affected.ancestor_ids, remaining_edges, f"for pipeline {pipeline_id}"
+    )
+    await _copy_closure_to_staging(
+        session,
+        (
+            path
+            for path in compute_lineage_closure(
+                affected.ancestor_ids, remaining_edges, max_paths
             )
+            if path[1] in descendant_ids
+        ),
+    )
+    await _dedupe_staged_closure(session)
+    inserted = await _insert_staged_closure(session)
+    return delete_result.rowcount, inserted
 
-        # Propagate paths - extend from existing paths
-        added = True
-        while added:
-            added = False
-            new_transitive_paths = set()
-
-            # Loop through existing paths in closure
-            for (
-                existing_source_address,
-                existing_target_address,
-                existing_depth,
-                existing_lineage_path,
-            ) in closure:
-                # Skip self-references
-                if existing_depth == 0:
-                    continue
-                # Now Loop through all edges
-                for source_address, target_address in all_edges:
-                    # If a source address is the target address of an existing path, extend the lineage with the transitive path
-                    if source_address == existing_target_address:
-                        new_target_address = target_address
-                        new_depth = existing_depth + 1
-                        new_lineage_path = tuple(
-                            list(existing_lineage_path) + [target_address]
-                        )
-                        candidate = (
-                            existing_source_address,
-                            new_target_address,
-                            new_depth,
-                            new_lineage_path,
-                        )
-
-                        if candidate not in closure:
-                            new_transitive_paths.add(candidate)
-                            added = True
-
-            closure.update(new_transitive_paths)
 
-        # Log closure algorithm timing
-        closure_time = time.time() - closure_start_time
+async def _split_changed_edges(
+    session: Session, changed_edges: Set[Tuple[int, int]]
+) -> tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]:
+    """Split changed edges into the ones address_lineage has now and the rest"""
+    source_address_ids, target_address_ids = zip(*changed_edges)
+    existing_query = text("""
+        SELECT al.source_address_id, al.target_address_id
+        FROM unnest(
+            CAST(:source_address_ids AS INTEGER[]),
+            CAST(:target_address_ids AS INTEGER[])
+        ) AS edge(source_address_id, target_address_id)
+        INNER JOIN address_lineage AS al
+            ON al.source_address_id = edge.source_address_id
+            AND al.target_address_id = edge.target_address_id
+    """)
+    added_edges = {
+        (source_address_id, target_address_id)
+        for source_address_id, target_address_id in (
+            await session.exec(
+                existing_query,
+                params={
+                    "source_address_ids": list(source_address_ids),
+                    "target_address_ids": list(target_address_ids),
+                },
+            )
+        ).all()
+    }
+    return added_edges, changed_edges - added_edges
+
+
+async def db_update_closure_edges(
+    session: Session, changed_edges: Set[Tuple[int, int]], pipeline_id: int
+) -> bool:
+    """Apply lineage edge changes to the closure table in place.
+
+    Whether an edge was added or removed is read from address_lineage as it
+    stands, so changes merged from several posts apply their net effect.
+    Only the paths between the ancestors and descendants of the changed
+    edges are touched, instead of the whole component. Both algorithms rely
+    on the graph being acyclic, so when an added edge would close a cycle,
+    alone or with the edges added before it, nothing is changed and False is
+    returned for the caller to rebuild the component instead. A configured
+    WATCHER_LINEAGE_CLOSURE_MAX_PATHS also needs a rebuild, as added paths
+    would go past it, and so does a component a rebuild keeps to shortest
+    paths for a cycle or the path limit, since joining all of its paths would
+    not match.
+    """
+    if config.WATCHER_LINEAGE_CLOSURE_MAX_PATHS:
+        return False
+
+    added_edges, removed_edges = await _split_changed_edges(session, changed_edges)
+    if added_edges and await _closure_edges_close_cycle(session, added_edges):
         logger.info(
-            f"Closure algorithm completed for pipeline {pipeline_id}: {len(closure)} paths in {closure_time:.3f}s"
+            f"Added lineage edges close a cycle for pipeline {pipeline_id}, closure needs a rebuild"
         )
+        return False
 
-        closure_records = [
-            AddressLineageClosure(
-                source_address_id=source_address_id,
-                target_address_id=target_address_id,
-                depth=depth,
-                lineage_path=list(
-                    lineage_path
-                ),  # Convert tuple back to list for array storage
+    if added_edges:
+        component_addresses, component_edges = await _get_lineage_component(
+            session, {address_id for edge in added_edges for address_id in edge}
+        )
+        if _closure_max_paths(
+            component_addresses, component_edges, f"for pipeline {pipeline_id}"
+        ):
+            logger.info(
+                f"Added lineage edges leave only shortest paths for pipeline {pipeline_id}, closure needs a rebuild"
             )
-            for source_address_id, target_address_id, depth, lineage_path in closure
-        ]
+            return False
 
-        session.add_all(closure_records)
+    start_time = time.time()
+    savepoint = await session.begin_nested()
+    try:
+        deleted, inserted = 0, 0
+        if removed_edges:
+            deleted, inserted = await _remove_closure_edges(
+                session, removed_edges, pipeline_id
+            )
+
+        updated = 0
+        for source_address_id, target_address_id in sorted(added_edges):
+            # Edges merged from several posts can close a cycle together, which
+            # only shows in the closure once the earlier ones are added
+            if await _closure_edges_close_cycle(
+                session, {(source_address_id, target_address_id)}
+            ):
+                await savepoint.rollback()
+                logger.info(
+                    f"Added lineage edges close a cycle together for pipeline {pipeline_id}, closure needs a rebuild"
+                )
+                return False
+            updated += await _add_closure_edge(
+                session, source_address_id, target_address_id
+            )
 
         await savepoint.commit()
         await session.commit()
+    except Exception:
+        await savepoint.rollback()
+        raise
+
+    logger.info(
+        f"Closure updated in place for pipeline {pipeline_id} in {time.time() - start_time:.3f}s: {len(removed_edges)} edges removed ({deleted} paths deleted, {inserted} restored), {len(added_edges)} edges added ({updated} paths inserted or updated)"
+    )
+    return True
+
+
+async def db_maintain_closure_components(
+    session: Session,
+    address_pipelines: dict[int, int],
+    changed_edges: Set[Tuple[int, int]],
+) -> int:
+    """Bring the closure up to date around addresses merged from lineage posts.
+
+    address_pipelines maps each address to the pipeline that posted it. The
+    addresses are split into connected components so each one is handled
+    once, however many posts touched it. Every component is written under a
+    transaction advisory lock keyed by its lowest address, so two tasks wait
+    for each other instead of deadlocking on the same rows, and they all wait
+    for a full rebuild in progress. Returns how many components were
+    maintained.
+    """
+    changed_edges = set(changed_edges)
+    remaining = set(address_pipelines) | {
+        address_id for edge in changed_edges for address_id in edge
+    }
+    components = 0
+    while remaining:
+        component, _ = await _get_lineage_component(session, {min(remaining)})
+        remaining -= component
+        component_edges = {
+            edge
+            for edge in changed_edges
+            if edge[0] in component or edge[1] in component
+        }
+        changed_edges -= component_edges
+
+        # Only left with the far end of a removed edge, already handled with
+        # the component on the other side
+        posted_addresses = component & address_pipelines.keys()
+        if not posted_addresses and not component_edges:
+            continue
+
+        await session.exec(
+            text("SELECT pg_advisory_xact_lock_shared(:namespace, :lock_id)"),
+            params={
+                "namespace": CLOSURE_LOCK_NAMESPACE,
+                "lock_id": CLOSURE_FULL_REBUILD_LOCK_ID,
+            },
+        )
+        await session.exec(
+            text("SELECT pg_advisory_xact_lock(:namespace, :component_id)"),
+            params={
+                "namespace": CLOSURE_LOCK_NAMESPACE,
+                "component_id": min(component),
+            },
+        )
+
+        pipeline_id = (
+            address_pipelines[min(posted_addresses)]
+            if posted_addresses
+            else min(address_pipelines.values())
+        )
+        if not (
+            0 < len(component_edges) <= CLOSURE_INCREMENTAL_EDGE_LIMIT
+            and await db_update_closure_edges(session, component_edges, pipeline_id)
+        ):
+            await db_rebuild_closure_table_incremental(session, component, pipeline_id)
+        components += 1
+
+    return components
+
+
+def _lineage_components(
+    addresses: Iterable[int], edges: Iterable[Tuple[int, int]]
+) -> List[Tuple[List[int], List[Tuple[int, int]]]]:
+    """Split lineage into its connected components as (addresses, edges).
+
+    Union find with path halving, so every address and edge is visited about
+    once. Components come back ordered by their lowest address.
+    """
+    parents = {}
+
+    def find(address):
+        parents.setdefault(address, address)
+        while parents[address] != address:
+            parents[address] = parents[parents[address]]
+            address = parents[address]
+        return address
+
+    for address in addresses:
+        find(address)
+    edges = list(edges)
+    for source_address, target_address in edges:
+        source_root, target_root = find(source_address), find(target_address)
+        if source_root != target_root:
+            parents[max(source_root, target_root)] = min(source_root, target_root)
+
+    components = defaultdict(lambda: ([], []))
+    for address in sorted(parents):
+        components[find(address)][0].append(address)
+    for edge in edges:
+        components[find(edge[0])][1].append(edge)
+    return [components[root] for root in sorted(components)]
+
+
+def _batch_lineage_components(
+    components: List[Tuple[List[int], List[Tuple[int, int]]]],
+) -> List[List[Tuple[List[int], List[Tuple[int, int]]]]]:
+    """Group components into batches of about CLOSURE_REBUILD_BATCH_ADDRESSES
+    addresses, so small ones do not cost a worker round trip each"""
+    batches, batch, batch_addresses = [], [], 0
+    for component in components:
+        if (
+            batch
+            and batch_addresses + len(component[0]) > CLOSURE_REBUILD_BATCH_ADDRESSES
+        ):
+            batches.append(batch)
+            batch, batch_addresses = [], 0
+        batch.append(component)
+        batch_addresses += len(component[0])
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _compute_component_closures(
+    components: List[Tuple[List[int], List[Tuple[int, int]]]], chunks: Queue
+) -> None:
+    """Closure rows of a batch of components, run in a worker process.
+
+    Rows are put on chunks CLOSURE_REBUILD_CHUNK_ROWS at a time as they are
+    walked, then None once the batch is done, failed or not.
+    """
+    try:
+        chunk = []
+        for addresses, edges in components:
+            max_paths = _closure_max_paths(
+                addresses, edges, f"around address {addresses[0]}"
+            )
+            for row in compute_lineage_closure(addresses, edges, max_paths):
+                chunk.append(row)
+                if len(chunk) >= CLOSURE_REBUILD_CHUNK_ROWS:
+                    chunks.put(chunk)
+                    chunk = []
+        if chunk:
+            chunks.put(chunk)
+    finally:
+        chunks.put(None)
+
+
+def _closure_rows(
+    executor: ProcessPoolExecutor,
+    batches: List[List[Tuple[List[int], List[Tuple[int, int]]]]],
+    max_workers: int,
+) -> Iterator[Tuple[int, int, int, Tuple[int, ...]]]:
+    """Closure rows of the batches as the workers walk them.
+
+    Workers share a queue of two chunks per worker, so they wait for the COPY
+    instead of finished rows piling up ahead of it. A worker that dies without
+    finishing its batch is noticed while waiting on the queue.
+    """
+    with Manager() as manager:
+        chunks = manager.Queue(maxsize=2 * max_workers)
+        futures = [
+            executor.submit(_compute_component_closures, batch, chunks)
+            for batch in batches
+        ]
+        finished = 0
+        while finished < len(futures):
+            try:
+                chunk = chunks.get(timeout=1)
+            except Empty:
+                for future in futures:
+                    if future.done() and future.exception() is not None:
+                        raise future.exception()
+                continue
+            if chunk is None:
+                finished += 1
+            else:
+                yield from chunk
+        for future in futures:
+            future.result()
+
+
+async def db_rebuild_full_closure_table(
+    session: Session, max_workers: Optional[int] = None
+) -> dict[str, int]:
+    """Rebuild all of address_lineage_closure from address_lineage.
+
+    Lineage is split into connected components and their closures are
+    computed on a process pool of max_workers, defaulting to one per CPU.
+    Rows are streamed into the staging table with COPY in chunks as the
+    workers walk them, then diffed against the closure like a component rebuild, so rows
+    that did not change are kept. Component rebuilds wait on the lock held
+    until commit. Addresses without lineage keep their self-reference when
+    they already had one.
+    """
+    start_time = time.time()
+    await session.exec(
+        text("SELECT pg_advisory_xact_lock(:namespace, :lock_id)"),
+        params={
+            "namespace": CLOSURE_LOCK_NAMESPACE,
+            "lock_id": CLOSURE_FULL_REBUILD_LOCK_ID,
+        },
+    )
+
+    lineage = (
+        await session.exec(
+            text("""
+                SELECT
+                    ARRAY(
+                        SELECT source_address_id
+                        FROM address_lineage_closure
+                        WHERE depth = 0
+                    ) AS address_ids,
+                    ARRAY(
+                        SELECT ARRAY[source_address_id, target_address_id]
+                        FROM address_lineage
+                    ) AS edges
+            """)
+        )
+    ).one()
+    edges = [
+        (source_address_id, target_address_id)
+        for source_address_id, target_address_id in lineage.edges
+    ]
+    components = _lineage_components(lineage.address_ids, edges)
+    batches = _batch_lineage_components(components)
+    logger.info(
+        f"Rebuilding full closure table: {len(components)} components, {len(edges)} edges in {len(batches)} batches"
+    )
+
+    savepoint = None
+    try:
+        max_workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            staged = await _copy_closure_to_staging(
+                session, _closure_rows(executor, batches, max_workers)
+            )
+        closure_rows = await _dedupe_staged_closure(session)
         logger.info(
-            f"Inserted {len(closure_records)} closure records for pipeline {pipeline_id}"
+            f"Full closure computed: {staged} paths staged, {closure_rows} closure rows in {time.time() - start_time:.3f}s"
+        )
+
+        savepoint = await session.begin_nested()
+        delete_result = await session.exec(
+            text(f"""
+                DELETE FROM address_lineage_closure AS alc
+                WHERE NOT EXISTS (
+                    SELECT 1
+                    FROM {CLOSURE_DIFF_TABLE} AS new_closure
+                    WHERE new_closure.source_address_id = alc.source_address_id
+                    AND new_closure.target_address_id = alc.target_address_id
+                    AND new_closure.depth = alc.depth
+                    AND new_closure.lineage_path = alc.lineage_path
+                )
+            """)
         )
+        inserted = await _insert_staged_closure(session)
+
+        await savepoint.commit()
+        await session.commit()
     except Exception:
-        await savepoint.rollback()
+        if savepoint is not None:
+            await savepoint.rollback()
         raise
+
+    logger.info(
+        f"Full closure rebuild finished in {time.time() - start_time:.3f}s: deleted {delete_result.rowcount}, inserted {inserted}, kept {closure_rows - inserted} unchanged"
+    )
+    return {
+        "components": len(components),
+        "closure_rows": closure_rows,
+        "deleted": delete_result.rowcount,
+        "inserted": inserted,
+    }
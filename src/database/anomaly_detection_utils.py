@@ -1,30 +1,50 @@
+import calendar
+import math
+import random
 import statistics
+from collections import deque
+from datetime import timedelta
 from typing import Optional
 
 import pendulum
 import structlog
 from fastapi import HTTPException, Response, status
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import bindparam, delete, func, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import NoResultFound
 from sqlmodel import Session
 
+from src.anomaly_baseline_cache import (
+    cache_baseline_bounds,
+    invalidate_baseline_bounds,
+)
 from src.database.models.anomaly_detection import (
+    AnomalyDetectionBaselineSample,
     AnomalyDetectionResult,
     AnomalyDetectionRule,
 )
 from src.database.models.pipeline import Pipeline
 from src.database.models.pipeline_execution import PipelineExecution
 from src.models.anomaly_detection import (
+    AnomalyDetectionBackfillPostInput,
     AnomalyDetectionRulePatchInput,
     AnomalyDetectionRulePostInput,
     AnomalyDetectionRulePostOutput,
     UnflagAnomalyInput,
 )
 from src.notifier import AlertLevel, send_slack_message
-from src.types import AnomalyMetricFieldEnum
+from src.types import (
+    ANOMALY_METRIC_FLAG_BITS,
+    AnomalyMetricFieldEnum,
+    anomaly_flags_to_mask,
+)
 
 logger = structlog.get_logger(__name__)
 
+# Rows per INSERT when writing backfill results, 11 columns stays well under
+# the PostgreSQL parameter limit of 65,535
+BACKFILL_WRITE_BATCH_SIZE = 1000
+
 
 async def db_get_or_create_anomaly_detection_rule(
     session: Session, rule: AnomalyDetectionRulePostInput, response: Response
@@ -52,6 +72,7 @@ async def db_get_or_create_anomaly_detection_rule(
         )
         rule_id = (await session.exec(stmt)).scalar_one()
         await session.commit()
+        await invalidate_baseline_bounds(rule.pipeline_id)
         created = True
         logger.info(
             f"Anomaly Detection Rule: {rule.metric_field.value} for pipeline {rule.pipeline_id} Successfully Created"
@@ -81,9 +102,18 @@ async def db_update_anomaly_detection_rule(
     for field, value in update_data.items():
         setattr(rule, field, value)
 
+    # Sampled baselines no longer match the rule, reseed them on next detection
+    if update_data.keys() & {"metric_field", "lookback_days", "baseline_sample_size"}:
+        await session.exec(
+            delete(AnomalyDetectionBaselineSample).where(
+                AnomalyDetectionBaselineSample.rule_id == rule.id
+            )
+        )
+
     session.add(rule)
     await session.commit()
     await session.refresh(rule)
+    await invalidate_baseline_bounds(rule.pipeline_id)
     return rule
 
 
@@ -156,7 +186,10 @@ async def db_unflag_anomaly(session: Session, input: UnflagAnomalyInput):
         await session.exec(
             update(PipelineExecution)
             .where(PipelineExecution.id == input.pipeline_execution_id)
-            .values(anomaly_flags=anomaly_flags_new)
+            .values(
+                anomaly_flags=anomaly_flags_new,
+                anomaly_flag_mask=anomaly_flags_to_mask(anomaly_flags_new),
+            )
         )
 
         await savepoint.commit()
@@ -171,6 +204,136 @@ async def db_unflag_anomaly(session: Session, input: UnflagAnomalyInput):
     )
 
 
+def _encode_anomaly_cursor(
+    detected_at: pendulum.DateTime, pipeline_execution_id: int, rule_id: int
+) -> str:
+    # Microseconds since epoch keeps the cursor exact and URL safe
+    detected_at_us = (
+        calendar.timegm(detected_at.utctimetuple()) * 1_000_000
+        + detected_at.microsecond
+    )
+    return f"{detected_at_us}_{pipeline_execution_id}_{rule_id}"
+
+
+def _decode_anomaly_cursor(cursor: str) -> tuple[pendulum.DateTime, int, int]:
+    try:
+        detected_at_us, pipeline_execution_id, rule_id = (
+            int(part) for part in cursor.split("_")
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return (
+        pendulum.from_timestamp(detected_at_us // 1_000_000).add(
+            microseconds=detected_at_us % 1_000_000
+        ),
+        pipeline_execution_id,
+        rule_id,
+    )
+
+
+async def db_get_anomalies(
+    session: Session,
+    pipeline_id: Optional[int] = None,
+    pipeline_type_id: Optional[int] = None,
+    metric_field: Optional[AnomalyMetricFieldEnum] = None,
+    rule_id: Optional[int] = None,
+    start_date: Optional[pendulum.DateTime] = None,
+    end_date: Optional[pendulum.DateTime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> dict:
+    """Newest first page of anomaly results, keyset paginated on detected_at"""
+    filters = []
+    if pipeline_id is not None:
+        filters.append(AnomalyDetectionRule.pipeline_id == pipeline_id)
+    if pipeline_type_id is not None:
+        filters.append(Pipeline.pipeline_type_id == pipeline_type_id)
+    if metric_field is not None:
+        filters.append(AnomalyDetectionRule.metric_field == metric_field)
+    if rule_id is not None:
+        filters.append(AnomalyDetectionResult.rule_id == rule_id)
+    if start_date is not None:
+        filters.append(AnomalyDetectionResult.detected_at >= start_date)
+    if end_date is not None:
+        filters.append(AnomalyDetectionResult.detected_at < end_date)
+
+    keyset = (
+        AnomalyDetectionResult.detected_at,
+        AnomalyDetectionResult.pipeline_execution_id,
+        AnomalyDetectionResult.rule_id,
+    )
+    page_filters = list(filters)
+    if cursor is not None:
+        page_filters.append(tuple_(*keyset) < tuple_(*_decode_anomaly_cursor(cursor)))
+
+    # Fetch one extra row to know whether there is a next page
+    rows = (
+        await session.exec(
+            select(
+                AnomalyDetectionResult.pipeline_execution_id,
+                AnomalyDetectionResult.rule_id,
+                AnomalyDetectionRule.pipeline_id,
+                Pipeline.name.label("pipeline_name"),
+                AnomalyDetectionRule.metric_field,
+                AnomalyDetectionResult.violation_value,
+                AnomalyDetectionResult.z_score,
+                AnomalyDetectionResult.historical_mean,
+                AnomalyDetectionResult.std_deviation_value,
+                AnomalyDetectionResult.z_threshold,
+                AnomalyDetectionResult.threshold_min_value,
+                AnomalyDetectionResult.threshold_max_value,
+                AnomalyDetectionResult.context,
+                AnomalyDetectionResult.detected_at,
+            )
+            .join(
+                AnomalyDetectionRule,
+                AnomalyDetectionRule.id == AnomalyDetectionResult.rule_id,
+            )
+            .join(Pipeline, Pipeline.id == AnomalyDetectionRule.pipeline_id)
+            .where(*page_filters)
+            .order_by(*(column.desc() for column in keyset))
+            .limit(limit + 1)
+        )
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_anomaly_cursor(
+            last.detected_at, last.pipeline_execution_id, last.rule_id
+        )
+
+    # Counts cover every page, so only pay for them once
+    summary = None
+    if cursor is None:
+        summary_rows = (
+            await session.exec(
+                select(
+                    AnomalyDetectionRule.pipeline_id,
+                    Pipeline.name.label("pipeline_name"),
+                    func.count().label("anomalies"),
+                )
+                .select_from(AnomalyDetectionResult)
+                .join(
+                    AnomalyDetectionRule,
+                    AnomalyDetectionRule.id == AnomalyDetectionResult.rule_id,
+                )
+                .join(Pipeline, Pipeline.id == AnomalyDetectionRule.pipeline_id)
+                .where(*filters)
+                .group_by(AnomalyDetectionRule.pipeline_id, Pipeline.name)
+                .order_by(func.count().desc(), AnomalyDetectionRule.pipeline_id)
+            )
+        ).all()
+        summary = [dict(row._mapping) for row in summary_rows]
+
+    return {
+        "data": [dict(row._mapping) for row in rows],
+        "next_cursor": next_cursor,
+        "summary": summary,
+    }
+
+
 async def db_detect_anomalies_for_pipeline_execution(
     session: Session, pipeline_id: int, pipeline_execution_id: int
 ):
@@ -197,63 +360,102 @@ async def db_detect_anomalies_for_pipeline_execution(
         AnomalyDetectionRule.minimum_executions,
         AnomalyDetectionRule.metric_field,
         AnomalyDetectionRule.z_threshold,
+        AnomalyDetectionRule.baseline_sample_size,
     ).where(AnomalyDetectionRule.id.in_(rule_ids))
 
     rules = (await session.exec(rules_query)).all()
     rule_ids.clear()
 
-    max_lookback_days = max(rule.lookback_days for rule in rules)
-    all_same_lookback = all(rule.lookback_days == max_lookback_days for rule in rules)
-    lookback_date = pendulum.now("UTC").subtract(days=max_lookback_days)
+    # Sampled rules keep a bounded reservoir instead of scanning the lookback window
+    sampled_rules = [rule for rule in rules if rule.baseline_sample_size]
+    full_rules = [rule for rule in rules if not rule.baseline_sample_size]
+
+    current_columns = [PipelineExecution.hour_recorded, PipelineExecution.end_date]
+    for rule in sampled_rules:
+        current_columns.append(getattr(PipelineExecution, rule.metric_field.value))
 
-    hour_recorded = (
+    current_execution = (
         await session.exec(
-            select(PipelineExecution.hour_recorded).where(
+            select(*current_columns).where(
                 PipelineExecution.id == pipeline_execution_id
             )
         )
-    ).scalar_one()
-
-    ids_query = (
-        select(PipelineExecution.id)
-        .where(PipelineExecution.pipeline_id == pipeline_id)
-        .where(PipelineExecution.hour_recorded == hour_recorded)
-        .where(PipelineExecution.end_date >= lookback_date)
-        .where(PipelineExecution.end_date.is_not(None))
-        .where(PipelineExecution.completed_successfully == True)
-    )
-    execution_ids = (await session.exec(ids_query)).scalars().all()
+    ).one()
+    hour_recorded = current_execution.hour_recorded
+
+    all_executions = []
+    all_same_lookback = True
+    if full_rules:
+        max_lookback_days = max(rule.lookback_days for rule in full_rules)
+        all_same_lookback = all(
+            rule.lookback_days == max_lookback_days for rule in full_rules
+        )
+        lookback_date = pendulum.now("UTC").subtract(days=max_lookback_days)
+
+        # Executions already flagged on every metric can't be in any baseline
+        rules_mask = 0
+        for rule in full_rules:
+            rules_mask |= ANOMALY_METRIC_FLAG_BITS[rule.metric_field]
+
+        ids_query = (
+            select(PipelineExecution.id)
+            .where(PipelineExecution.pipeline_id == pipeline_id)
+            .where(PipelineExecution.hour_recorded == hour_recorded)
+            .where(PipelineExecution.end_date >= lookback_date)
+            .where(PipelineExecution.end_date.is_not(None))
+            .where(PipelineExecution.completed_successfully == True)
+            .where(
+                or_(
+                    PipelineExecution.id == pipeline_execution_id,
+                    PipelineExecution.anomaly_flag_mask.op("&")(rules_mask)
+                    != rules_mask,
+                )
+            )
+        )
+        execution_ids = (await session.exec(ids_query)).scalars().all()
 
-    base_columns = [PipelineExecution.id, PipelineExecution.anomaly_flags]
-    if not all_same_lookback:
-        base_columns.append(PipelineExecution.end_date)
+        base_columns = [PipelineExecution.id, PipelineExecution.anomaly_flag_mask]
+        if not all_same_lookback:
+            base_columns.append(PipelineExecution.end_date)
 
-    # Only bring in metric columns we actually need from pipeline execution
-    for rule in rules:
-        metric_field = rule.metric_field.value
-        if hasattr(PipelineExecution, metric_field):
-            base_columns.append(getattr(PipelineExecution, metric_field))
+        # Only bring in metric columns we actually need from pipeline execution
+        for rule in full_rules:
+            metric_field = rule.metric_field.value
+            if hasattr(PipelineExecution, metric_field):
+                base_columns.append(getattr(PipelineExecution, metric_field))
 
-    # PK seek for execution data
-    executions_query = select(*base_columns).where(
-        PipelineExecution.id.in_(execution_ids)
-    )
-    all_executions = (await session.exec(executions_query)).all()
+        # PK seek for execution data
+        executions_query = select(*base_columns).where(
+            PipelineExecution.id.in_(execution_ids)
+        )
+        all_executions = (await session.exec(executions_query)).all()
 
     # Collect all anomaly results and flags
     anomaly_results = []
     anomaly_flags = {}
     anomaly_metrics = []
+    baseline_bounds = {}
 
     for rule in rules:
         try:
-            anomaly_data = await _detect_anomalies_for_rule_batch(
-                session,
-                rule,
-                all_executions,
-                all_same_lookback,
-                pipeline_execution_id,
-            )
+            if rule.baseline_sample_size:
+                anomaly_data = await _detect_anomalies_for_sampled_rule(
+                    session,
+                    rule,
+                    current_execution,
+                    pipeline_id,
+                    pipeline_execution_id,
+                    baseline_bounds,
+                )
+            else:
+                anomaly_data = await _detect_anomalies_for_rule_batch(
+                    session,
+                    rule,
+                    all_executions,
+                    all_same_lookback,
+                    pipeline_execution_id,
+                    baseline_bounds,
+                )
 
             if anomaly_data:
                 anomaly_results.append(AnomalyDetectionResult(**anomaly_data))
@@ -266,6 +468,17 @@ async def db_detect_anomalies_for_pipeline_execution(
             )
             continue
 
+    if sampled_rules and not anomaly_results:
+        # Persist the reservoir updates
+        await session.commit()
+
+    # Only cache when every rule has bounds, otherwise the inline pre-check
+    # at end_pipeline_execution could skip a rule it knows nothing about.
+    # Sampled rules are never cached, their reservoir has to see every
+    # in-range value or it drifts towards the outliers.
+    if not sampled_rules and len(baseline_bounds) == len(rules):
+        await cache_baseline_bounds(pipeline_id, hour_recorded, baseline_bounds)
+
     if anomaly_results:
         savepoint = await session.begin_nested()
         try:
@@ -274,7 +487,10 @@ async def db_detect_anomalies_for_pipeline_execution(
             await session.exec(
                 update(PipelineExecution)
                 .where(PipelineExecution.id == pipeline_execution_id)
-                .values(anomaly_flags=anomaly_flags)
+                .values(
+                    anomaly_flags=anomaly_flags,
+                    anomaly_flag_mask=anomaly_flags_to_mask(anomaly_flags),
+                )
             )
 
             await savepoint.commit()
@@ -308,6 +524,7 @@ async def _detect_anomalies_for_rule_batch(
     executions: list,
     all_same_lookback: bool,
     current_execution_id: int,
+    baseline_bounds: Optional[dict] = None,
 ) -> Optional[dict]:  # Return anomaly data dict or None
     logger.info(
         f"Detecting anomalies for rule '{rule.metric_field.value}' on pipeline {rule.pipeline_id} for execution {current_execution_id}"
@@ -338,9 +555,7 @@ async def _detect_anomalies_for_rule_batch(
             continue
 
         # Skip executions that have anomalies for THIS SPECIFIC METRIC
-        if execution.anomaly_flags and execution.anomaly_flags.get(
-            rule.metric_field.value, False
-        ):
+        if execution.anomaly_flag_mask & ANOMALY_METRIC_FLAG_BITS[rule.metric_field]:
             continue  # Skip this execution for baseline calculation, will skew
 
         metric_value = getattr(execution, rule.metric_field.value)
@@ -360,6 +575,7 @@ async def _detect_anomalies_for_rule_batch(
 
     baseline_mean = statistics.mean(metric_values)
     baseline_std = statistics.stdev(metric_values) if len(metric_values) > 1 else 0
+    execution_count = len(metric_values)
     metric_values.clear()
 
     # Handle case where std dev is 0 (all values are identical, like 0 rows)
@@ -369,12 +585,14 @@ async def _detect_anomalies_for_rule_batch(
         )
         return
 
-    # Calculate threshold values for easy reference
-    # Min threshold can't be below zero for metrics like duration, rows, etc.
-    threshold_min_value = max(
-        0, baseline_mean - (float(rule.z_threshold) * baseline_std)
+    threshold_min_value, threshold_max_value = _calculate_threshold_range(
+        rule, baseline_mean, baseline_std
     )
-    threshold_max_value = baseline_mean + (float(rule.z_threshold) * baseline_std)
+    if baseline_bounds is not None:
+        baseline_bounds[rule.metric_field.value] = (
+            threshold_min_value,
+            threshold_max_value,
+        )
 
     logger.info(
         f"Pipeline {rule.pipeline_id}: Checking current execution {current_execution_id} for anomalies on rule '{rule.metric_field.value}': Threshold range: [{threshold_min_value}, {threshold_max_value}], Baseline mean: {baseline_mean}, Baseline std: {baseline_std}"
@@ -397,29 +615,269 @@ async def _detect_anomalies_for_rule_batch(
     )
 
     if is_anomaly:
-        # Calculate z-score for context (how many standard deviations from mean)
-        z_score = (current_value - baseline_mean) / baseline_std
-
-        return {
-            "pipeline_execution_id": current_execution.id,
-            "rule_id": rule.id,
-            "violation_value": current_value,
-            "historical_mean": baseline_mean,
-            "std_deviation_value": baseline_std,
-            "z_threshold": float(rule.z_threshold),
-            "threshold_min_value": threshold_min_value,
-            "threshold_max_value": threshold_max_value,
-            "z_score": z_score,
-            "context": {
-                "lookback_days": rule.lookback_days,
-                "minimum_executions": rule.minimum_executions,
-                "execution_count": len(metric_values),
-            },
-        }
+        return _build_anomaly_result(
+            rule,
+            current_execution.id,
+            current_value,
+            baseline_mean,
+            baseline_std,
+            threshold_min_value,
+            threshold_max_value,
+            execution_count,
+        )
 
     return None
 
 
+async def _detect_anomalies_for_sampled_rule(
+    session: Session,
+    rule: AnomalyDetectionRule,
+    current_execution,
+    pipeline_id: int,
+    current_execution_id: int,
+    baseline_bounds: Optional[dict] = None,
+) -> Optional[dict]:
+    """Score the current execution against the rule's reservoir for its hour.
+
+    The reservoir holds at most baseline_sample_size values, so memory and
+    latency stay flat no matter how often the pipeline runs.
+    """
+    metric_field = rule.metric_field.value
+    hour_recorded = current_execution.hour_recorded
+    lookback_date = pendulum.now("UTC").subtract(days=rule.lookback_days)
+
+    # Lock the reservoir so concurrent executions don't overwrite each other
+    reservoir = (
+        await session.exec(
+            select(
+                AnomalyDetectionBaselineSample.seen_count,
+                AnomalyDetectionBaselineSample.sample,
+            )
+            .where(
+                AnomalyDetectionBaselineSample.rule_id == rule.id,
+                AnomalyDetectionBaselineSample.hour_recorded == hour_recorded,
+            )
+            .with_for_update()
+        )
+    ).one_or_none()
+
+    if reservoir is None:
+        seen_count, sample = await _seed_baseline_sample(
+            session, rule, pipeline_id, hour_recorded, current_execution_id
+        )
+    else:
+        seen_count, sample = reservoir.seen_count, reservoir.sample
+
+    # Drop values that aged out of the lookback window, scaling the seen
+    # count down with them so replacement odds stay roughly uniform
+    lookback_epoch = lookback_date.timestamp()
+    sample_count = len(sample)
+    sample = [entry for entry in sample if entry[0] >= lookback_epoch]
+    expired_count = sample_count - len(sample)
+    if expired_count:
+        seen_count = max(
+            len(sample), seen_count - round(expired_count * seen_count / sample_count)
+        )
+    if len(sample) > rule.baseline_sample_size:
+        sample = random.sample(sample, rule.baseline_sample_size)
+
+    anomaly_data = None
+    current_value = getattr(current_execution, metric_field)
+    if current_value is not None and metric_field == "throughput":
+        current_value = float(current_value)
+
+    if len(sample) < rule.minimum_executions:
+        logger.warning(
+            f"Pipeline {rule.pipeline_id}: Not enough sampled values for rule '{metric_field}': {len(sample)} < {rule.minimum_executions}"
+        )
+    elif current_value is None:
+        logger.info(
+            f"Pipeline {rule.pipeline_id}: No metric value for rule '{metric_field}' for current execution {current_execution_id}"
+        )
+    else:
+        metric_values = [value for _, value in sample]
+        baseline_mean = statistics.mean(metric_values)
+        baseline_std = statistics.stdev(metric_values)
+
+        if baseline_std == 0:
+            logger.warning(
+                f"Pipeline {rule.pipeline_id}: No variance in data for rule '{metric_field}', skipping anomaly detection"
+            )
+        else:
+            threshold_min_value, threshold_max_value = _calculate_threshold_range(
+                rule, baseline_mean, baseline_std
+            )
+            if baseline_bounds is not None:
+                baseline_bounds[metric_field] = (
+                    threshold_min_value,
+                    threshold_max_value,
+                )
+            logger.info(
+                f"Pipeline {rule.pipeline_id}: Checking current execution {current_execution_id} for anomalies on rule '{metric_field}' against {len(sample)} sampled values: Threshold range: [{threshold_min_value}, {threshold_max_value}], Baseline mean: {baseline_mean}, Baseline std: {baseline_std}"
+            )
+            if (
+                current_value > threshold_max_value
+                or current_value < threshold_min_value
+            ):
+                anomaly_data = _build_anomaly_result(
+                    rule,
+                    current_execution_id,
+                    current_value,
+                    baseline_mean,
+                    baseline_std,
+                    threshold_min_value,
+                    threshold_max_value,
+                    len(sample),
+                )
+                anomaly_data["context"]["baseline_sample_size"] = (
+                    rule.baseline_sample_size
+                )
+
+    # Anomalies stay out of the baseline so they don't skew it
+    if anomaly_data is None and current_value is not None:
+        seen_count = _add_to_reservoir(
+            sample,
+            seen_count,
+            [current_execution.end_date.timestamp(), current_value],
+            rule.baseline_sample_size,
+        )
+
+    await session.exec(
+        insert(AnomalyDetectionBaselineSample)
+        .values(
+            rule_id=rule.id,
+            hour_recorded=hour_recorded,
+            seen_count=seen_count,
+            sample=sample,
+        )
+        .on_conflict_do_update(
+            index_elements=["rule_id", "hour_recorded"],
+            set_={
+                "seen_count": seen_count,
+                "sample": sample,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+    return anomaly_data
+
+
+async def _seed_baseline_sample(
+    session: Session,
+    rule: AnomalyDetectionRule,
+    pipeline_id: int,
+    hour_recorded: int,
+    current_execution_id: int,
+) -> tuple[int, list]:
+    """Draw the first reservoir straight from execution history"""
+    metric_field = rule.metric_field.value
+    metric_column = getattr(PipelineExecution, metric_field)
+    lookback_date = pendulum.now("UTC").subtract(days=rule.lookback_days)
+
+    rows = (
+        await session.exec(
+            select(
+                PipelineExecution.end_date,
+                metric_column,
+                func.count().over().label("seen_count"),
+            )
+            .where(PipelineExecution.pipeline_id == pipeline_id)
+            .where(PipelineExecution.hour_recorded == hour_recorded)
+            .where(PipelineExecution.end_date >= lookback_date)
+            .where(PipelineExecution.completed_successfully == True)
+            .where(PipelineExecution.id != current_execution_id)
+            .where(metric_column.is_not(None))
+            .where(
+                PipelineExecution.anomaly_flag_mask.op("&")(
+                    ANOMALY_METRIC_FLAG_BITS[rule.metric_field]
+                )
+                == 0
+            )
+            .order_by(func.random())
+            .limit(rule.baseline_sample_size)
+        )
+    ).all()
+
+    logger.info(
+        f"Pipeline {rule.pipeline_id}: Seeded baseline sample for rule '{metric_field}' hour {hour_recorded} with {len(rows)} values"
+    )
+    if not rows:
+        return 0, []
+
+    sample = [
+        [
+            row.end_date.timestamp(),
+            float(row[1]) if metric_field == "throughput" else row[1],
+        ]
+        for row in rows
+    ]
+    return rows[0].seen_count, sample
+
+
+def _add_to_reservoir(
+    sample: list, seen_count: int, entry: list, sample_size: int
+) -> int:
+    """Reservoir sampling (Algorithm R), every value seen has equal odds of being kept"""
+    seen_count += 1
+    if len(sample) < sample_size:
+        sample.append(entry)
+    else:
+        replace_index = random.randrange(seen_count)
+        if replace_index < sample_size:
+            sample[replace_index] = entry
+    return seen_count
+
+
+def _calculate_threshold_range(
+    rule: AnomalyDetectionRule, baseline_mean: float, baseline_std: float
+) -> tuple[float, float]:
+    """Calculate the (min, max) values an execution must fall between to be normal"""
+    # Min threshold can't be below zero for metrics like duration, rows, etc.
+    threshold_min_value = max(
+        0, baseline_mean - (float(rule.z_threshold) * baseline_std)
+    )
+    threshold_max_value = baseline_mean + (float(rule.z_threshold) * baseline_std)
+    return threshold_min_value, threshold_max_value
+
+
+def _build_anomaly_result(
+    rule: AnomalyDetectionRule,
+    pipeline_execution_id: int,
+    current_value: float,
+    baseline_mean: float,
+    baseline_std: float,
+    threshold_min_value: float,
+    threshold_max_value: float,
+    execution_count: int,
+    detected_at: Optional[pendulum.DateTime] = None,
+) -> dict:
+    # Calculate z-score for context (how many standard deviations from mean)
+    z_score = (current_value - baseline_mean) / baseline_std
+
+    anomaly_result = {
+        "pipeline_execution_id": pipeline_execution_id,
+        "rule_id": rule.id,
+        "violation_value": current_value,
+        "historical_mean": baseline_mean,
+        "std_deviation_value": baseline_std,
+        "z_threshold": float(rule.z_threshold),
+        "threshold_min_value": threshold_min_value,
+        "threshold_max_value": threshold_max_value,
+        "z_score": z_score,
+        "context": {
+            "lookback_days": rule.lookback_days,
+            "minimum_executions": rule.minimum_executions,
+            "execution_count": execution_count,
+        },
+    }
+    # Left to the insert-time default unless the execution is scored later,
+    # like a backfill does, so the result dates from when the execution ran
+    if detected_at is not None:
+        anomaly_result["detected_at"] = detected_at
+    return anomaly_result
+
+
 async def _send_anomaly_alert(
     session: Session,
     pipeline_id: int,
@@ -455,3 +913,305 @@ async def _send_anomaly_alert(
         logger.error(
             f"Failed to send Slack notification for anomalies on pipeline '{pipeline_name}' for execution {pipeline_execution_id}: {e}"
         )
+
+
+# ============================================================================
+# BACKFILL
+# ============================================================================
+
+
+class _RollingBaseline:
+    """Sliding lookback window of baseline values with running sums.
+
+    Values are scaled to integers so the sums stay exact while executions
+    enter and leave the window, keeping a zero variance exactly zero.
+    """
+
+    def __init__(self, scale: int):
+        self.scale = scale
+        self.window = deque()
+        self.count = 0
+        self.total = 0
+        self.total_squared = 0
+
+    def add(self, end_date, value) -> None:
+        units = int(round(value * self.scale))
+        self.window.append((end_date, units))
+        self.count += 1
+        self.total += units
+        self.total_squared += units * units
+
+    def evict(self, cutoff) -> None:
+        while self.window and self.window[0][0] < cutoff:
+            _, units = self.window.popleft()
+            self.count -= 1
+            self.total -= units
+            self.total_squared -= units * units
+
+    def mean(self) -> float:
+        return self.total / self.count / self.scale
+
+    def stdev(self) -> float:
+        if self.count < 2:
+            return 0
+        variance = (self.count * self.total_squared - self.total * self.total) / (
+            self.count * (self.count - 1)
+        )
+        return math.sqrt(max(variance, 0)) / self.scale
+
+
+async def db_get_anomaly_backfill_pipeline_ids(
+    session: Session, backfill: AnomalyDetectionBackfillPostInput
+) -> list[int]:
+    """Get the pipelines with active rules that fall within the backfill scope"""
+    query = (
+        select(AnomalyDetectionRule.pipeline_id)
+        .where(AnomalyDetectionRule.active == True)
+        .distinct()
+    )
+    if backfill.pipeline_id is not None:
+        query = query.where(AnomalyDetectionRule.pipeline_id == backfill.pipeline_id)
+    if backfill.pipeline_type_id is not None:
+        query = query.join(
+            Pipeline, Pipeline.id == AnomalyDetectionRule.pipeline_id
+        ).where(Pipeline.pipeline_type_id == backfill.pipeline_type_id)
+
+    return sorted((await session.exec(query)).scalars().all())
+
+
+async def db_backfill_anomalies_for_pipelines(
+    session: Session,
+    pipeline_ids: list[int],
+    start_date: pendulum.DateTime,
+    end_date: pendulum.DateTime,
+) -> dict:
+    """Re-score every successful execution between start_date and end_date.
+
+    Each execution is compared against the baseline it would have had at the
+    time it ran, and results are written in bulk per pipeline. No alerts are
+    sent, the anomalies are historical.
+    """
+    total_scored = 0
+    total_anomalies = 0
+    for pipeline_id in pipeline_ids:
+        scored, anomalies = await _backfill_anomalies_for_pipeline(
+            session, pipeline_id, start_date, end_date
+        )
+        total_scored += scored
+        total_anomalies += anomalies
+
+    logger.info(
+        f"Anomaly backfill completed for {len(pipeline_ids)} pipeline(s): {total_scored} executions re-scored, {total_anomalies} anomalies flagged"
+    )
+    return {
+        "pipelines": len(pipeline_ids),
+        "executions_scored": total_scored,
+        "anomalies": total_anomalies,
+    }
+
+
+async def _backfill_anomalies_for_pipeline(
+    session: Session,
+    pipeline_id: int,
+    start_date: pendulum.DateTime,
+    end_date: pendulum.DateTime,
+) -> tuple[int, int]:
+    rules = (
+        await session.exec(
+            select(
+                AnomalyDetectionRule.id,
+                AnomalyDetectionRule.pipeline_id,
+                AnomalyDetectionRule.lookback_days,
+                AnomalyDetectionRule.minimum_executions,
+                AnomalyDetectionRule.metric_field,
+                AnomalyDetectionRule.z_threshold,
+            ).where(
+                AnomalyDetectionRule.pipeline_id == pipeline_id,
+                AnomalyDetectionRule.active == True,
+            )
+        )
+    ).all()
+
+    if not rules:
+        logger.info(f"No active rules found for pipeline {pipeline_id}")
+        return 0, 0
+
+    history_start = start_date.subtract(days=max(rule.lookback_days for rule in rules))
+
+    total_scored = 0
+    total_anomalies = 0
+    savepoint = await session.begin_nested()
+    try:
+        # Clear previous results for the re-scored rules inside the range
+        await session.exec(
+            delete(AnomalyDetectionResult).where(
+                AnomalyDetectionResult.rule_id.in_([rule.id for rule in rules]),
+                AnomalyDetectionResult.pipeline_execution_id.in_(
+                    select(PipelineExecution.id).where(
+                        PipelineExecution.pipeline_id == pipeline_id,
+                        PipelineExecution.end_date >= start_date,
+                        PipelineExecution.end_date <= end_date,
+                    )
+                ),
+            )
+        )
+
+        # One hour bucket at a time keeps memory bounded and seeks the hour index
+        for hour_recorded in range(24):
+            scored, anomaly_results, flag_updates = await _backfill_hour_bucket(
+                session,
+                rules,
+                pipeline_id,
+                hour_recorded,
+                history_start,
+                start_date,
+                end_date,
+            )
+            total_scored += scored
+            total_anomalies += len(anomaly_results)
+
+            for i in range(0, len(anomaly_results), BACKFILL_WRITE_BATCH_SIZE):
+                await session.exec(
+                    insert(AnomalyDetectionResult)
+                    .values(anomaly_results[i : i + BACKFILL_WRITE_BATCH_SIZE])
+                    .on_conflict_do_nothing()
+                )
+
+            if flag_updates:
+                await session.exec(
+                    PipelineExecution.__table__.update()
+                    .where(
+                        PipelineExecution.__table__.c.id == bindparam("execution_id")
+                    )
+                    .values(
+                        anomaly_flags=bindparam("flags"),
+                        anomaly_flag_mask=bindparam("flag_mask"),
+                    ),
+                    params=flag_updates,
+                )
+
+        await savepoint.commit()
+        await session.commit()
+    except Exception:
+        await savepoint.rollback()
+        raise
+
+    logger.info(
+        f"Pipeline {pipeline_id}: backfill re-scored {total_scored} executions, {total_anomalies} anomalies flagged"
+    )
+    return total_scored, total_anomalies
+
+
+async def _backfill_hour_bucket(
+    session: Session,
+    rules: list,
+    pipeline_id: int,
+    hour_recorded: int,
+    history_start: pendulum.DateTime,
+    start_date: pendulum.DateTime,
+    end_date: pendulum.DateTime,
+) -> tuple[int, list[dict], list[dict]]:
+    columns = [
+        PipelineExecution.id,
+        PipelineExecution.end_date,
+        PipelineExecution.anomaly_flags,
+        PipelineExecution.anomaly_flag_mask,
+    ]
+    for rule in rules:
+        columns.append(getattr(PipelineExecution, rule.metric_field.value))
+
+    executions = (
+        await session.exec(
+            select(*columns)
+            .where(PipelineExecution.pipeline_id == pipeline_id)
+            .where(PipelineExecution.hour_recorded == hour_recorded)
+            .where(PipelineExecution.end_date >= history_start)
+            .where(PipelineExecution.end_date <= end_date)
+            .where(PipelineExecution.completed_successfully == True)
+            .order_by(PipelineExecution.end_date, PipelineExecution.id)
+        )
+    ).all()
+
+    anomaly_results = []
+    anomalous_metrics = {}  # execution id -> metrics flagged by this backfill
+    for rule in rules:
+        metric_field = rule.metric_field.value
+        is_throughput = metric_field == "throughput"
+        baseline = _RollingBaseline(scale=10_000 if is_throughput else 1)
+        lookback = timedelta(days=rule.lookback_days)
+
+        # Walk forward in time so each execution only sees executions before it
+        for execution in executions:
+            value = getattr(execution, metric_field)
+            baseline.evict(execution.end_date - lookback)
+
+            if execution.end_date >= start_date:
+                is_anomaly = False
+                if value is not None and baseline.count >= rule.minimum_executions:
+                    current_value = float(value) if is_throughput else value
+                    baseline_mean = baseline.mean()
+                    baseline_std = baseline.stdev()
+                    if baseline_std != 0:
+                        threshold_min_value, threshold_max_value = (
+                            _calculate_threshold_range(
+                                rule, baseline_mean, baseline_std
+                            )
+                        )
+                        is_anomaly = (
+                            current_value > threshold_max_value
+                            or current_value < threshold_min_value
+                        )
+                    if is_anomaly:
+                        anomaly_results.append(
+                            _build_anomaly_result(
+                                rule,
+                                execution.id,
+                                current_value,
+                                baseline_mean,
+                                baseline_std,
+                                threshold_min_value,
+                                threshold_max_value,
+                                baseline.count,
+                                detected_at=execution.end_date,
+                            )
+                        )
+                        anomalous_metrics.setdefault(execution.id, set()).add(
+                            metric_field
+                        )
+            else:
+                # Before the range, trust the flags already recorded
+                is_anomaly = bool(
+                    execution.anomaly_flag_mask & ANOMALY_METRIC_FLAG_BITS[metric_field]
+                )
+
+            # Anomalies stay out of the baseline, same as live detection
+            if not is_anomaly and value is not None:
+                baseline.add(execution.end_date, value)
+
+    rescored_metrics = [rule.metric_field.value for rule in rules]
+    flag_updates = []
+    scored = 0
+    for execution in executions:
+        if execution.end_date < start_date:
+            continue
+        scored += 1
+
+        current_flags = execution.anomaly_flags or {}
+        flags = dict(current_flags)
+        flagged_metrics = anomalous_metrics.get(execution.id, set())
+        for metric_field in rescored_metrics:
+            if metric_field in flagged_metrics:
+                flags[metric_field] = True
+            elif metric_field in flags:
+                flags[metric_field] = False
+
+        if flags != current_flags:
+            flag_updates.append(
+                {
+                    "execution_id": execution.id,
+                    "flags": flags,
+                    "flag_mask": anomaly_flags_to_mask(flags),
+                }
+            )
+
+    return scored, anomaly_results, flag_updates
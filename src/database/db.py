@@ -3,11 +3,17 @@ from pathlib import Path
 import pendulum
 import structlog
 from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
 
 from src.database.session import engine
 
 logger = structlog.get_logger(__name__)
 
+# Rows per INSERT when writing monitor logs, keeps every statement far below
+# the 65,535 bind parameter limit
+LOG_WRITE_BATCH_SIZE = 1000
+
 
 async def create_test_db():
     async with engine.begin() as conn:
@@ -24,9 +30,11 @@ async def truncate_tables():
                     anomaly_detection_result,
                     anomaly_detection_rule,
                     timeliness_pipeline_execution_log,
+                    monitor_high_water_mark,
                     pipeline_execution_closure,
                     pipeline_execution,
                     address_lineage_closure,
+                    address_lineage_change,
                     address_lineage,
                     pipeline,
                     address,
@@ -52,12 +60,18 @@ async def reset_database():
         )
         # Drop dependent tables (tables with foreign keys)
         await conn.execute(text("DROP TABLE IF EXISTS anomaly_detection_result"))
+        await conn.execute(
+            text("DROP TABLE IF EXISTS anomaly_detection_baseline_sample")
+        )
         await conn.execute(
             text("DROP TABLE IF EXISTS timeliness_pipeline_execution_log")
         )
+        await conn.execute(text("DROP TABLE IF EXISTS freshness_pipeline_impact"))
         await conn.execute(text("DROP TABLE IF EXISTS freshness_pipeline_log"))
+        await conn.execute(text("DROP TABLE IF EXISTS monitor_high_water_mark"))
         await conn.execute(text("DROP TABLE IF EXISTS pipeline_execution_closure"))
         await conn.execute(text("DROP TABLE IF EXISTS address_lineage_closure"))
+        await conn.execute(text("DROP TABLE IF EXISTS address_lineage_change"))
         await conn.execute(text("DROP TABLE IF EXISTS address_lineage"))
         await conn.execute(text("DROP TABLE IF EXISTS pipeline_execution"))
         await conn.execute(text("DROP TABLE IF EXISTS anomaly_detection_rule"))
@@ -96,6 +110,19 @@ def _calculate_timely_time(timestamp, datepart, number):
         raise ValueError(f"Unsupported datepart: {datepart}")
 
 
+def _timely_interval_sql(number_column: str, datepart_column: str) -> str:
+    """SQL interval for a timeliness or freshness setting, NULL when either part
+    is unset"""
+    return f"""CASE {datepart_column}
+                    WHEN 'MINUTE' THEN make_interval(mins => NULLIF({number_column}, 0))
+                    WHEN 'HOUR' THEN make_interval(hours => NULLIF({number_column}, 0))
+                    WHEN 'DAY' THEN make_interval(days => NULLIF({number_column}, 0))
+                    WHEN 'WEEK' THEN make_interval(weeks => NULLIF({number_column}, 0))
+                    WHEN 'MONTH' THEN make_interval(months => NULLIF({number_column}, 0))
+                    WHEN 'YEAR' THEN make_interval(years => NULLIF({number_column}, 0))
+                END"""
+
+
 def _get_display_datepart(datepart, number):
     """Convert datepart to display format (singular/plural)"""
     datepart_lower = datepart.lower()
@@ -105,6 +132,26 @@ def _get_display_datepart(datepart, number):
         return f"{datepart_lower}s"
 
 
+async def _insert_new_log_rows(
+    session: Session, model, rows: list[dict], conflict_columns: list, returning
+) -> list:
+    """Insert log rows in batches, skipping any that are already logged.
+
+    Returns the ``returning`` column of the rows actually inserted. The caller
+    commits.
+    """
+    inserted = []
+    for i in range(0, len(rows), LOG_WRITE_BATCH_SIZE):
+        result = await session.exec(
+            insert(model)
+            .values(rows[i : i + LOG_WRITE_BATCH_SIZE])
+            .on_conflict_do_nothing(index_elements=conflict_columns)
+            .returning(returning)
+        )
+        inserted.extend(result.scalars().all())
+    return inserted
+
+
 async def setup_reporting():
     async with engine.begin() as conn:
         reporting_folder = Path(__file__).parent.parent / "reporting"
@@ -1,209 +1,406 @@
-import uuid
+from datetime import datetime
+from typing import Optional
 
 import pendulum
 import structlog
 from sqlalchemy import text
-from sqlmodel import Session
+from sqlmodel import Session, select
 
-from src.database.db import _calculate_timely_time, _get_display_datepart
+from src.database.db import (
+    _get_display_datepart,
+    _insert_new_log_rows,
+    _timely_interval_sql,
+)
+from src.database.models.freshness_pipeline_log import FreshnessPipelineLog
+from src.database.models.pipeline import Pipeline
 from src.notifier import AlertLevel, send_slack_message
 
 logger = structlog.get_logger(__name__)
 
+FRESHNESS_CHECK_NAME = "freshness"
+
 
 async def db_check_pipeline_freshness(session: Session):
-    timestamp = pendulum.now("UTC")
+    stale_count, new_fail_results = await _log_stale_pipelines(session, "TRUE", {})
+    return await _send_freshness_alert(stale_count, new_fail_results)
 
-    # Use unique temp table name to prevent conflicts with concurrent requests
-    temp_table_name = f"check_pipeline_freshness_temp_{uuid.uuid4().hex[:8]}"
 
-    await session.exec(text(f"DROP TABLE IF EXISTS {temp_table_name}"))
+async def db_check_pipeline_freshness_shard(
+    session: Session, shard: int, shard_count: int
+) -> dict:
+    """Find stale pipelines where pipeline_id % shard_count = shard, logging and
+    alerting are left to db_complete_pipeline_freshness_shards so nothing is
+    logged without its alert"""
+    logger.info(f"Starting Pipeline Freshness Check shard {shard + 1}/{shard_count}")
+    fail_results = await _get_stale_pipelines(
+        session,
+        "p.id % :shard_count = :shard",
+        {"shard": shard, "shard_count": shard_count},
+        pendulum.now("UTC"),
+    )
+    return {
+        "fail_results": [
+            {**result, "last_dml": result["last_dml"].isoformat()}
+            for result in fail_results
+        ]
+    }
 
-    pipelines_query = text(f"""
-        WITH CTE AS (
-            SELECT
-                cte_p.id as pipeline_id,
-                cte_pt.freshness_number,
-                cte_pt.freshness_datepart
-            FROM pipeline_type AS cte_pt
-            INNER JOIN pipeline AS cte_p
-                ON cte_p.pipeline_type_id = cte_pt.id
-            WHERE cte_pt.mute_freshness_check = false
+
+async def db_complete_pipeline_freshness_shards(
+    session: Session, shard_results: list[dict]
+):
+    """Log what every shard found and send one alert for all of them"""
+    stale_count, new_fail_results = await _log_new_stale_pipelines(
+        session,
+        [
+            {**fail_result, "last_dml": pendulum.parse(fail_result["last_dml"])}
+            for result in shard_results
+            for fail_result in result["fail_results"]
+        ],
+        pendulum.now("UTC"),
+    )
+    return await _send_freshness_alert(stale_count, new_fail_results)
+
+
+async def db_check_pipeline_freshness_deadlines(
+    session: Session, pipeline_ids: list[int]
+):
+    """Evaluate only the pipelines whose deadline just passed"""
+    logger.info(f"Checking {len(pipeline_ids)} expired pipeline freshness deadline(s)")
+    stale_count, new_fail_results = await _log_stale_pipelines(
+        session, "p.id = ANY(:pipeline_ids)", {"pipeline_ids": pipeline_ids}
+    )
+    return await _send_freshness_alert(stale_count, new_fail_results)
+
+
+async def db_get_pipeline_freshness_deadlines(
+    session: Session,
+    pipeline_ids: Optional[list[int]] = None,
+    pipeline_type_id: Optional[int] = None,
+    after: Optional[datetime] = None,
+) -> dict[int, Optional[datetime]]:
+    """freshness_deadline of the given pipelines or of a pipeline type, only
+    the deadlines later than after when it is set"""
+    deadline_query = select(Pipeline.id, Pipeline.freshness_deadline)
+    if pipeline_ids is not None:
+        deadline_query = deadline_query.where(Pipeline.id.in_(pipeline_ids))
+    if pipeline_type_id is not None:
+        deadline_query = deadline_query.where(
+            Pipeline.pipeline_type_id == pipeline_type_id
         )
+    if after is not None:
+        deadline_query = deadline_query.where(Pipeline.freshness_deadline > after)
+    return {
+        row.id: row.freshness_deadline for row in await session.exec(deadline_query)
+    }
+
+
+async def _log_stale_pipelines(
+    session: Session, pipeline_filter: str, params: dict
+) -> tuple[int, list[dict]]:
+    """Log and commit stale pipelines among those matching the filter.
+
+    Returns how many pipelines are stale and the ones logged for the first
+    time by this call, which are the ones to alert on.
+    """
+    timestamp = pendulum.now("UTC")
+    fail_results = await _get_stale_pipelines(
+        session, pipeline_filter, params, timestamp
+    )
+    return await _log_new_stale_pipelines(session, fail_results, timestamp)
+
+
+async def _get_stale_pipelines(
+    session: Session, pipeline_filter: str, params: dict, timestamp: datetime
+) -> list[dict]:
+    """Stale pipelines among those matching the filter.
+
+    Only pipelines whose maintained freshness_deadline has passed are read,
+    as a range scan on its index.
+    """
+    stale_query = text(f"""
         SELECT
-            p.id as pipeline_id,
-            p.name as pipeline_name,
-            p.last_target_insert,
-            p.last_target_update,
-            p.last_target_soft_delete,
-            p.freshness_number as child_freshness_number,
-            p.freshness_datepart as child_freshness_datepart,
-            pt.freshness_number as parent_freshness_number,
-            pt.freshness_datepart as parent_freshness_datepart
-        INTO TEMP TABLE {temp_table_name}
+            p.id AS pipeline_id,
+            p.name AS pipeline_name,
+            GREATEST(
+                p.last_target_insert,
+                p.last_target_update,
+                p.last_target_soft_delete
+            ) AS last_dml,
+            child.freshness_interval IS NOT NULL AS used_child_config,
+            CASE
+                WHEN child.freshness_interval IS NOT NULL THEN p.freshness_number
+                ELSE pt.freshness_number
+            END AS freshness_number,
+            CASE
+                WHEN child.freshness_interval IS NOT NULL THEN p.freshness_datepart
+                ELSE pt.freshness_datepart
+            END AS freshness_datepart
         FROM pipeline AS p
-        INNER JOIN CTE AS pt
-            ON pt.pipeline_id = p.id
-        WHERE p.mute_freshness_check = false
+        INNER JOIN pipeline_type AS pt
+            ON pt.id = p.pipeline_type_id
+        CROSS JOIN LATERAL (
+            SELECT {_timely_interval_sql("p.freshness_number", "p.freshness_datepart")} AS freshness_interval
+        ) AS child
+        WHERE p.freshness_deadline < :now_time
+            AND {pipeline_filter}
     """)
-    await session.exec(pipelines_query)
+    return [
+        dict(row._mapping)
+        for row in await session.exec(
+            stale_query,
+            params={"now_time": timestamp, **params},
+        )
+    ]
 
-    pipelines_query = text(f"""
-        SELECT
-            pipeline_id,
-            pipeline_name,
-            last_target_insert,
-            last_target_update,
-            last_target_soft_delete,
-            child_freshness_number,
-            child_freshness_datepart,
-            parent_freshness_number,
-            parent_freshness_datepart
-        FROM {temp_table_name}
-    """)
 
-    pipelines = (await session.exec(pipelines_query)).fetchall()
-
-    logger.info(f"Processing {len(pipelines)} pipelines for freshness check")
-
-    fail_results = []
-    for pipeline in pipelines:
-        (
-            pipeline_id,
-            pipeline_name,
-            last_insert,
-            last_update,
-            last_delete,
-            child_number,
-            child_datepart,
-            parent_number,
-            parent_datepart,
-        ) = pipeline
-
-        max_dml = None
-        for ts in [last_insert, last_update, last_delete]:
-            if ts is not None:
-                if max_dml is None or ts > max_dml:
-                    max_dml = ts
-
-        if max_dml is None:
-            continue
-
-        if child_datepart and child_number:
-            freshness_datepart = child_datepart
-            freshness_number = child_number
-            used_child_config = True
-        elif parent_datepart and parent_number:
-            freshness_datepart = parent_datepart
-            freshness_number = parent_number
-            used_child_config = False
-        else:
-            logger.warning(
-                f"Pipeline {pipeline_id} ({pipeline_name}) skipped - incomplete freshness settings "
-                f"(child: {child_datepart}, {child_number}; parent: {parent_datepart}, {parent_number})"
-            )
-            continue
+async def _log_new_stale_pipelines(
+    session: Session, fail_results: list[dict], timestamp: datetime
+) -> tuple[int, list[dict]]:
+    """Log and commit stale pipelines, returning how many there are and the
+    ones logged for the first time by this call"""
+    if not fail_results:
+        return 0, []
 
-        # Calculate threshold time
-        calculated_time = _calculate_timely_time(
-            max_dml, freshness_datepart, freshness_number
-        )
+    logger.warning(
+        f"Pipeline Freshness Check Failed - {len(fail_results)} pipeline(s) overdue"
+    )
 
-        if calculated_time < timestamp:
-            fail_results.append(
+    inserted_pipeline_ids = set(
+        await _insert_new_log_rows(
+            session,
+            FreshnessPipelineLog,
+            [
                 {
-                    "pipeline_id": pipeline_id,
-                    "pipeline_name": pipeline_name,
-                    "last_dml": max_dml,
-                    "freshness_number": freshness_number,
-                    "freshness_datepart": freshness_datepart,
-                    "used_child_config": used_child_config,
+                    "pipeline_id": result["pipeline_id"],
+                    "last_dml_timestamp": result["last_dml"],
+                    "evaluation_timestamp": timestamp,
+                    "freshness_number": result["freshness_number"],
+                    "freshness_datepart": result["freshness_datepart"],
+                    "used_child_config": result["used_child_config"],
                 }
-            )
+                for result in fail_results
+            ],
+            [
+                FreshnessPipelineLog.last_dml_timestamp,
+                FreshnessPipelineLog.pipeline_id,
+            ],
+            FreshnessPipelineLog.pipeline_id,
+        )
+    )
+    rows_inserted = len(inserted_pipeline_ids)
+    new_fail_results = [
+        result
+        for result in fail_results
+        if result["pipeline_id"] in inserted_pipeline_ids
+    ]
+    impacts = await _log_downstream_impact(session, new_fail_results)
+    await session.commit()
 
-            logger.warning(
-                f"Pipeline {pipeline_id} ({pipeline_name}) failed freshness check"
+    logger.info(f"Inserted {rows_inserted} new freshness pipeline log records")
+
+    return len(fail_results), [
+        {
+            "pipeline_id": result["pipeline_id"],
+            "pipeline_name": result["pipeline_name"],
+            "last_dml": str(result["last_dml"]),
+            "freshness_number": result["freshness_number"],
+            "freshness_datepart": result["freshness_datepart"],
+            "downstream_address_count": impacts.get(result["pipeline_id"], {}).get(
+                "downstream_address_count", 0
+            ),
+            "downstream_pipelines": impacts.get(result["pipeline_id"], {}).get(
+                "downstream_pipelines", []
+            ),
+        }
+        for result in new_fail_results
+    ]
+
+
+async def _log_downstream_impact(
+    session: Session, new_fail_results: list[dict]
+) -> dict[int, dict]:
+    """Record every address and pipeline downstream of newly stale pipelines.
+
+    The targets a stale pipeline writes are joined to their descendants in
+    address_lineage_closure, then to the pipelines reading each of them, so
+    the whole blast radius comes from one set-based statement. Returns the
+    downstream address count and pipeline names per stale pipeline. The
+    caller commits.
+    """
+    if not new_fail_results:
+        return {}
+
+    impact_query = text("""
+        WITH new_log AS (
+            SELECT fpl.id, fpl.pipeline_id
+            FROM unnest(
+                CAST(:pipeline_ids AS INTEGER[]),
+                CAST(:last_dml_timestamps AS TIMESTAMPTZ[])
+            ) AS stale(pipeline_id, last_dml_timestamp)
+            INNER JOIN freshness_pipeline_log AS fpl
+                ON fpl.last_dml_timestamp = stale.last_dml_timestamp
+                AND fpl.pipeline_id = stale.pipeline_id
+        ),
+        impact AS (
+            INSERT INTO freshness_pipeline_impact (
+                freshness_pipeline_log_id,
+                address_id,
+                depth,
+                downstream_pipeline_ids
             )
+            SELECT
+                new_log.id,
+                alc.target_address_id,
+                MIN(alc.depth),
+                COALESCE(
+                    array_agg(DISTINCT reader.pipeline_id)
+                        FILTER (WHERE reader.pipeline_id IS NOT NULL),
+                    '{}'
+                )
+            FROM new_log
+            INNER JOIN address_lineage AS al
+                ON al.pipeline_id = new_log.pipeline_id
+            INNER JOIN address_lineage_closure AS alc
+                ON alc.source_address_id = al.target_address_id
+            LEFT JOIN address_lineage AS reader
+                ON reader.source_address_id = alc.target_address_id
+                AND reader.pipeline_id <> new_log.pipeline_id
+            GROUP BY new_log.id, alc.target_address_id
+            ON CONFLICT DO NOTHING
+            RETURNING freshness_pipeline_log_id, downstream_pipeline_ids
+        )
+        SELECT
+            new_log.pipeline_id,
+            COUNT(*) AS downstream_address_count,
+            COALESCE(
+                (
+                    SELECT array_agg(DISTINCT p.name ORDER BY p.name)
+                    FROM impact AS pipeline_impact
+                    CROSS JOIN unnest(pipeline_impact.downstream_pipeline_ids)
+                        AS downstream(pipeline_id)
+                    INNER JOIN pipeline AS p
+                        ON p.id = downstream.pipeline_id
+                    WHERE pipeline_impact.freshness_pipeline_log_id = new_log.id
+                ),
+                '{}'
+            ) AS downstream_pipelines
+        FROM impact
+        INNER JOIN new_log
+            ON new_log.id = impact.freshness_pipeline_log_id
+        GROUP BY new_log.id, new_log.pipeline_id
+    """)
+    impacts = {
+        row.pipeline_id: {
+            "downstream_address_count": row.downstream_address_count,
+            "downstream_pipelines": list(row.downstream_pipelines),
+        }
+        for row in await session.exec(
+            impact_query,
+            params={
+                "pipeline_ids": [result["pipeline_id"] for result in new_fail_results],
+                "last_dml_timestamps": [
+                    result["last_dml"] for result in new_fail_results
+                ],
+            },
+        )
+    }
+
+    logger.info(
+        f"Logged downstream impact of {len(impacts)} stale pipeline(s) across "
+        f"{sum(impact['downstream_address_count'] for impact in impacts.values())} address(es)"
+    )
+    return impacts
+
+
+async def db_refresh_pipeline_freshness_deadlines(
+    session: Session,
+    pipeline_ids: Optional[list[int]] = None,
+    pipeline_type_id: Optional[int] = None,
+) -> None:
+    """Recompute freshness_deadline after DML timestamps or freshness settings
+    change, for the given pipelines, a pipeline type or every pipeline.
+
+    The deadline is the latest DML plus the pipeline interval, falling back to
+    the pipeline type, and NULL when muted, unconfigured or without DML. The
+    caller commits.
+    """
+    if pipeline_ids is not None:
+        pipeline_filter = "p.id = ANY(:pipeline_ids)"
+    elif pipeline_type_id is not None:
+        pipeline_filter = "p.pipeline_type_id = :pipeline_type_id"
+    else:
+        pipeline_filter = "TRUE"
+
+    await session.exec(
+        text(f"""
+            UPDATE pipeline AS p
+            SET freshness_deadline = CASE
+                WHEN p.mute_freshness_check OR pt.mute_freshness_check THEN NULL
+                ELSE (
+                    (
+                        GREATEST(
+                            p.last_target_insert,
+                            p.last_target_update,
+                            p.last_target_soft_delete
+                        ) AT TIME ZONE 'UTC'
+                    )
+                    + COALESCE(
+                        {_timely_interval_sql("p.freshness_number", "p.freshness_datepart")},
+                        {_timely_interval_sql("pt.freshness_number", "pt.freshness_datepart")}
+                    )
+                ) AT TIME ZONE 'UTC'
+            END
+            FROM pipeline_type AS pt
+            WHERE pt.id = p.pipeline_type_id
+                AND {pipeline_filter}
+        """),
+        params={"pipeline_ids": pipeline_ids, "pipeline_type_id": pipeline_type_id},
+    )
+
+
+async def _send_freshness_alert(stale_count: int, new_fail_results: list[dict]):
+    """One Slack message for every newly logged stale pipeline"""
+    if not stale_count:
+        logger.info("All pipelines passed freshness check")
+        return {"status": "success"}
 
-    if fail_results:
-        logger.warning(
-            f"Pipeline Freshness Check Failed - {len(fail_results)} pipeline(s) overdue"
+    if not new_fail_results:
+        logger.info(
+            "No new freshness failures to report - all failures were already logged"
         )
-        await session.exec(text(f"DROP TABLE IF EXISTS {temp_table_name}"))
-
-        # Check for PostgreSQL parameter limit (65,535)
-        # Each fail_result generates 6 values in the VALUES clause
-        total_values = len(fail_results) * 6
-        if total_values > 65000:
-            logger.error(
-                f"Too many values ({total_values}) - exceeds PostgreSQL parameter limit of 65,535"
-            )
+        return {"status": "warning"}
 
-        # Build values clause directly without intermediate list
-        values_sql = ",\n".join(
-            f"({result['pipeline_id']}, '{result['last_dml']}'::timestamp with time zone, '{timestamp}'::timestamp with time zone, {result['freshness_number']}, '{result['freshness_datepart']}'::datepartenum, {result.get('used_child_config', False)})"
-            for result in fail_results
+    try:
+        pipeline_details = "\n".join(
+            f"\t• {result['pipeline_name']} (ID: {result['pipeline_id']}): "
+            f"Last DML {result['last_dml']}, Expected within {result['freshness_number']} {_get_display_datepart(result['freshness_datepart'], result['freshness_number'])}"
+            for result in new_fail_results
         )
-        insert_query = text(f"""
-            INSERT INTO freshness_pipeline_log (pipeline_id, last_dml_timestamp, evaluation_timestamp, freshness_number, freshness_datepart, used_child_config)
-            SELECT 
-            v.pipeline_id, 
-            v.last_dml_timestamp, 
-            v.evaluation_timestamp, 
-            v.freshness_number, 
-            v.freshness_datepart, 
-            v.used_child_config 
-            FROM (VALUES {values_sql}) AS v(pipeline_id, last_dml_timestamp, evaluation_timestamp, freshness_number, freshness_datepart, used_child_config)
-            WHERE NOT EXISTS (
-                SELECT 1 
-                FROM freshness_pipeline_log f
-                WHERE f.pipeline_id = v.pipeline_id 
-                    AND f.last_dml_timestamp = v.last_dml_timestamp
-            )
-            RETURNING pipeline_id
-        """)
-
-        result = await session.exec(insert_query)
-        inserted_records = result.fetchall()
-        rows_inserted = len(inserted_records)
-        await session.commit()
-
-        logger.info(f"Inserted {rows_inserted} new freshness pipeline log records")
-
-        if rows_inserted > 0:
-            try:
-                inserted_pipeline_ids = {record[0] for record in inserted_records}
-
-                new_fail_results = [
-                    result
-                    for result in fail_results
-                    if result["pipeline_id"] in inserted_pipeline_ids
-                ]
-
-                if new_fail_results:
-                    pipeline_details = "\n".join(
-                        f"\t• {result['pipeline_name']} (ID: {result['pipeline_id']}): "
-                        f"Last DML {result['last_dml']}, Expected within {result['freshness_number']} {_get_display_datepart(result['freshness_datepart'], result['freshness_number'])}"
-                        for result in new_fail_results
-                    )
 
-                    await send_slack_message(
-                        level=AlertLevel.WARNING,
-                        title="Freshness Check - Pipeline DML",
-                        message=f"Pipeline Freshness Check - {len(new_fail_results)} NEW pipeline(s) overdue",
-                        details={"Failed Pipelines": "\n" + pipeline_details},
-                    )
-            except Exception as e:
-                logger.error(
-                    f"Failed to send Slack notification for freshness failures: {e}"
-                )
-        else:
-            logger.info(
-                "No new freshness failures to report - all failures were already logged"
+        details = {"Failed Pipelines": "\n" + pipeline_details}
+
+        impact_details = "\n".join(
+            f"\t• {result['pipeline_name']}: {result['downstream_address_count']} address(es), "
+            f"{len(result['downstream_pipelines'])} downstream pipeline(s)"
+            + (
+                f" ({', '.join(result['downstream_pipelines'])})"
+                if result["downstream_pipelines"]
+                else ""
             )
-        return {"status": "warning"}
-    else:
-        logger.info("All pipelines passed freshness check")
-        await session.exec(text(f"DROP TABLE IF EXISTS {temp_table_name}"))
+            for result in new_fail_results
+            if result.get("downstream_address_count")
+        )
+        if impact_details:
+            details["Downstream Impact"] = "\n" + impact_details
+
+        await send_slack_message(
+            level=AlertLevel.WARNING,
+            title="Freshness Check - Pipeline DML",
+            message=f"Pipeline Freshness Check - {len(new_fail_results)} NEW pipeline(s) overdue",
+            details=details,
+        )
+    except Exception as e:
+        logger.error(f"Failed to send Slack notification for freshness failures: {e}")
 
-    return {"status": "success"}
+    return {"status": "warning"}
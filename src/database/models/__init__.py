@@ -1,11 +1,20 @@
 from src.database.models.address import Address
-from src.database.models.address_lineage import AddressLineage, AddressLineageClosure
+from src.database.models.address_lineage import (
+    AddressLineage,
+    AddressLineageChange,
+    AddressLineageClosure,
+)
 from src.database.models.address_type import AddressType
 from src.database.models.anomaly_detection import (
+    AnomalyDetectionBaselineSample,
     AnomalyDetectionResult,
     AnomalyDetectionRule,
 )
-from src.database.models.freshness_pipeline_log import FreshnessPipelineLog
+from src.database.models.freshness_pipeline_log import (
+    FreshnessPipelineImpact,
+    FreshnessPipelineLog,
+)
+from src.database.models.monitor_high_water_mark import MonitorHighWaterMark
 from src.database.models.pipeline import Pipeline
 from src.database.models.pipeline_execution import (
     PipelineExecution,
@@ -24,9 +33,13 @@ __all__ = [
     "AddressType",
     "AddressLineage",
     "AddressLineageClosure",
+    "AddressLineageChange",
     "TimelinessPipelineExecutionLog",
     "AnomalyDetectionRule",
     "AnomalyDetectionResult",
+    "AnomalyDetectionBaselineSample",
     "FreshnessPipelineLog",
+    "FreshnessPipelineImpact",
+    "MonitorHighWaterMark",
     "PipelineExecutionClosure",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, Column, Integer, PrimaryKeyConstraint
+from sqlalchemy import BOOLEAN, BigInteger, Column, Integer, PrimaryKeyConstraint
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlmodel import Field, Index, SQLModel
 
@@ -56,3 +56,20 @@ class AddressLineageClosure(SQLModel, table=True):
             postgresql_include=["source_address_id", "lineage_path"],
         ),
     )
+
+
+class AddressLineageChange(SQLModel, table=True):
+    """Edges added to or removed from address_lineage, in order.
+
+    The id is the lineage version, in-process lineage indexes replay the
+    changes past the version they were built at.
+    """
+
+    __tablename__ = "address_lineage_change"
+
+    id: int | None = Field(
+        sa_column=Column(BigInteger, default=None, primary_key=True, nullable=False)
+    )
+    source_address_id: int
+    target_address_id: int
+    removed: bool = Field(sa_column=Column(BOOLEAN, nullable=False))
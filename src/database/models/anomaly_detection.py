@@ -29,6 +29,7 @@ class AnomalyDetectionRule(SQLModel, table=True):
     )
     lookback_days: int = Field(default=30)
     minimum_executions: int = Field(default=30)
+    baseline_sample_size: Optional[int] = Field(default=None)
     active: bool = Field(
         sa_column=Column(Boolean, server_default=text("TRUE"), nullable=False)
     )
@@ -95,4 +96,37 @@ class AnomalyDetectionResult(SQLModel, table=True):
         ForeignKeyConstraint(
             columns=["pipeline_execution_id"], refcolumns=["pipeline_execution.id"]
         ),
+        # Keyset order of the GET /anomalies feed
+        Index(
+            "ix_anomaly_detection_result_detected_at",
+            "detected_at",
+            "pipeline_execution_id",
+            "rule_id",
+        ),
+        Index(
+            "ix_anomaly_detection_result_rule_id_detected_at",
+            "rule_id",
+            "detected_at",
+        ),
+    )
+
+
+class AnomalyDetectionBaselineSample(SQLModel, table=True):
+    """Bounded reservoir of baseline values for a rule's hour bucket"""
+
+    __tablename__ = "anomaly_detection_baseline_sample"
+
+    rule_id: int = Field(foreign_key="anomaly_detection_rule.id")
+    hour_recorded: int
+    seen_count: int = Field(sa_column=Column(BigInteger, nullable=False))
+    # List of [end_date epoch seconds, metric value] pairs
+    sample: list = Field(sa_column=Column(JSONB, nullable=False))
+    updated_at: DateTime = Field(
+        sa_column=Column(
+            DateTimeTZ(timezone=True),
+            nullable=False,
+            server_default=text("CURRENT_TIMESTAMP"),
+        ),
     )
+
+    __table_args__ = (PrimaryKeyConstraint("rule_id", "hour_recorded"),)
@@ -1,6 +1,15 @@
 from pydantic_extra_types.pendulum_dt import DateTime
-from sqlalchemy import BigInteger, Column, Index, text
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    text,
+)
 from sqlalchemy import DateTime as DateTimeTZ
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlmodel import Field, SQLModel
 
 from src.types import DatePartEnum
@@ -37,3 +46,22 @@ class FreshnessPipelineLog(SQLModel, table=True):
             unique=True,
         ),
     )
+
+
+class FreshnessPipelineImpact(SQLModel, table=True):
+    __tablename__ = "freshness_pipeline_impact"
+
+    freshness_pipeline_log_id: int = Field(
+        sa_column=Column(
+            BigInteger,
+            ForeignKey("freshness_pipeline_log.id", ondelete="CASCADE"),
+            nullable=False,
+        )
+    )
+    address_id: int = Field(foreign_key="address.id")
+    depth: int  # 0 for the stale pipeline's own targets
+    downstream_pipeline_ids: list[int] = Field(
+        sa_column=Column(ARRAY(Integer), nullable=False)
+    )  # Pipelines reading the address
+
+    __table_args__ = (PrimaryKeyConstraint("freshness_pipeline_log_id", "address_id"),)
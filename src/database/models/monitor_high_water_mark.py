@@ -0,0 +1,22 @@
+from pydantic_extra_types.pendulum_dt import DateTime
+from sqlalchemy import Column, text
+from sqlalchemy import DateTime as DateTimeTZ
+from sqlmodel import Field, SQLModel
+
+
+class MonitorHighWaterMark(SQLModel, table=True):
+    """How far a scheduled check has already scanned, one row per check"""
+
+    __tablename__ = "monitor_high_water_mark"
+
+    check_name: str = Field(primary_key=True, max_length=50)
+    high_water_mark: DateTime = Field(
+        sa_column=Column(DateTimeTZ(timezone=True), nullable=False)
+    )
+    updated_at: DateTime = Field(
+        sa_column=Column(
+            DateTimeTZ(timezone=True),
+            nullable=False,
+            server_default=text("CURRENT_TIMESTAMP"),
+        ),
+    )
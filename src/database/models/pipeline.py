@@ -35,6 +35,9 @@ class Pipeline(SQLModel, table=True):
     mute_freshness_check: bool = Field(
         sa_column=Column(Boolean, server_default=text("FALSE"), nullable=False)
     )
+    freshness_deadline: Optional[DateTime] = Field(
+        sa_column=Column(DateTimeTZ(timezone=True), nullable=True)
+    )  # Latest DML plus the effective freshness interval, NULL when not checked
     timeliness_number: Optional[int]
     timeliness_datepart: Optional[DatePartEnum]
     mute_timeliness_check: bool = Field(
@@ -74,4 +77,10 @@ class Pipeline(SQLModel, table=True):
             "pipeline_type_id",
             postgresql_include=["id"],
         ),
+        Index(
+            "ix_pipeline_freshness_deadline",
+            "freshness_deadline",
+            postgresql_include=["id"],
+            postgresql_where=text("freshness_deadline IS NOT NULL"),
+        ),
     )
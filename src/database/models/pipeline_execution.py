@@ -10,6 +10,7 @@ from sqlalchemy import (
     Index,
     Integer,
     PrimaryKeyConstraint,
+    SmallInteger,
     text,
 )
 from sqlalchemy import Date as DateTZ
@@ -46,6 +47,10 @@ class PipelineExecution(SQLModel, table=True):
     anomaly_flags: Optional[dict] = Field(
         sa_column=Column(JSONB, nullable=True), default=None
     )
+    # One bit per AnomalyMetricFieldEnum, kept in sync with anomaly_flags
+    anomaly_flag_mask: int = Field(
+        sa_column=Column(SmallInteger, nullable=False, server_default=text("0"))
+    )
     throughput: Optional[float] = Field(
         sa_column=Column(
             DECIMAL(precision=12, scale=4), nullable=True
@@ -58,6 +63,19 @@ class PipelineExecution(SQLModel, table=True):
             "start_date",
             postgresql_include=["id"],
         ),
+        Index(  # Used for Timeliness purposes, completed since the last check
+            "ix_pipeline_execution_end_date",
+            "end_date",
+            postgresql_include=["id"],
+            postgresql_where=text("end_date IS NOT NULL"),
+        ),
+        Index(  # Used for Timeliness purposes, still running
+            "ix_pipeline_execution_open",
+            "pipeline_id",
+            "start_date",
+            postgresql_include=["id"],
+            postgresql_where=text("end_date IS NULL"),
+        ),
         Index(  # Used for Anomaly Detection purposes
             "ix_pipeline_execution_hour_recorded",
             "pipeline_id",
@@ -66,6 +84,12 @@ class PipelineExecution(SQLModel, table=True):
             postgresql_include=["completed_successfully", "id"],
             postgresql_where=text("end_date IS NOT NULL"),
         ),
+        Index(  # Used for recent anomaly lookups
+            "ix_pipeline_execution_anomaly_flag_mask",
+            "end_date",
+            postgresql_include=["pipeline_id", "anomaly_flag_mask", "id"],
+            postgresql_where=text("anomaly_flag_mask <> 0"),
+        ),
         Index(  # Used for Reporting purposes
             "ix_pipeline_execution_date_recorded_seek",
             "date_recorded",
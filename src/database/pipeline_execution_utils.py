@@ -1,10 +1,14 @@
+from typing import Optional
+
 import pendulum
 import structlog
 from asyncpg.exceptions import CheckViolationError
 from fastapi import HTTPException
+from sqlalchemy import Row
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlmodel import Integer, Session, case, func, select, update
 
+from src.database.freshness_utils import db_refresh_pipeline_freshness_deadlines
 from src.database.models import Pipeline, PipelineExecution, PipelineExecutionClosure
 from src.models.pipeline_execution import (
     PipelineExecutionEndInput,
@@ -55,7 +59,8 @@ async def db_start_pipeline_execution(
 async def db_end_pipeline_execution(
     pipeline_execution: PipelineExecutionEndInput,
     session: Session,
-) -> int:
+) -> Row:
+    """End the execution and return its pipeline_id, hour and anomaly metrics"""
     pipeline_execution = PipelineExecution(
         **pipeline_execution.model_dump(exclude_unset=True)
     )
@@ -85,11 +90,21 @@ async def db_end_pipeline_execution(
                     4,
                 ),
             )
-            .returning(PipelineExecution.pipeline_id)
+            .returning(
+                PipelineExecution.pipeline_id,
+                PipelineExecution.hour_recorded,
+                PipelineExecution.duration_seconds,
+                PipelineExecution.inserts,
+                PipelineExecution.updates,
+                PipelineExecution.soft_deletes,
+                PipelineExecution.total_rows,
+                PipelineExecution.throughput,
+            )
         )
 
         try:
-            pipeline_id = (await session.exec(execution_update_stmt)).scalar_one()
+            execution = (await session.exec(execution_update_stmt)).one()
+            pipeline_id = execution.pipeline_id
         except NoResultFound as e:
             logger.error(f"Pipeline execution not found: {e}")
             raise HTTPException(status_code=404, detail="Pipeline execution not found")
@@ -136,7 +151,16 @@ async def db_end_pipeline_execution(
             )
             await session.exec(pipeline_update_stmt)
 
-    return pipeline_id
+            if (
+                pipeline_execution_inserts > 0
+                or pipeline_execution_updates > 0
+                or pipeline_execution_soft_deletes > 0
+            ):
+                await db_refresh_pipeline_freshness_deadlines(
+                    session, pipeline_ids=[pipeline_id]
+                )
+
+    return execution
 
 
 async def db_maintain_pipeline_execution_closure_table(
@@ -220,3 +244,86 @@ async def db_get_pipeline_execution(
 
     execution_output.child_executions = child_outputs
     return execution_output
+
+
+async def db_get_running_pipeline_executions(
+    session: Session,
+    pipeline_id: Optional[int] = None,
+    started_before: Optional[pendulum.DateTime] = None,
+) -> list[dict]:
+    """Open executions, oldest first.
+
+    Every filter keeps end_date IS NULL so the partial index on open
+    executions is used and the cost follows the running set, not history.
+    """
+    running_query = select(
+        PipelineExecution.id,
+        PipelineExecution.pipeline_id,
+        PipelineExecution.start_date,
+    ).where(PipelineExecution.end_date.is_(None))
+    if pipeline_id is not None:
+        running_query = running_query.where(
+            PipelineExecution.pipeline_id == pipeline_id
+        )
+    if started_before is not None:
+        running_query = running_query.where(
+            PipelineExecution.start_date < started_before
+        )
+
+    rows = (
+        await session.exec(running_query.order_by(PipelineExecution.start_date))
+    ).all()
+    return [dict(row._mapping) for row in rows]
+
+
+async def db_get_ended_pipeline_execution_ids(
+    session: Session, pipeline_execution_ids: list[int]
+) -> list[int]:
+    """The executions among pipeline_execution_ids that are not running,
+    ended or missing altogether"""
+    if not pipeline_execution_ids:
+        return []
+
+    running_ids = set(
+        (
+            await session.exec(
+                select(PipelineExecution.id)
+                .where(PipelineExecution.id.in_(pipeline_execution_ids))
+                .where(PipelineExecution.end_date.is_(None))
+            )
+        ).all()
+    )
+    return sorted(set(pipeline_execution_ids) - running_ids)
+
+
+async def db_close_stale_pipeline_executions(
+    session: Session, stale_after_minutes: int
+) -> list[int]:
+    """End executions whose process died without calling end_pipeline_execution.
+
+    They are marked unsuccessful at the current time so timeliness still
+    evaluates them and anomaly detection and watermarks ignore them.
+    """
+    now_time = pendulum.now("UTC")
+    close_stmt = (
+        update(PipelineExecution)
+        .where(PipelineExecution.end_date.is_(None))
+        .where(
+            PipelineExecution.start_date
+            < now_time.subtract(minutes=stale_after_minutes)
+        )
+        .values(
+            end_date=now_time,
+            completed_successfully=False,
+            duration_seconds=func.extract(
+                "epoch", now_time - PipelineExecution.start_date
+            ).cast(Integer),
+        )
+        .returning(PipelineExecution.id)
+    )
+    closed_ids = list((await session.exec(close_stmt)).scalars().all())
+    await session.commit()
+
+    if closed_ids:
+        logger.warning(f"Closed {len(closed_ids)} stale pipeline execution(s)")
+    return sorted(closed_ids)
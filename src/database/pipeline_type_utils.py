@@ -6,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlmodel import Session
 
+from src.database.freshness_utils import db_refresh_pipeline_freshness_deadlines
 from src.database.models.pipeline_type import PipelineType
 from src.models.pipeline_type import (
     PipelineTypePatchInput,
@@ -95,6 +96,10 @@ async def db_update_pipeline_type(
 
     session.add(pipeline_type)
     try:
+        await session.flush()
+        await db_refresh_pipeline_freshness_deadlines(
+            session, pipeline_type_id=pipeline_type.id
+        )
         await session.commit()
     except IntegrityError as e:
         await session.rollback()
@@ -8,6 +8,7 @@ from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlmodel import Session
 
+from src.database.freshness_utils import db_refresh_pipeline_freshness_deadlines
 from src.database.models.anomaly_detection import AnomalyDetectionRule
 from src.database.models.pipeline import Pipeline
 from src.database.pipeline_type_utils import db_get_or_create_pipeline_type
@@ -44,9 +45,11 @@ def generate_input_hash(pipeline_input: PipelinePostInput) -> str:
 
 async def db_get_or_create_pipeline(
     session: Session, pipeline: PipelinePostInput, response: Response
-) -> PipelinePostOutput:
-    """Get existing pipeline id or create new one and return id"""
+) -> tuple[PipelinePostOutput, bool]:
+    """Get existing pipeline id or create new one and return id, along with
+    whether its input data changed, which moves its freshness deadline"""
     created = False
+    data_changed = False
     pipeline_id = None
     active = None
     load_lineage = None
@@ -180,6 +183,11 @@ async def db_get_or_create_pipeline(
             else:
                 await session.exec(update_stmt)
 
+            if data_changed:
+                await db_refresh_pipeline_freshness_deadlines(
+                    session, pipeline_ids=[pipeline_id]
+                )
+
             await session.commit()
             logger.info(f"Pipeline '{pipeline.name}' successfully updated")
         else:
@@ -195,7 +203,7 @@ async def db_get_or_create_pipeline(
         "active": active,
         "load_lineage": load_lineage,
         "watermark": watermark,
-    }
+    }, data_changed
 
 
 async def db_update_pipeline(session: Session, patch: PipelinePatchInput) -> Pipeline:
@@ -221,7 +229,12 @@ async def db_update_pipeline(session: Session, patch: PipelinePatchInput) -> Pip
 
     session.add(pipeline)
     try:
+        await session.flush()
+        await db_refresh_pipeline_freshness_deadlines(
+            session, pipeline_ids=[pipeline.id]
+        )
         await session.commit()
+        await session.refresh(pipeline, ["freshness_deadline"])
     except IntegrityError as e:
         await session.rollback()
         if (
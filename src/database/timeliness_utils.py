@@ -1,17 +1,44 @@
-import uuid
+from datetime import datetime
+from typing import Optional
 
 import pendulum
 import structlog
 from fastapi import Response
-from sqlalchemy import text
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlmodel import Session
 
-from src.database.db import _calculate_timely_time, _get_display_datepart
+from src.database.db import (
+    _get_display_datepart,
+    _insert_new_log_rows,
+    _timely_interval_sql,
+)
+from src.database.models.monitor_high_water_mark import MonitorHighWaterMark
+from src.database.models.timeliness_pipeline_execution_log import (
+    TimelinessPipelineExecutionLog,
+)
 from src.notifier import AlertLevel, send_slack_message
 from src.types import DatePartEnum
 
 logger = structlog.get_logger(__name__)
 
+TIMELINESS_CHECK_NAME = "timeliness"
+
+# Executions completed since the last check, and running ones that have a
+# threshold or started since then. Running ones stay in scope however long
+# their threshold is, while the ones of pipelines without timeliness settings
+# are only reported as skipped once instead of on every run.
+TIMELINESS_WINDOW_FILTER = """(
+    pe.end_date > :high_water_mark
+    OR (
+        pe.end_date IS NULL
+        AND (
+            pe.start_date > :high_water_mark
+            OR COALESCE(child.timely_interval, parent.timely_interval) IS NOT NULL
+        )
+    )
+)"""
+
 
 def _format_duration_for_datepart(duration_seconds: int, datepart: DatePartEnum) -> str:
     """Convert duration seconds to human-readable format matching the datepart"""
@@ -41,235 +68,370 @@ async def db_check_pipeline_execution_timeliness(
     session: Session, response: Response, lookback_minutes: int
 ):
     logger.info("Starting Pipeline Execution Timeliness Check")
-    lookback_timestamp = pendulum.now("UTC").subtract(minutes=lookback_minutes)
+    now_time = pendulum.now("UTC")
 
-    # Use unique temp table name to prevent conflicts with concurrent requests
-    temp_table_name = f"timeliness_pipeline_execution_log_temp_{uuid.uuid4().hex[:8]}"
+    # Lock the mark so overlapping checks run one after another
+    high_water_mark = await _get_timeliness_high_water_mark(
+        session, now_time, lookback_minutes, for_update=True
+    )
+    await _advance_timeliness_high_water_mark(session, now_time)
 
-    await session.exec(text(f"DROP TABLE IF EXISTS {temp_table_name}"))
+    overdue_count, new_fail_results = await _log_overdue_executions(
+        session,
+        TIMELINESS_WINDOW_FILTER,
+        {"high_water_mark": high_water_mark},
+        now_time,
+    )
+    return await _send_timeliness_alert(overdue_count, new_fail_results)
 
-    cte_query = text(f"""
-        WITH CTE AS (
-            SELECT id
-            FROM pipeline_execution
-            WHERE start_date >= :lookback_timestamp
-        )
-        SELECT
-            pe.id,
-            pe.pipeline_id,
-            pe.duration_seconds,
-            pe.start_date,
-            pe.end_date,
-            pe.completed_successfully
-        INTO TEMP TABLE {temp_table_name}
-        FROM pipeline_execution AS pe
-        INNER JOIN CTE
-            ON CTE.id = pe.id
-    """)
 
-    await session.exec(
-        cte_query,
-        params={
-            "lookback_timestamp": lookback_timestamp,
+async def db_check_pipeline_execution_timeliness_shard(
+    session: Session,
+    shard: int,
+    shard_count: int,
+    lookback_minutes: int,
+    now_time: pendulum.DateTime,
+) -> dict:
+    """Find overdue executions for pipelines where pipeline_id % shard_count = shard.
+
+    Logging, alerting and advancing the high-water mark are left to
+    db_complete_pipeline_execution_timeliness_shards once every shard is done,
+    so a failed shard or callback is picked up again by the next run.
+    """
+    logger.info(
+        f"Starting Pipeline Execution Timeliness Check shard {shard + 1}/{shard_count}"
+    )
+    high_water_mark = await _get_timeliness_high_water_mark(
+        session, now_time, lookback_minutes
+    )
+
+    fail_results = await _get_overdue_executions(
+        session,
+        f"{TIMELINESS_WINDOW_FILTER} AND pe.pipeline_id % :shard_count = :shard",
+        {
+            "high_water_mark": high_water_mark,
+            "shard": shard,
+            "shard_count": shard_count,
         },
+        now_time,
     )
+    return {"fail_results": fail_results}
+
 
-    results_query = text(f"""
+async def db_complete_pipeline_execution_timeliness_shards(
+    session: Session, shard_results: list[dict], now_time: pendulum.DateTime
+):
+    """Log what every shard found, advance the high-water mark in the same
+    transaction and send one alert for all of them"""
+    await _advance_timeliness_high_water_mark(session, now_time)
+    overdue_count, new_fail_results = await _log_new_overdue_executions(
+        session,
+        [
+            fail_result
+            for result in shard_results
+            for fail_result in result["fail_results"]
+        ],
+    )
+    return await _send_timeliness_alert(overdue_count, new_fail_results)
+
+
+async def db_check_pipeline_execution_timeliness_deadlines(
+    session: Session, pipeline_execution_ids: list[int]
+):
+    """Evaluate only the executions whose deadline just passed"""
+    logger.info(
+        f"Checking {len(pipeline_execution_ids)} expired pipeline execution deadline(s)"
+    )
+    overdue_count, new_fail_results = await _log_overdue_executions(
+        session,
+        "pe.id = ANY(:pipeline_execution_ids)",
+        {"pipeline_execution_ids": pipeline_execution_ids},
+        pendulum.now("UTC"),
+    )
+    return await _send_timeliness_alert(overdue_count, new_fail_results)
+
+
+async def _get_timeliness_high_water_mark(
+    session: Session,
+    now_time: pendulum.DateTime,
+    lookback_minutes: int,
+    for_update: bool = False,
+):
+    """Where the previous check stopped, seeded from the lookback on the first run"""
+    high_water_mark_query = select(MonitorHighWaterMark.high_water_mark).where(
+        MonitorHighWaterMark.check_name == TIMELINESS_CHECK_NAME
+    )
+    if for_update:
+        high_water_mark_query = high_water_mark_query.with_for_update()
+
+    high_water_mark = (await session.exec(high_water_mark_query)).scalar_one_or_none()
+    if high_water_mark is None:
+        high_water_mark = now_time.subtract(minutes=lookback_minutes)
+    return high_water_mark
+
+
+async def _advance_timeliness_high_water_mark(
+    session: Session, now_time: pendulum.DateTime
+) -> None:
+    """Move the mark forward to now_time, never backwards. The caller commits."""
+    upsert_stmt = insert(MonitorHighWaterMark).values(
+        check_name=TIMELINESS_CHECK_NAME, high_water_mark=now_time
+    )
+    await session.exec(
+        upsert_stmt.on_conflict_do_update(
+            index_elements=[MonitorHighWaterMark.check_name],
+            set_={
+                "high_water_mark": func.greatest(
+                    MonitorHighWaterMark.high_water_mark,
+                    upsert_stmt.excluded.high_water_mark,
+                ),
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+async def db_get_pipeline_execution_timeliness_deadline(
+    session: Session, pipeline_execution_id: int
+) -> Optional[datetime]:
+    """When the execution becomes overdue, None if muted or not configured"""
+    deadline_query = text(f"""
         SELECT
-            t.id,
-            t.pipeline_id,
-            t.duration_seconds,
-            t.start_date,
-            t.end_date,
-            t.completed_successfully,
-            p.timeliness_number AS child_timely_number,
-            p.timeliness_datepart AS child_timely_datepart,
-            pt.timeliness_number AS parent_timely_number,
-            pt.timeliness_datepart AS parent_timely_datepart
-        FROM {temp_table_name} AS t
+            (
+                (pe.start_date AT TIME ZONE 'UTC')
+                + COALESCE(
+                    {_timely_interval_sql("p.timeliness_number", "p.timeliness_datepart")},
+                    {_timely_interval_sql("pt.timeliness_number", "pt.timeliness_datepart")}
+                )
+            ) AT TIME ZONE 'UTC' AS deadline
+        FROM pipeline_execution AS pe
         INNER JOIN pipeline AS p
-            ON p.id = t.pipeline_id 
+            ON p.id = pe.pipeline_id
             AND p.mute_timeliness_check = FALSE
         INNER JOIN pipeline_type AS pt
-            ON pt.id = p.pipeline_type_id 
+            ON pt.id = p.pipeline_type_id
             AND pt.mute_timeliness_check = FALSE
+        WHERE pe.id = :pipeline_execution_id
     """)
-    executions_list = (await session.exec(results_query)).all()
-    await session.exec(text(f"DROP TABLE IF EXISTS {temp_table_name}"))
-    now_time = pendulum.now("UTC")
+    return (
+        await session.exec(
+            deadline_query, params={"pipeline_execution_id": pipeline_execution_id}
+        )
+    ).scalar_one_or_none()
 
-    fail_results = []
-    for execution in executions_list:
-        (
-            id,
-            pipeline_id,
-            duration_seconds,
-            start_date,
-            end_date,
-            completed_successfully,
-            child_number,
-            child_datepart,
-            parent_number,
-            parent_datepart,
-        ) = execution
-        if child_datepart and child_number:
-            timely_datepart = child_datepart
-            timely_number = child_number
-            used_child_config = True
-        elif parent_datepart and parent_number:
-            timely_datepart = parent_datepart
-            timely_number = parent_number
-            used_child_config = False
-        else:
-            logger.warning(
-                f"Execution {id} skipped - incomplete timely settings"
-                f"(child: {child_datepart}, {child_number}; parent: {parent_datepart}, {parent_number})"
-            )
-            continue
 
-        execution_threshold = _calculate_timely_time(
-            start_date, timely_datepart, timely_number
-        )
+async def _log_overdue_executions(
+    session: Session, execution_filter: str, params: dict, now_time: pendulum.DateTime
+) -> tuple[int, list[dict]]:
+    """Log and commit overdue executions among those matching the filter.
 
-        # Check if lookback period is shorter than execution threshold
-        execution_threshold_duration_minutes = int(
-            (execution_threshold - start_date).total_seconds() / 60
+    Returns how many executions are overdue and the ones logged for the first
+    time by this call, which are the ones to alert on.
+    """
+    fail_results = await _get_overdue_executions(
+        session, execution_filter, params, now_time
+    )
+    return await _log_new_overdue_executions(session, fail_results)
+
+
+async def _get_overdue_executions(
+    session: Session, execution_filter: str, params: dict, now_time: pendulum.DateTime
+) -> list[dict]:
+    """Overdue executions among those matching the filter.
+
+    Overdue executions and one warning row per misconfigured pipeline come back
+    from a single statement.
+    """
+    timeliness_query = text(f"""
+        WITH evaluated AS (
+            SELECT
+                pe.id,
+                pe.pipeline_id,
+                p.name AS pipeline_name,
+                pe.duration_seconds,
+                pe.start_date,
+                pe.end_date,
+                pe.completed_successfully,
+                child.timely_interval IS NOT NULL AS used_child_config,
+                CASE
+                    WHEN child.timely_interval IS NOT NULL THEN p.timeliness_number
+                    ELSE pt.timeliness_number
+                END AS timely_number,
+                CASE
+                    WHEN child.timely_interval IS NOT NULL THEN p.timeliness_datepart
+                    ELSE pt.timeliness_datepart
+                END AS timely_datepart,
+                (
+                    (pe.start_date AT TIME ZONE 'UTC')
+                    + COALESCE(child.timely_interval, parent.timely_interval)
+                ) AT TIME ZONE 'UTC' AS execution_threshold
+            FROM pipeline_execution AS pe
+            INNER JOIN pipeline AS p
+                ON p.id = pe.pipeline_id
+                AND p.mute_timeliness_check = FALSE
+            INNER JOIN pipeline_type AS pt
+                ON pt.id = p.pipeline_type_id
+                AND pt.mute_timeliness_check = FALSE
+            CROSS JOIN LATERAL (
+                SELECT {_timely_interval_sql("p.timeliness_number", "p.timeliness_datepart")} AS timely_interval
+            ) AS child
+            CROSS JOIN LATERAL (
+                SELECT {_timely_interval_sql("pt.timeliness_number", "pt.timeliness_datepart")} AS timely_interval
+            ) AS parent
+            WHERE {execution_filter}
+                AND pe.completed_successfully IS NOT FALSE
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM timeliness_pipeline_execution_log AS t
+                    WHERE t.pipeline_execution_id = pe.id
+                )
+        )
+        SELECT
+            'overdue' AS row_type,
+            id AS pipeline_execution_id,
+            pipeline_id,
+            pipeline_name,
+            CASE
+                WHEN completed_successfully IS NULL THEN 'running'
+                ELSE 'completed'
+            END AS execution_status,
+            CASE
+                WHEN completed_successfully IS NULL
+                    THEN FLOOR(EXTRACT(EPOCH FROM CAST(:now_time AS TIMESTAMPTZ) - start_date))::INTEGER
+                ELSE duration_seconds
+            END AS duration_seconds,
+            FLOOR(EXTRACT(EPOCH FROM execution_threshold - start_date))::INTEGER AS seconds_threshold,
+            timely_number,
+            timely_datepart,
+            used_child_config
+        FROM evaluated
+        WHERE (completed_successfully IS NULL AND CAST(:now_time AS TIMESTAMPTZ) > execution_threshold)
+            OR (completed_successfully AND end_date > execution_threshold)
+        UNION ALL
+        (
+            SELECT DISTINCT ON (pipeline_id)
+                'incomplete',
+                NULL,
+                pipeline_id,
+                NULL,
+                NULL,
+                NULL,
+                NULL,
+                NULL,
+                NULL,
+                NULL
+            FROM evaluated
+            WHERE execution_threshold IS NULL
         )
-        if lookback_minutes < execution_threshold_duration_minutes:
-            config_source = "child" if used_child_config else "parent"
+    """)
+    rows = (
+        await session.exec(
+            timeliness_query,
+            params={**params, "now_time": now_time},
+        )
+    ).all()
+
+    fail_results = []
+    for row in rows:
+        if row.row_type == "incomplete":
             logger.warning(
-                f"Pipeline {pipeline_id} execution threshold ({execution_threshold_duration_minutes} minutes, {config_source} config) "
-                f"exceeds lookback period ({lookback_minutes} minutes). "
-                f"Overdue executions may not be detected."
+                f"Pipeline {row.pipeline_id} executions skipped - incomplete timely settings"
             )
-
-        is_overdue = False
-        if completed_successfully is None:
-            # Running pipeline
-            if now_time > execution_threshold:
-                is_overdue = True
-                execution_status = "running"
-                actual_duration = int((now_time - start_date).total_seconds())
-        elif completed_successfully:
-            # Completed pipeline
-            if end_date > execution_threshold:
-                is_overdue = True
-                execution_status = "completed"
-                actual_duration = duration_seconds
         else:
-            continue
-
-        if is_overdue:
             fail_results.append(
                 {
-                    "pipeline_execution_id": id,
-                    "pipeline_id": pipeline_id,
-                    "duration_seconds": actual_duration,
-                    "seconds_threshold": int(
-                        (execution_threshold - start_date).total_seconds()
-                    ),
-                    "timely_number": timely_number,
-                    "timely_datepart": timely_datepart,
-                    "used_child_config": used_child_config,
-                    "execution_status": execution_status,
+                    "pipeline_execution_id": row.pipeline_execution_id,
+                    "pipeline_id": row.pipeline_id,
+                    "pipeline_name": row.pipeline_name,
+                    "duration_seconds": row.duration_seconds,
+                    "seconds_threshold": row.seconds_threshold,
+                    "timely_number": row.timely_number,
+                    "timely_datepart": row.timely_datepart,
+                    "used_child_config": row.used_child_config,
+                    "execution_status": row.execution_status,
                 }
             )
-    executions_list.clear()
+    rows.clear()
+    return fail_results
 
+
+async def _log_new_overdue_executions(
+    session: Session, fail_results: list[dict]
+) -> tuple[int, list[dict]]:
+    """Log and commit overdue executions, returning how many there are and the
+    ones logged for the first time by this call"""
     if fail_results:
         logger.warning(
             f"Pipeline Execution Timeliness Check Failed - {len(fail_results)} execution(s) overdue"
         )
 
-        # Check for PostgreSQL parameter limit (65,535)
-        # Each fail_result generates 7 values in the VALUES clause
-        total_values = len(fail_results) * 7
-        if total_values > 65000:
-            logger.error(
-                f"Too many values ({total_values}) - exceeds PostgreSQL parameter limit of 65,535"
+        inserted_execution_ids = set(
+            await _insert_new_log_rows(
+                session,
+                TimelinessPipelineExecutionLog,
+                [
+                    {
+                        "pipeline_execution_id": result["pipeline_execution_id"],
+                        "pipeline_id": result["pipeline_id"],
+                        "duration_seconds": result["duration_seconds"],
+                        "seconds_threshold": result["seconds_threshold"],
+                        "execution_status": result["execution_status"],
+                        "timely_number": result["timely_number"],
+                        "timely_datepart": result["timely_datepart"],
+                        "used_child_config": result["used_child_config"],
+                    }
+                    for result in fail_results
+                ],
+                [TimelinessPipelineExecutionLog.pipeline_execution_id],
+                TimelinessPipelineExecutionLog.pipeline_execution_id,
             )
-
-        values_sql = ",\n".join(
-            f"({result['pipeline_execution_id']}, {result['pipeline_id']}, {result['duration_seconds']}, {result['seconds_threshold']}, '{result['execution_status']}', {result['timely_number']}, '{result['timely_datepart']}'::datepartenum, {result['used_child_config']})"
-            for result in fail_results
         )
-        insert_query = text(f"""
-            INSERT INTO timeliness_pipeline_execution_log (pipeline_execution_id, pipeline_id, duration_seconds, seconds_threshold, execution_status, timely_number, timely_datepart, used_child_config)
-            SELECT 
-            v.pipeline_execution_id, 
-            v.pipeline_id, 
-            v.duration_seconds, 
-            v.seconds_threshold,
-            v.execution_status,
-            v.timely_number,
-            v.timely_datepart,
-            v.used_child_config
-            FROM (VALUES {values_sql}) AS v(pipeline_execution_id, pipeline_id, duration_seconds, seconds_threshold, execution_status, timely_number, timely_datepart, used_child_config)
-            WHERE NOT EXISTS (
-                SELECT 1 
-                FROM timeliness_pipeline_execution_log t
-                WHERE t.pipeline_execution_id = v.pipeline_execution_id
-            )
-            RETURNING pipeline_execution_id
-        """)
-
-        result = await session.exec(insert_query)
-        inserted_records = result.fetchall()
-        rows_inserted = result.rowcount
+        rows_inserted = len(inserted_execution_ids)
         await session.commit()
 
         logger.info(
             f"Inserted {rows_inserted} new timeliness pipeline execution log records"
         )
 
-        if rows_inserted > 0:
-            try:
-                inserted_execution_ids = {record[0] for record in inserted_records}
+        return len(fail_results), [
+            result
+            for result in fail_results
+            if result["pipeline_execution_id"] in inserted_execution_ids
+        ]
 
-                new_fail_results = [
-                    result
-                    for result in fail_results
-                    if result["pipeline_execution_id"] in inserted_execution_ids
-                ]
-
-                if new_fail_results:
-                    # Grab Pipeline Name for more readable output
-                    pipeline_ids = [
-                        result["pipeline_id"] for result in new_fail_results
-                    ]
-                    pipeline_names_query = text("""
-                        SELECT id, name 
-                        FROM pipeline 
-                        WHERE id = ANY(:pipeline_ids)
-                    """)
-                    pipeline_names_result = await session.exec(
-                        pipeline_names_query, params={"pipeline_ids": pipeline_ids}
-                    )
-                    pipeline_names = {row.id: row.name for row in pipeline_names_result}
-
-                    pipeline_details = "\n".join(
-                        f"\t• Pipeline '{pipeline_names.get(result['pipeline_id'], f'ID:{result["pipeline_id"]}')}' (Execution ID: {result['pipeline_execution_id']}): "
-                        f"{_format_duration_for_datepart(result['duration_seconds'], DatePartEnum(result['timely_datepart'].lower()))} ({result['execution_status']}), Expected within {result['timely_number']} {_get_display_datepart(result['timely_datepart'], result['timely_number'])} "
-                        f"({'child' if result['used_child_config'] else 'parent'} config)"
-                        for result in new_fail_results
-                    )
-
-                    await send_slack_message(
-                        level=AlertLevel.WARNING,
-                        title="Timeliness Check - Pipeline Execution",
-                        message=f"Pipeline Execution Timeliness Check - {len(new_fail_results)} new execution(s) overdue",
-                        details={"Failed Executions": "\n" + pipeline_details},
-                    )
-            except Exception as e:
-                logger.error(
-                    f"Failed to send Slack notification for timeliness executions: {e}"
-                )
-        else:
-            logger.info(
-                "No new timeliness failures to report - all failures were already logged"
-            )
+    await session.commit()
+    return 0, []
 
-        return {"status": "warning"}
-    else:
+
+async def _send_timeliness_alert(overdue_count: int, new_fail_results: list[dict]):
+    """One Slack message for every newly logged overdue execution"""
+    if not overdue_count:
         logger.info("All pipeline executions are within timely thresholds")
         return {"status": "success"}
+
+    if not new_fail_results:
+        logger.info(
+            "No new timeliness failures to report - all failures were already logged"
+        )
+        return {"status": "warning"}
+
+    try:
+        pipeline_details = "\n".join(
+            f"\t• Pipeline '{result['pipeline_name']}' (Execution ID: {result['pipeline_execution_id']}): "
+            f"{_format_duration_for_datepart(result['duration_seconds'], DatePartEnum(result['timely_datepart'].lower()))} ({result['execution_status']}), Expected within {result['timely_number']} {_get_display_datepart(result['timely_datepart'], result['timely_number'])} "
+            f"({'child' if result['used_child_config'] else 'parent'} config)"
+            for result in new_fail_results
+        )
+
+        await send_slack_message(
+            level=AlertLevel.WARNING,
+            title="Timeliness Check - Pipeline Execution",
+            message=f"Pipeline Execution Timeliness Check - {len(new_fail_results)} new execution(s) overdue",
+            details={"Failed Executions": "\n" + pipeline_details},
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to send Slack notification for timeliness executions: {e}"
+        )
+
+    return {"status": "warning"}
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Benchmark the address lineage closure algorithm"""
+
+import time
+
+from rich import box
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+
+from src.database.address_lineage_utils import compute_lineage_closure
+
+console = Console()
+
+
+def fixed_point_closure(addresses, edges):
+    """The previous algorithm, extending every path by every edge until no new
+    path appears. Kept as the reference the traversal must match."""
+    closure = set()
+    for n in addresses:
+        closure.add((n, n, 0, tuple([n])))
+    for source_address, target_address in edges:
+        closure.add(
+            (source_address, target_address, 1, tuple([source_address, target_address]))
+        )
+
+    added = True
+    while added:
+        added = False
+        new_transitive_paths = set()
+        for (
+            existing_source_address,
+            existing_target_address,
+            existing_depth,
+            existing_lineage_path,
+        ) in closure:
+            if existing_depth == 0:
+                continue
+            for source_address, target_address in edges:
+                if source_address == existing_target_address:
+                    candidate = (
+                        existing_source_address,
+                        target_address,
+                        existing_depth + 1,
+                        tuple(list(existing_lineage_path) + [target_address]),
+                    )
+                    if candidate not in closure:
+                        new_transitive_paths.add(candidate)
+                        added = True
+        closure.update(new_transitive_paths)
+
+    return closure
+
+
+def chain_graph(length):
+    """a0 -> a1 -> ... -> a(length)"""
+    return set(range(length + 1)), {(i, i + 1) for i in range(length)}
+
+
+def fan_out_graph(width):
+    """One source feeding width targets, each feeding its own leaf"""
+    edges = set()
+    for i in range(width):
+        edges.add((0, i + 1))
+        edges.add((i + 1, width + i + 1))
+    return set(range(2 * width + 1)), edges
+
+
+def diamond_graph(layers, width):
+    """Layers of width nodes, every node linked to every node of the next layer"""
+    edges = set()
+    for layer in range(layers - 1):
+        for i in range(width):
+            for j in range(width):
+                edges.add((layer * width + i, (layer + 1) * width + j))
+    return set(range(layers * width)), edges
+
+
+def _timed(algorithm, addresses, edges):
+    start = time.perf_counter()
+    closure = list(algorithm(addresses, edges))
+    return time.perf_counter() - start, closure
+
+
+def run_benchmark():
+    console.print(
+        Panel.fit(
+            "[bold blue]Address Lineage Closure Benchmark[/bold blue]",
+            border_style="blue",
+        )
+    )
+
+    scenarios = [
+        ("Chain (80 edges)", *chain_graph(80)),
+        ("Fan-out (1000 edges)", *fan_out_graph(500)),
+        ("Diamonds (5 layers x 6)", *diamond_graph(5, 6)),
+    ]
+
+    table = Table(show_header=True, header_style="bold green", box=box.ROUNDED)
+    table.add_column("Graph", style="cyan")
+    table.add_column("Edges", justify="right")
+    table.add_column("Paths", justify="right")
+    table.add_column("Fixed Point (s)", justify="right", style="red")
+    table.add_column("Traversal (s)", justify="right", style="green")
+    table.add_column("Speedup", justify="right", style="bold")
+    table.add_column("Shortest Only (s)", justify="right", style="green")
+    table.add_column("Shortest Rows", justify="right")
+
+    for name, addresses, edges in scenarios:
+        fixed_point_time, expected = _timed(fixed_point_closure, addresses, edges)
+        traversal_time, closure = _timed(compute_lineage_closure, addresses, edges)
+        shortest_time, shortest = _timed(
+            lambda addresses, edges: compute_lineage_closure(addresses, edges, 1),
+            addresses,
+            edges,
+        )
+
+        if set(closure) != set(expected) or len(closure) != len(expected):
+            console.print(f"[red]{name}: traversal output differs[/red]")
+
+        table.add_row(
+            name,
+            str(len(edges)),
+            str(len(closure)),
+            f"{fixed_point_time:.3f}",
+            f"{traversal_time:.4f}",
+            f"{fixed_point_time / max(traversal_time, 1e-9):.0f}x",
+            f"{shortest_time:.4f}",
+            str(len(shortest)),
+        )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Rebuild the whole address lineage closure table"""
+
+import argparse
+import asyncio
+import time
+
+from rich import box
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.database.address_lineage_utils import db_rebuild_full_closure_table
+from src.settings import get_database_config
+
+console = Console()
+
+
+async def rebuild_lineage_closure(workers=None):
+    """Rebuild address_lineage_closure for every connected component at once"""
+    console.print(
+        Panel.fit(
+            "[bold blue]Address Lineage Closure Rebuild[/bold blue]",
+            border_style="blue",
+        )
+    )
+
+    db_config = get_database_config()
+    engine = create_async_engine(
+        url=db_config["sqlalchemy.url"],
+        future=db_config["sqlalchemy.future"],
+        connect_args=db_config.get("sqlalchemy.connect_args", {}),
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    try:
+        start_time = time.perf_counter()
+        async with sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )() as session:
+            result = await db_rebuild_full_closure_table(session, max_workers=workers)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        await engine.dispose()
+
+    table = Table(show_header=True, header_style="bold green", box=box.ROUNDED)
+    table.add_column("Components", justify="right")
+    table.add_column("Closure Rows", justify="right")
+    table.add_column("Deleted", justify="right", style="red")
+    table.add_column("Inserted", justify="right", style="green")
+    table.add_column("Time (s)", justify="right", style="bold")
+    table.add_row(
+        str(result["components"]),
+        str(result["closure_rows"]),
+        str(result["deleted"]),
+        str(result["inserted"]),
+        f"{elapsed:.3f}",
+    )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes computing component closures, defaults to one per CPU",
+    )
+    asyncio.run(rebuild_lineage_closure(parser.parse_args().workers))
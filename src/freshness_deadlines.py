@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Optional
+
+import pendulum
+import structlog
+
+from src.redis_client import get_redis_client, open_redis_client, pop_expired_members
+from src.settings import config
+
+logger = structlog.get_logger(__name__)
+
+FRESHNESS_DEADLINES_KEY = "watcher:freshness_deadlines"
+
+
+def freshness_deadlines_enabled() -> bool:
+    return bool(config.REDIS_URL) and bool(
+        config.WATCHER_FRESHNESS_DEADLINE_CHECK_SECONDS
+    )
+
+
+async def sync_freshness_deadlines(deadlines: dict[int, Optional[datetime]]) -> None:
+    """Register when pipelines become stale, dropping the ones without a deadline"""
+    scheduled = {
+        str(pipeline_id): deadline.timestamp()
+        for pipeline_id, deadline in deadlines.items()
+        if deadline is not None
+    }
+    cancelled = [
+        str(pipeline_id)
+        for pipeline_id, deadline in deadlines.items()
+        if deadline is None
+    ]
+
+    try:
+        client = get_redis_client()
+        if scheduled:
+            await client.zadd(FRESHNESS_DEADLINES_KEY, scheduled)
+        if cancelled:
+            await client.zrem(FRESHNESS_DEADLINES_KEY, *cancelled)
+    except Exception as e:
+        logger.warning(f"Error syncing freshness deadlines: {e}")
+
+
+async def pop_expired_freshness_deadlines(now: pendulum.DateTime) -> list[int]:
+    """Claim every pipeline deadline at or before now"""
+    return [
+        int(member)
+        for member in await pop_expired_members(
+            FRESHNESS_DEADLINES_KEY, now.timestamp()
+        )
+    ]
+
+
+async def requeue_pending_freshness_deadlines(
+    deadlines: dict[int, Optional[datetime]], now: pendulum.DateTime
+) -> None:
+    """Put back claimed pipelines whose deadline moved past now.
+
+    A deadline is claimed at the score it was scheduled with, so settings
+    changed since then can leave the pipeline not yet stale. The scheduled
+    freshness check also passes every pending deadline here, which seeds the
+    ones never synced to Redis.
+    """
+    pending = {
+        str(pipeline_id): deadline.timestamp()
+        for pipeline_id, deadline in deadlines.items()
+        if deadline is not None and deadline > now
+    }
+    if not pending:
+        return
+
+    client = open_redis_client()
+    try:
+        await client.zadd(FRESHNESS_DEADLINES_KEY, pending)
+    finally:
+        await client.aclose()
@@ -0,0 +1,220 @@
+import asyncio
+from array import array
+from collections import defaultdict, deque
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import structlog
+from sqlmodel import Session
+
+from src.database.address_lineage_utils import (
+    db_get_lineage_changes,
+    db_get_lineage_snapshot,
+    db_get_lineage_versions,
+)
+
+logger = structlog.get_logger(__name__)
+
+# Edge changes kept beside the arrays before they are rebuilt with them
+LINEAGE_INDEX_OVERLAY_LIMIT = 10000
+
+
+def _build_csr(
+    rows: Sequence[int], columns: Sequence[int], size: int
+) -> tuple[array, array]:
+    """Compressed sparse rows of the edges, offsets[n]:offsets[n + 1] slices
+    the columns of row n. Columns keep the order the edges come in."""
+    offsets = array("I", bytes(4 * (size + 1)))
+    for row in rows:
+        offsets[row + 1] += 1
+    for row in range(size):
+        offsets[row + 1] += offsets[row]
+
+    positions = array("I", offsets)
+    targets = array("I", bytes(4 * len(columns)))
+    for row, column in zip(rows, columns):
+        targets[positions[row]] = column
+        positions[row] += 1
+
+    return offsets, targets
+
+
+class LineageIndex:
+    """Address lineage held in arrays, for traversals that skip the database.
+
+    Edges are kept twice in compressed sparse row form, by source and by
+    target, as unsigned 32 bit address ids: about 8 bytes per edge plus 8
+    per address id. Changes replayed from address_lineage_change go to a
+    small overlay on top, folded into the arrays once it grows past
+    LINEAGE_INDEX_OVERLAY_LIMIT.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        source_address_ids: Sequence[int],
+        target_address_ids: Sequence[int],
+    ):
+        self.version = version
+        self._build(source_address_ids, target_address_ids)
+
+    def _build(
+        self, source_address_ids: Sequence[int], target_address_ids: Sequence[int]
+    ) -> None:
+        size = (
+            max(max(source_address_ids, default=0), max(target_address_ids, default=0))
+            + 1
+        )
+        self._downstream_offsets, self._downstream = _build_csr(
+            source_address_ids, target_address_ids, size
+        )
+        self._upstream_offsets, self._upstream = _build_csr(
+            target_address_ids, source_address_ids, size
+        )
+        self._added_downstream = defaultdict(set)
+        self._added_upstream = defaultdict(set)
+        self._removed = set()
+
+    def _base_neighbors(self, address_id: int, upstream: bool) -> array:
+        offsets = self._upstream_offsets if upstream else self._downstream_offsets
+        if not 0 <= address_id < len(offsets) - 1:
+            return array("I")
+        neighbors = self._upstream if upstream else self._downstream
+        return neighbors[offsets[address_id] : offsets[address_id + 1]]
+
+    def neighbors(self, address_id: int, upstream: bool = False) -> List[int]:
+        """Addresses one edge away, downstream unless upstream is set"""
+        neighbors = self._base_neighbors(address_id, upstream)
+        if self._removed:
+            neighbors = [
+                neighbor
+                for neighbor in neighbors
+                if ((neighbor, address_id) if upstream else (address_id, neighbor))
+                not in self._removed
+            ]
+        added = (self._added_upstream if upstream else self._added_downstream).get(
+            address_id
+        )
+        if added:
+            return [*neighbors, *sorted(added)]
+        return list(neighbors)
+
+    def edges(self) -> Iterable[Tuple[int, int]]:
+        for source_address_id in range(len(self._downstream_offsets) - 1):
+            for target_address_id in self._base_neighbors(source_address_id, False):
+                if (source_address_id, target_address_id) not in self._removed:
+                    yield source_address_id, target_address_id
+        for source_address_id, target_address_ids in self._added_downstream.items():
+            for target_address_id in target_address_ids:
+                yield source_address_id, target_address_id
+
+    def _has_base_edge(self, source_address_id: int, target_address_id: int) -> bool:
+        return target_address_id in self._base_neighbors(source_address_id, False)
+
+    def apply_changes(self, changes: Iterable[Tuple[int, int, int, bool]]) -> None:
+        """Replay (version, source, target, removed) changes in version order"""
+        for version, source_address_id, target_address_id, removed in changes:
+            edge = (source_address_id, target_address_id)
+            if removed:
+                self._added_downstream[source_address_id].discard(target_address_id)
+                self._added_upstream[target_address_id].discard(source_address_id)
+                if self._has_base_edge(*edge):
+                    self._removed.add(edge)
+            elif edge in self._removed:
+                self._removed.discard(edge)
+            elif not self._has_base_edge(*edge):
+                self._added_downstream[source_address_id].add(target_address_id)
+                self._added_upstream[target_address_id].add(source_address_id)
+            self.version = version
+
+        overlay = len(self._removed) + sum(
+            len(targets) for targets in self._added_downstream.values()
+        )
+        if overlay > LINEAGE_INDEX_OVERLAY_LIMIT:
+            source_address_ids, target_address_ids = [], []
+            for source_address_id, target_address_id in sorted(self.edges()):
+                source_address_ids.append(source_address_id)
+                target_address_ids.append(target_address_id)
+            self._build(source_address_ids, target_address_ids)
+
+    def traverse(
+        self, address_id: int, upstream: bool = False, max_depth: int = 0
+    ) -> List[Tuple[int, int]]:
+        """Every address reachable from address_id as (address_id, depth), at
+        its shortest depth, breadth first. max_depth 0 walks the whole way."""
+        depths = {address_id: 0}
+        reached = []
+        queue = deque([address_id])
+        while queue:
+            current = queue.popleft()
+            depth = depths[current] + 1
+            if max_depth and depth > max_depth:
+                continue
+            for neighbor in self.neighbors(current, upstream):
+                if neighbor not in depths:
+                    depths[neighbor] = depth
+                    reached.append((neighbor, depth))
+                    queue.append(neighbor)
+        return reached
+
+    def path(
+        self, source_address_id: int, target_address_id: int
+    ) -> Optional[List[int]]:
+        """A shortest lineage path from source to target, None when there is none"""
+        parents = {source_address_id: None}
+        queue = deque([source_address_id])
+        while queue:
+            current = queue.popleft()
+            if current == target_address_id:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                return path[::-1]
+            for neighbor in self.neighbors(current):
+                if neighbor not in parents:
+                    parents[neighbor] = current
+                    queue.append(neighbor)
+        return None
+
+
+_lineage_index: Optional[LineageIndex] = None
+_lineage_index_lock = asyncio.Lock()
+
+
+async def get_lineage_index(session: Session) -> LineageIndex:
+    """This worker's lineage index, caught up with the latest lineage version.
+
+    Changes past the index version are replayed when they are all still
+    logged, otherwise the index is loaded again from address_lineage.
+    """
+    global _lineage_index
+
+    oldest_version, latest_version = await db_get_lineage_versions(session)
+    if _lineage_index is not None and latest_version == _lineage_index.version:
+        return _lineage_index
+
+    async with _lineage_index_lock:
+        index = _lineage_index
+        if index is not None and latest_version == index.version:
+            return index
+
+        if (
+            index is None
+            or latest_version < index.version
+            or oldest_version > index.version + 1
+        ):
+            (
+                version,
+                source_address_ids,
+                target_address_ids,
+            ) = await db_get_lineage_snapshot(session)
+            _lineage_index = LineageIndex(
+                version, source_address_ids, target_address_ids
+            )
+            logger.info(
+                f"Loaded lineage index at version {version} with {len(source_address_ids)} edges"
+            )
+            return _lineage_index
+
+        index.apply_changes(await db_get_lineage_changes(session, index.version))
+        return index
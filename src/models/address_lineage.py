@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from src.models.address import AddressPostInput
-from src.types import ValidatorModel
+from src.types import LineageDirectionEnum, ValidatorModel
 
 
 class AddressLineagePostInput(ValidatorModel):
@@ -14,3 +14,27 @@ class AddressLineagePostOutput(ValidatorModel):
     pipeline_id: int
     lineage_relationships_created: int
     message: Optional[str] = None
+
+
+class AddressLineageCycle(ValidatorModel):
+    address_ids: List[int]
+    pipeline_ids: List[int]
+
+
+class LineageTraversalAddress(ValidatorModel):
+    address_id: int
+    depth: int
+
+
+class LineageTraversal(ValidatorModel):
+    address_id: int
+    direction: LineageDirectionEnum
+    lineage_version: int
+    addresses: List[LineageTraversalAddress]
+
+
+class LineagePath(ValidatorModel):
+    source_address_id: int
+    target_address_id: int
+    lineage_version: int
+    address_ids: List[int]
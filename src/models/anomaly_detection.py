@@ -1,6 +1,7 @@
 from typing import List, Optional
 
-from pydantic import Field
+from pydantic import Field, model_validator
+from pydantic_extra_types.pendulum_dt import DateTime
 
 from src.types import AnomalyMetricFieldEnum, ValidatorModel
 
@@ -26,6 +27,12 @@ class AnomalyDetectionRulePostInput(ValidatorModel):
         default=30,
         description="Minimum executions needed for baseline calculation",
     )
+    baseline_sample_size: Optional[int] = Field(
+        default=None,
+        ge=5,
+        le=100000,
+        description="Cap the baseline at a uniform sample of this many executions per hour",
+    )
     active: bool = Field(default=True)
 
 
@@ -51,6 +58,12 @@ class AnomalyDetectionRulePatchInput(ValidatorModel):
         le=1000,
         description="Minimum executions needed for baseline calculation",
     )
+    baseline_sample_size: Optional[int] = Field(
+        None,
+        ge=5,
+        le=100000,
+        description="Cap the baseline at a uniform sample of this many executions per hour",
+    )
     active: Optional[bool] = Field(default=True)
 
 
@@ -62,3 +75,60 @@ class UnflagAnomalyInput(ValidatorModel):
     pipeline_id: int
     pipeline_execution_id: int
     metric_field: List[AnomalyMetricFieldEnum]
+
+
+class AnomalyDetectionBackfillPostInput(ValidatorModel):
+    pipeline_id: Optional[int] = None
+    pipeline_type_id: Optional[int] = None
+    start_date: DateTime
+    end_date: Optional[DateTime] = None
+    pipelines_per_chunk: int = Field(
+        ge=1,
+        le=1000,
+        default=25,
+        description="Number of pipelines re-scored by each backfill task",
+    )
+
+    @model_validator(mode="after")
+    def validate_date_range(self):
+        if self.end_date is not None and self.end_date <= self.start_date:
+            raise ValueError("end_date must be greater than start_date")
+        return self
+
+
+class AnomalyDetectionBackfillPostOutput(ValidatorModel):
+    status: str
+    pipelines: int
+    chunks: int
+
+
+class AnomalyGetOutput(ValidatorModel):
+    pipeline_execution_id: int
+    rule_id: int
+    pipeline_id: int
+    pipeline_name: str
+    metric_field: AnomalyMetricFieldEnum
+    violation_value: float
+    z_score: float
+    historical_mean: float
+    std_deviation_value: float
+    z_threshold: float
+    threshold_min_value: float
+    threshold_max_value: float
+    context: Optional[dict] = None
+    detected_at: DateTime
+
+
+class AnomalyPipelineSummaryOutput(ValidatorModel):
+    pipeline_id: int
+    pipeline_name: str
+    anomalies: int
+
+
+class AnomalyFeedGetOutput(ValidatorModel):
+    data: List[AnomalyGetOutput]
+    next_cursor: Optional[str] = None
+    summary: Optional[List[AnomalyPipelineSummaryOutput]] = Field(
+        default=None,
+        description="Anomaly counts per pipeline for the filters, first page only",
+    )
@@ -49,5 +49,20 @@ class PipelineExecutionGetOutput(ValidatorModel):
     child_executions: Optional[List["PipelineExecutionGetOutput"]] = None
 
 
+class RunningPipelineExecutionGetOutput(ValidatorModel):
+    id: int
+    pipeline_id: int
+    start_date: DateTime
+    running_seconds: int
+
+
+class PipelineExecutionCloseStaleInput(ValidatorModel):
+    stale_after_minutes: int = Field(ge=5, default=1440)
+
+
+class PipelineExecutionCloseStaleOutput(ValidatorModel):
+    closed_ids: List[int]
+
+
 # Rebuild the model to self-reference the model
 PipelineExecutionGetOutput.model_rebuild()
@@ -0,0 +1,50 @@
+import redis.asyncio as redis
+
+from src.settings import config
+
+# Shared client for the API process
+_redis_client = None
+
+# Expired sorted set members claimed per round trip
+ZSET_POP_BATCH_SIZE = 1000
+
+
+def get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(config.REDIS_URL, decode_responses=True)
+    return _redis_client
+
+
+def open_redis_client():
+    """New client for Celery tasks, each task runs on a fresh event loop so the
+    shared client can't be reused. Close it with aclose()."""
+    return redis.from_url(config.REDIS_URL, decode_responses=True)
+
+
+async def pop_expired_members(key: str, max_score: float) -> list[str]:
+    """Claim every member of a sorted set scored at or below max_score.
+
+    Members are only returned by the call whose ZREM removed them, so
+    concurrent consumers never claim the same member twice.
+    """
+    client = open_redis_client()
+    expired = []
+    try:
+        while True:
+            members = await client.zrangebyscore(
+                key, "-inf", max_score, start=0, num=ZSET_POP_BATCH_SIZE
+            )
+            if not members:
+                break
+            async with client.pipeline(transaction=False) as pipe:
+                for member in members:
+                    pipe.zrem(key, member)
+                removed = await pipe.execute()
+            expired.extend(member for member, count in zip(members, removed) if count)
+            if len(members) < ZSET_POP_BATCH_SIZE:
+                break
+    finally:
+        await client.aclose()
+
+    return expired
@@ -1,12 +1,31 @@
-from fastapi import APIRouter, Response, status
+from typing import Optional
 
-from src.celery_tasks import address_lineage_closure_rebuild_task
-from src.database.address_lineage_utils import db_create_address_lineage
+from fastapi import APIRouter, Query, Response, status
+
+from src.celery_tasks import (
+    address_lineage_closure_rebuild_task,
+    pending_address_lineage_closure_rebuild_task,
+)
+from src.closure_rebuilds import (
+    buffer_closure_rebuild,
+    closure_rebuild_debounce_enabled,
+)
+from src.database.address_lineage_utils import (
+    db_create_address_lineage,
+    db_filter_addresses_by_type,
+    db_get_address_lineage_cycles,
+)
 from src.database.session import SessionDep
+from src.lineage_index import get_lineage_index
 from src.models.address_lineage import (
+    AddressLineageCycle,
     AddressLineagePostInput,
     AddressLineagePostOutput,
+    LineagePath,
+    LineageTraversal,
 )
+from src.settings import config
+from src.types import LineageDirectionEnum
 
 router = APIRouter()
 
@@ -21,14 +40,104 @@ async def create_address_lineage(
     response: Response,
     session: SessionDep,
 ):
-    result, affected_address_ids, pipeline_id = await db_create_address_lineage(
+    (
+        result,
+        affected_address_ids,
+        pipeline_id,
+        changed_edges,
+    ) = await db_create_address_lineage(
         session=session, lineage_input=lineage_input, response=response
     )
 
     if affected_address_ids:
-        address_lineage_closure_rebuild_task.delay(
-            connected_addresses=list(affected_address_ids),
-            pipeline_id=pipeline_id,
-        )
+        # Posts within the debounce window share one rebuild
+        schedule_rebuild = None
+        if closure_rebuild_debounce_enabled():
+            schedule_rebuild = await buffer_closure_rebuild(
+                affected_address_ids, changed_edges, pipeline_id
+            )
+
+        if schedule_rebuild is None:
+            address_lineage_closure_rebuild_task.delay(
+                connected_addresses=list(affected_address_ids),
+                pipeline_id=pipeline_id,
+                changed_edges=[list(edge) for edge in changed_edges],
+            )
+        elif schedule_rebuild:
+            pending_address_lineage_closure_rebuild_task.apply_async(
+                countdown=config.WATCHER_CLOSURE_REBUILD_DEBOUNCE_SECONDS
+            )
 
     return result
+
+
+@router.get(
+    "/address_lineage/cycles",
+    response_model=list[AddressLineageCycle],
+    status_code=status.HTTP_200_OK,
+)
+async def get_address_lineage_cycles(session: SessionDep):
+    """Groups of addresses whose lineage loops back on itself"""
+    return await db_get_address_lineage_cycles(session=session)
+
+
+@router.get(
+    "/lineage/traverse",
+    response_model=LineageTraversal,
+    status_code=status.HTTP_200_OK,
+)
+async def traverse_lineage(
+    session: SessionDep,
+    address_id: int,
+    direction: LineageDirectionEnum = Query(LineageDirectionEnum.DOWNSTREAM),
+    max_depth: int = Query(0, ge=0),
+    address_type_name: Optional[str] = Query(None),
+):
+    """Addresses up or downstream of an address, from this worker's lineage index.
+
+    Depth 0 walks the whole lineage. The address type only filters what is
+    returned, the walk still goes through addresses of other types.
+    """
+    index = await get_lineage_index(session)
+    reached = index.traverse(
+        address_id,
+        upstream=direction == LineageDirectionEnum.UPSTREAM,
+        max_depth=max_depth,
+    )
+
+    if address_type_name is not None and reached:
+        matching = await db_filter_addresses_by_type(
+            session, (reached_id for reached_id, _ in reached), address_type_name
+        )
+        reached = [
+            (reached_id, depth)
+            for reached_id, depth in reached
+            if reached_id in matching
+        ]
+
+    return {
+        "address_id": address_id,
+        "direction": direction,
+        "lineage_version": index.version,
+        "addresses": [
+            {"address_id": reached_id, "depth": depth} for reached_id, depth in reached
+        ],
+    }
+
+
+@router.get(
+    "/lineage/path",
+    response_model=LineagePath,
+    status_code=status.HTTP_200_OK,
+)
+async def get_lineage_path(
+    session: SessionDep, source_address_id: int, target_address_id: int
+):
+    """A shortest lineage path between two addresses, empty when there is none"""
+    index = await get_lineage_index(session)
+    return {
+        "source_address_id": source_address_id,
+        "target_address_id": target_address_id,
+        "lineage_version": index.version,
+        "address_ids": index.path(source_address_id, target_address_id) or [],
+    }
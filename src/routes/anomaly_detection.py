@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Response, status
+from typing import Optional
+
+import pendulum
+from fastapi import APIRouter, Query, Response, status
+from pydantic_extra_types.pendulum_dt import DateTime
 from sqlalchemy import select
 
+from src.celery_tasks import anomaly_detection_backfill_task
 from src.database.anomaly_detection_utils import (
+    db_get_anomalies,
+    db_get_anomaly_backfill_pipeline_ids,
     db_get_or_create_anomaly_detection_rule,
     db_unflag_anomaly,
     db_update_anomaly_detection_rule,
@@ -9,11 +16,15 @@ from src.database.anomaly_detection_utils import (
 from src.database.models.anomaly_detection import AnomalyDetectionRule
 from src.database.session import SessionDep
 from src.models.anomaly_detection import (
+    AnomalyDetectionBackfillPostInput,
+    AnomalyDetectionBackfillPostOutput,
     AnomalyDetectionRulePatchInput,
     AnomalyDetectionRulePostInput,
     AnomalyDetectionRulePostOutput,
+    AnomalyFeedGetOutput,
     UnflagAnomalyInput,
 )
+from src.types import AnomalyMetricFieldEnum
 
 router = APIRouter()
 
@@ -64,6 +75,63 @@ async def update_anomaly_detection_rule(
     return await db_update_anomaly_detection_rule(session=session, patch=rule)
 
 
+@router.get(
+    "/anomalies",
+    response_model=AnomalyFeedGetOutput,
+    status_code=status.HTTP_200_OK,
+)
+async def get_anomalies(
+    session: SessionDep,
+    pipeline_id: Optional[int] = Query(None),
+    pipeline_type_id: Optional[int] = Query(None),
+    metric_field: Optional[AnomalyMetricFieldEnum] = Query(None),
+    rule_id: Optional[int] = Query(None),
+    start_date: Optional[DateTime] = Query(None),
+    end_date: Optional[DateTime] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    return await db_get_anomalies(
+        session=session,
+        pipeline_id=pipeline_id,
+        pipeline_type_id=pipeline_type_id,
+        metric_field=metric_field,
+        rule_id=rule_id,
+        start_date=start_date,
+        end_date=end_date,
+        cursor=cursor,
+        limit=limit,
+    )
+
+
 @router.post("/unflag_anomaly", status_code=status.HTTP_204_NO_CONTENT)
 async def unflag_anomaly(input: UnflagAnomalyInput, session: SessionDep):
     return await db_unflag_anomaly(session=session, input=input)
+
+
+@router.post(
+    "/anomaly_detection_backfill",
+    response_model=AnomalyDetectionBackfillPostOutput,
+    status_code=status.HTTP_200_OK,
+)
+async def backfill_anomaly_detection(
+    backfill: AnomalyDetectionBackfillPostInput, session: SessionDep
+):
+    pipeline_ids = await db_get_anomaly_backfill_pipeline_ids(
+        session=session, backfill=backfill
+    )
+    end_date = backfill.end_date or pendulum.now("UTC")
+
+    # One task per chunk of pipelines, spread across the worker pool
+    chunks = [
+        pipeline_ids[i : i + backfill.pipelines_per_chunk]
+        for i in range(0, len(pipeline_ids), backfill.pipelines_per_chunk)
+    ]
+    for chunk in chunks:
+        anomaly_detection_backfill_task.delay(
+            pipeline_ids=chunk,
+            start_date=backfill.start_date.isoformat(),
+            end_date=end_date.isoformat(),
+        )
+
+    return {"status": "queued", "pipelines": len(pipeline_ids), "chunks": len(chunks)}
@@ -7,6 +7,7 @@ from fastapi.exceptions import HTTPException
 
 from src.notifier import AlertLevel, send_slack_message
 from src.settings import config
+from src.single_flight import get_skipped_single_flight_runs, single_flight_enabled
 
 logger = structlog.get_logger(__name__)
 
@@ -42,6 +43,7 @@ async def check_celery_queue():
         # Count tasks by type for both queues
         task_counts = {
             "detect_anomalies_task": 0,
+            "anomaly_detection_backfill_task": 0,
             "timeliness_check_task": 0,
             "freshness_check_task": 0,
             "address_lineage_closure_rebuild_task": 0,
@@ -67,6 +69,8 @@ async def check_celery_queue():
                 # Celery uses full module paths like 'src.celery_tasks.detect_anomalies_task'
                 if "detect_anomalies_task" in task_name:
                     task_counts["detect_anomalies_task"] += 1
+                elif "anomaly_detection_backfill_task" in task_name:
+                    task_counts["anomaly_detection_backfill_task"] += 1
                 elif "timeliness_check_task" in task_name:
                     task_counts["timeliness_check_task"] += 1
                 elif "freshness_check_task" in task_name:
@@ -109,6 +113,13 @@ async def check_celery_queue():
             len(regular_messages) + len(scheduled_messages) + beat_scheduled_tasks
         )
 
+        # Scheduled runs dropped because the previous one was still going
+        skipped_scheduled_runs = {}
+        if single_flight_enabled():
+            skipped_scheduled_runs = await loop.run_in_executor(
+                None, get_skipped_single_flight_runs
+            )
+
         if total_pending >= 100:
             alert_level = AlertLevel.CRITICAL
         elif total_pending >= 50:
@@ -133,6 +144,7 @@ async def check_celery_queue():
                 "beat_scheduled_tasks": beat_scheduled_tasks,
                 "task_breakdown": task_breakdown_formatted,
                 "task_breakdown_raw": task_counts,  # Keep raw data for programmatic use
+                "skipped_scheduled_runs": skipped_scheduled_runs,
             }
 
         try:
@@ -150,6 +162,7 @@ async def check_celery_queue():
                 "Scheduled queue": len(scheduled_messages),
                 "Beat scheduled tasks": beat_scheduled_tasks,
                 "Task breakdown": task_breakdown_formatted,
+                "Skipped scheduled runs": skipped_scheduled_runs,
             }
 
             await send_slack_message(
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Response, status
 from sqlalchemy import select
 
+from src.database.freshness_utils import db_get_pipeline_freshness_deadlines
 from src.database.models.pipeline import Pipeline
 from src.database.pipeline_utils import db_get_or_create_pipeline, db_update_pipeline
 from src.database.session import SessionDep
+from src.freshness_deadlines import (
+    freshness_deadlines_enabled,
+    sync_freshness_deadlines,
+)
 from src.models.pipeline import (
     PipelinePatchInput,
     PipelinePostInput,
@@ -17,10 +22,19 @@ router = APIRouter()
 async def get_or_create_pipeline(
     pipeline: PipelinePostInput, response: Response, session: SessionDep
 ):
-    return await db_get_or_create_pipeline(
+    result, data_changed = await db_get_or_create_pipeline(
         session=session, pipeline=pipeline, response=response
     )
 
+    if data_changed and freshness_deadlines_enabled():
+        await sync_freshness_deadlines(
+            await db_get_pipeline_freshness_deadlines(
+                session, pipeline_ids=[result["id"]]
+            )
+        )
+
+    return result
+
 
 @router.get("/pipeline", response_model=list[Pipeline], status_code=status.HTTP_200_OK)
 async def get_pipelines(session: SessionDep):
@@ -38,4 +52,9 @@ async def get_pipeline(pipeline_id: int, session: SessionDep):
 
 @router.patch("/pipeline", response_model=Pipeline, status_code=status.HTTP_200_OK)
 async def update_pipeline(pipeline: PipelinePatchInput, session: SessionDep):
-    return await db_update_pipeline(session=session, patch=pipeline)
+    result = await db_update_pipeline(session=session, patch=pipeline)
+
+    if freshness_deadlines_enabled():
+        await sync_freshness_deadlines({result.id: result.freshness_deadline})
+
+    return result
@@ -1,21 +1,51 @@
-from fastapi import APIRouter, status
+from typing import Optional
 
+import pendulum
+from fastapi import APIRouter, Query, status
+
+from src.anomaly_baseline_cache import within_cached_baseline_bounds
 from src.celery_tasks import (
     detect_anomalies_task,
     pipeline_execution_closure_maintain_task,
 )
+from src.database.freshness_utils import db_get_pipeline_freshness_deadlines
 from src.database.pipeline_execution_utils import (
+    db_close_stale_pipeline_executions,
     db_end_pipeline_execution,
     db_get_pipeline_execution,
+    db_get_running_pipeline_executions,
     db_start_pipeline_execution,
 )
 from src.database.session import SessionDep
+from src.database.timeliness_utils import (
+    db_get_pipeline_execution_timeliness_deadline,
+)
+from src.freshness_deadlines import (
+    freshness_deadlines_enabled,
+    sync_freshness_deadlines,
+)
 from src.models.pipeline_execution import (
+    PipelineExecutionCloseStaleInput,
+    PipelineExecutionCloseStaleOutput,
     PipelineExecutionEndInput,
     PipelineExecutionGetOutput,
     PipelineExecutionStartInput,
     PipelineExecutionStartOutput,
+    RunningPipelineExecutionGetOutput,
+)
+from src.running_executions import (
+    get_mirrored_running_executions,
+    mirror_running_execution,
+    running_executions_mirror_enabled,
+    seed_running_executions,
+    unmirror_running_executions,
+)
+from src.timeliness_deadlines import (
+    cancel_timeliness_deadline,
+    schedule_timeliness_deadline,
+    timeliness_deadlines_enabled,
 )
+from src.types import AnomalyMetricFieldEnum
 
 router = APIRouter()
 
@@ -39,6 +69,18 @@ async def start_pipeline_execution(
             execution_id=result["id"], parent_id=pipeline_execution.parent_id
         )
 
+    if running_executions_mirror_enabled():
+        await mirror_running_execution(
+            result["id"], pipeline_execution.pipeline_id, pipeline_execution.start_date
+        )
+
+    if timeliness_deadlines_enabled():
+        deadline = await db_get_pipeline_execution_timeliness_deadline(
+            session, result["id"]
+        )
+        if deadline is not None:
+            await schedule_timeliness_deadline(result["id"], deadline)
+
     return result
 
 
@@ -47,18 +89,117 @@ async def end_pipeline_execution(
     pipeline_execution: PipelineExecutionEndInput,
     session: SessionDep,
 ):
-    pipeline_id = await db_end_pipeline_execution(
+    execution = await db_end_pipeline_execution(
         pipeline_execution=pipeline_execution, session=session
     )
 
+    if running_executions_mirror_enabled():
+        await unmirror_running_executions(pipeline_execution.id)
+
+    if timeliness_deadlines_enabled():
+        await cancel_timeliness_deadline(pipeline_execution.id)
+
+    # The freshness deadline only moves when a successful execution wrote rows
+    if (
+        pipeline_execution.completed_successfully
+        and (
+            pipeline_execution.inserts
+            or pipeline_execution.updates
+            or pipeline_execution.soft_deletes
+        )
+        and freshness_deadlines_enabled()
+    ):
+        await sync_freshness_deadlines(
+            await db_get_pipeline_freshness_deadlines(
+                session, pipeline_ids=[execution.pipeline_id]
+            )
+        )
+
     # Queue anomaly detection as a Celery task for faster response
     if pipeline_execution.completed_successfully:
+        # Skip the task when every metric sits inside the cached baseline
+        if await within_cached_baseline_bounds(
+            execution.pipeline_id,
+            execution.hour_recorded,
+            {
+                metric.value: getattr(execution, metric.value)
+                for metric in AnomalyMetricFieldEnum
+            },
+        ):
+            return
+
         detect_anomalies_task.delay(
-            pipeline_id=pipeline_id,
+            pipeline_id=execution.pipeline_id,
             pipeline_execution_id=pipeline_execution.id,
         )
 
 
+@router.get(
+    "/pipeline_execution/running",
+    response_model=list[RunningPipelineExecutionGetOutput],
+    status_code=status.HTTP_200_OK,
+)
+async def get_running_pipeline_executions(
+    session: SessionDep,
+    pipeline_id: Optional[int] = Query(None),
+    stale_after_minutes: Optional[int] = Query(None, ge=0),
+):
+    now_time = pendulum.now("UTC")
+    started_before = (
+        now_time.subtract(minutes=stale_after_minutes)
+        if stale_after_minutes is not None
+        else None
+    )
+
+    executions = None
+    if running_executions_mirror_enabled():
+        executions = await get_mirrored_running_executions(pipeline_id, started_before)
+    if executions is None:
+        executions = await db_get_running_pipeline_executions(
+            session, pipeline_id, started_before
+        )
+
+        # Fill an unseeded mirror, the hourly reconciliation catches the rest
+        if running_executions_mirror_enabled():
+            await seed_running_executions(
+                executions
+                if pipeline_id is None and started_before is None
+                else await db_get_running_pipeline_executions(session)
+            )
+
+    return [
+        {
+            **execution,
+            "running_seconds": int(
+                (now_time - execution["start_date"]).total_seconds()
+            ),
+        }
+        for execution in executions
+    ]
+
+
+@router.post(
+    "/pipeline_execution/close_stale",
+    response_model=PipelineExecutionCloseStaleOutput,
+    status_code=status.HTTP_200_OK,
+)
+async def close_stale_pipeline_executions(
+    input: PipelineExecutionCloseStaleInput, session: SessionDep
+):
+    closed_ids = await db_close_stale_pipeline_executions(
+        session, input.stale_after_minutes
+    )
+
+    if running_executions_mirror_enabled():
+        await unmirror_running_executions(*closed_ids)
+
+    if timeliness_deadlines_enabled():
+        for pipeline_execution_id in closed_ids:
+            await cancel_timeliness_deadline(pipeline_execution_id)
+
+    return {"closed_ids": closed_ids}
+
+
 @router.get(
     "/pipeline_execution/{pipeline_execution_id}",
     response_model=PipelineExecutionGetOutput,
@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Response, status
 from sqlalchemy import select
 
+from src.database.freshness_utils import db_get_pipeline_freshness_deadlines
 from src.database.models.pipeline_type import PipelineType
 from src.database.pipeline_type_utils import (
     db_get_or_create_pipeline_type,
     db_update_pipeline_type,
 )
 from src.database.session import SessionDep
+from src.freshness_deadlines import (
+    freshness_deadlines_enabled,
+    sync_freshness_deadlines,
+)
 from src.models.pipeline_type import (
     PipelineTypePatchInput,
     PipelineTypePostInput,
@@ -51,4 +56,13 @@ async def get_pipeline_type(pipeline_type_id: int, session: SessionDep):
 async def update_pipeline_type(
     pipeline_type: PipelineTypePatchInput, session: SessionDep
 ):
-    return await db_update_pipeline_type(patch=pipeline_type, session=session)
+    result = await db_update_pipeline_type(patch=pipeline_type, session=session)
+
+    if freshness_deadlines_enabled():
+        await sync_freshness_deadlines(
+            await db_get_pipeline_freshness_deadlines(
+                session, pipeline_type_id=result.id
+            )
+        )
+
+    return result
@@ -0,0 +1,167 @@
+from datetime import datetime
+from typing import Optional
+
+import orjson
+import pendulum
+import structlog
+from sqlmodel import Session
+
+from src.database.pipeline_execution_utils import (
+    db_get_ended_pipeline_execution_ids,
+    db_get_running_pipeline_executions,
+)
+from src.redis_client import get_redis_client, open_redis_client
+from src.settings import config
+
+logger = structlog.get_logger(__name__)
+
+RUNNING_EXECUTIONS_KEY = "watcher:running_executions"
+# Present once the mirror was filled from the database, reads fall back to
+# the database until then
+RUNNING_EXECUTIONS_SEEDED_KEY = "watcher:running_executions:seeded"
+
+
+def running_executions_mirror_enabled() -> bool:
+    return bool(config.REDIS_URL) and bool(config.WATCHER_RUNNING_EXECUTIONS_MIRROR)
+
+
+def _encode_running_execution(pipeline_id: int, start_date: datetime) -> bytes:
+    return orjson.dumps(
+        {"pipeline_id": pipeline_id, "start_date": start_date.timestamp()}
+    )
+
+
+async def mirror_running_execution(
+    pipeline_execution_id: int, pipeline_id: int, start_date: datetime
+) -> None:
+    """Add a started execution to the Redis copy of the running set"""
+    try:
+        await get_redis_client().hset(
+            RUNNING_EXECUTIONS_KEY,
+            str(pipeline_execution_id),
+            _encode_running_execution(pipeline_id, start_date),
+        )
+    except Exception as e:
+        logger.warning(
+            f"Error mirroring running execution {pipeline_execution_id}: {e}"
+        )
+
+
+async def unmirror_running_executions(*pipeline_execution_ids: int) -> None:
+    """Drop ended or closed executions from the Redis copy"""
+    if not pipeline_execution_ids:
+        return
+
+    try:
+        await get_redis_client().hdel(
+            RUNNING_EXECUTIONS_KEY,
+            *(
+                str(pipeline_execution_id)
+                for pipeline_execution_id in pipeline_execution_ids
+            ),
+        )
+    except Exception as e:
+        logger.warning(f"Error removing running executions from mirror: {e}")
+
+
+async def _seed_running_executions(client, executions: list[dict]) -> None:
+    async with client.pipeline(transaction=True) as pipe:
+        if executions:
+            pipe.hset(
+                RUNNING_EXECUTIONS_KEY,
+                mapping={
+                    str(execution["id"]): _encode_running_execution(
+                        execution["pipeline_id"], execution["start_date"]
+                    )
+                    for execution in executions
+                },
+            )
+        pipe.set(RUNNING_EXECUTIONS_SEEDED_KEY, 1)
+        await pipe.execute()
+
+
+async def seed_running_executions(executions: list[dict]) -> None:
+    """Fill the mirror with every running execution read from the database.
+
+    Only adds, so executions started meanwhile are kept. One that ended
+    between the read and the seed stays until the next reconciliation.
+    """
+    try:
+        await _seed_running_executions(get_redis_client(), executions)
+    except Exception as e:
+        logger.warning(f"Error seeding running executions mirror: {e}")
+
+
+async def reconcile_running_executions(session: Session) -> None:
+    """Bring the mirror in line with the database, run by the timeliness check.
+
+    Adds the running executions the mirror missed, such as ones started
+    before it was enabled or whose mirroring failed, then drops the mirrored
+    ones the database has ended. Ended executions are looked up after the
+    add, so one ending in between does not linger.
+    """
+    client = open_redis_client()
+    try:
+        await _seed_running_executions(
+            client, await db_get_running_pipeline_executions(session)
+        )
+        ended_ids = await db_get_ended_pipeline_execution_ids(
+            session,
+            [
+                int(pipeline_execution_id)
+                for pipeline_execution_id in await client.hkeys(RUNNING_EXECUTIONS_KEY)
+            ],
+        )
+        if ended_ids:
+            await client.hdel(
+                RUNNING_EXECUTIONS_KEY,
+                *(str(pipeline_execution_id) for pipeline_execution_id in ended_ids),
+            )
+        logger.info(
+            f"Reconciled running executions mirror, dropped {len(ended_ids)} ended executions"
+        )
+    except Exception as e:
+        logger.warning(f"Error reconciling running executions mirror: {e}")
+    finally:
+        await client.aclose()
+
+
+async def get_mirrored_running_executions(
+    pipeline_id: Optional[int] = None,
+    started_before: Optional[datetime] = None,
+) -> Optional[list[dict]]:
+    """Running executions from Redis, oldest first.
+
+    Returns None on error or before the mirror was seeded, so callers fall
+    back to the database.
+    """
+    try:
+        async with get_redis_client().pipeline(transaction=True) as pipe:
+            pipe.get(RUNNING_EXECUTIONS_SEEDED_KEY)
+            pipe.hgetall(RUNNING_EXECUTIONS_KEY)
+            seeded, mirrored = await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Error reading running executions mirror: {e}")
+        return None
+
+    if not seeded:
+        return None
+
+    executions = []
+    for pipeline_execution_id, value in mirrored.items():
+        execution = orjson.loads(value)
+        if pipeline_id is not None and execution["pipeline_id"] != pipeline_id:
+            continue
+        if (
+            started_before is not None
+            and execution["start_date"] >= started_before.timestamp()
+        ):
+            continue
+        executions.append(
+            {
+                "id": int(pipeline_execution_id),
+                "pipeline_id": execution["pipeline_id"],
+                "start_date": pendulum.from_timestamp(execution["start_date"]),
+            }
+        )
+    return sorted(executions, key=lambda execution: execution["start_date"])
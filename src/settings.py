@@ -24,12 +24,41 @@ class GlobalConfig(BaseConfig):
     WATCHER_AUTO_CREATE_ANOMALY_DETECTION_RULES: Optional[bool] = False
     WATCHER_TIMELINESS_CHECK_LOOKBACK_MINUTES: Optional[int] = 60
     WATCHER_TIMELINESS_CHECK_SCHEDULE: Optional[str] = (
-        "*/15 * * * *"  # Every 15 minutes
+        "0 * * * *"  # Every hour at :00, safety net for missed deadlines
+    )
+    WATCHER_TIMELINESS_DEADLINE_CHECK_SECONDS: Optional[int] = (
+        15  # 0 disables per-execution deadlines
+    )
+    WATCHER_FRESHNESS_CHECK_SCHEDULE: Optional[str] = (
+        "0 * * * *"  # Every hour at :00, covers pipelines whose deadline never reached Redis
+    )
+    WATCHER_FRESHNESS_DEADLINE_CHECK_SECONDS: Optional[int] = (
+        15  # 0 disables per-pipeline deadlines
+    )
+    WATCHER_SINGLE_FLIGHT_LEASE_SECONDS: Optional[int] = (
+        300  # 0 lets scheduled checks overlap
+    )
+    WATCHER_MONITOR_CHECK_SHARDS: Optional[int] = (
+        1  # Parallel subtasks per scheduled freshness and timeliness check
     )
-    WATCHER_FRESHNESS_CHECK_SCHEDULE: Optional[str] = "0 * * * *"  # Every hour at :00
     WATCHER_CELERY_QUEUE_HEALTH_CHECK_SCHEDULE: Optional[str] = (
         "*/5 * * * *"  # Every 5 minutes
     )
+    WATCHER_ANOMALY_BASELINE_CACHE_TTL_SECONDS: Optional[int] = (
+        3600  # 0 disables the inline pre-check
+    )
+    WATCHER_RUNNING_EXECUTIONS_MIRROR: Optional[bool] = (
+        False  # Serve /pipeline_execution/running from Redis
+    )
+    WATCHER_CLOSURE_REBUILD_DEBOUNCE_SECONDS: Optional[int] = (
+        5  # 0 rebuilds the closure after every lineage post
+    )
+    WATCHER_LINEAGE_CLOSURE_MAX_PATHS: Optional[int] = (
+        0  # Shortest depths kept per address pair, 0 keeps every depth
+    )
+    WATCHER_LINEAGE_CLOSURE_PATH_LIMIT: Optional[int] = (
+        1000000  # Paths walked before a closure keeps only shortest paths
+    )
     PROFILING_ENABLED: Optional[bool] = False
     REDIS_URL: Optional[str] = None
 
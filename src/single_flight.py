@@ -0,0 +1,118 @@
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+import redis
+import structlog
+from redis.lock import Lock
+
+from src.settings import config
+
+logger = structlog.get_logger(__name__)
+
+SINGLE_FLIGHT_KEY_PREFIX = "watcher:single_flight"
+
+# Hash of check name to how many scheduled runs were skipped
+SKIPPED_RUNS_KEY = "watcher:single_flight_skipped_runs"
+
+
+def single_flight_enabled() -> bool:
+    return bool(config.REDIS_URL) and bool(config.WATCHER_SINGLE_FLIGHT_LEASE_SECONDS)
+
+
+def _single_flight_lock(client: redis.Redis, check_name: str) -> Lock:
+    return client.lock(
+        f"{SINGLE_FLIGHT_KEY_PREFIX}:{check_name}",
+        timeout=config.WATCHER_SINGLE_FLIGHT_LEASE_SECONDS,
+        thread_local=False,
+    )
+
+
+def start_single_flight(check_name: str) -> Optional[str]:
+    """Claim the lease for a new run of a scheduled check.
+
+    Returns the token to hand to the run, or None when a run is still in
+    flight. Skipped runs are counted in SKIPPED_RUNS_KEY so a schedule that
+    is too tight shows up in the queue health check.
+    """
+    client = redis.Redis.from_url(config.REDIS_URL)
+    try:
+        token = uuid.uuid4().hex
+        if _single_flight_lock(client, check_name).acquire(blocking=False, token=token):
+            return token
+
+        skipped = client.hincrby(SKIPPED_RUNS_KEY, check_name, 1)
+        logger.warning(
+            f"Skipping scheduled {check_name} check, previous run still in progress ({skipped} skipped so far)"
+        )
+        return None
+    finally:
+        client.close()
+
+
+@contextmanager
+def single_flight_lease(
+    check_name: str,
+    token: Optional[str],
+    release: bool = True,
+    keep_on_error: bool = False,
+):
+    """Heartbeat the lease while the run works, then release it.
+
+    A run whose lease already expired takes it back if it is free, otherwise
+    a newer run owns it and this one carries on without heartbeating. With
+    keep_on_error a failed run holds on to the lease, so its retry enters
+    again with the same token before a new scheduled run can start.
+    """
+    if not token or not single_flight_enabled():
+        yield
+        return
+
+    client = redis.Redis.from_url(config.REDIS_URL)
+    lock = _single_flight_lock(client, check_name)
+    lock.local.token = token.encode()
+    if not lock.owned() and not lock.acquire(blocking=False, token=token):
+        logger.warning(f"Lease for {check_name} check was taken by a newer run")
+        client.close()
+        yield
+        return
+
+    stop_heartbeat = threading.Event()
+
+    def heartbeat():
+        while not stop_heartbeat.wait(config.WATCHER_SINGLE_FLIGHT_LEASE_SECONDS / 3):
+            try:
+                lock.reacquire()
+            except Exception as e:
+                logger.warning(f"Error extending lease for {check_name} check: {e}")
+
+    heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+    heartbeat_thread.start()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        stop_heartbeat.set()
+        heartbeat_thread.join()
+        if release and not (failed and keep_on_error):
+            try:
+                lock.release()
+            except Exception as e:
+                logger.warning(f"Error releasing lease for {check_name} check: {e}")
+        client.close()
+
+
+def get_skipped_single_flight_runs() -> dict[str, int]:
+    """How many scheduled runs were skipped per check"""
+    client = redis.Redis.from_url(config.REDIS_URL)
+    try:
+        return {
+            check_name.decode(): int(count)
+            for check_name, count in client.hgetall(SKIPPED_RUNS_KEY).items()
+        }
+    finally:
+        client.close()
@@ -82,9 +82,11 @@ async def truncate_tables():
                     anomaly_detection_result,
                     anomaly_detection_rule,
                     timeliness_pipeline_execution_log,
+                    monitor_high_water_mark,
                     pipeline_execution_closure,
                     pipeline_execution,
                     address_lineage_closure,
+                    address_lineage_change,
                     address_lineage,
                     pipeline,
                     address,
@@ -99,6 +101,16 @@ async def truncate_tables():
         print(f"Warning: Failed to truncate tables: {e}")
 
 
+@pytest.fixture(autouse=True)
+def reset_lineage_index():
+    """Drop the in-process lineage index, its versions restart with the tables"""
+    import src.lineage_index
+
+    src.lineage_index._lineage_index = None
+    yield
+    src.lineage_index._lineage_index = None
+
+
 @pytest.fixture(scope="session", autouse=True)
 async def setup_teardown():
     try:
@@ -191,10 +203,114 @@ def mock_celery_tasks():
     from celery import Task
 
     Task.delay = mock_delay
+    Task.apply_async = mock_delay.apply_async
 
     yield mock_delay
 
 
+class FakeRedis:
+    """In-memory stand-in for the few Redis commands Watcher uses"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        hash_ = self.store.setdefault(key, {})
+        if field is not None:
+            hash_[field] = value
+        hash_.update(mapping or {})
+
+    async def hdel(self, key, *fields):
+        hash_ = self.store.get(key, {})
+        return sum(hash_.pop(field, None) is not None for field in fields)
+
+    async def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+    async def hkeys(self, key):
+        return list(self.store.get(key, {}))
+
+    async def sadd(self, key, *members):
+        self.store.setdefault(key, set()).update(members)
+
+    async def smembers(self, key):
+        return set(self.store.get(key, set()))
+
+    async def zadd(self, key, mapping):
+        self.store.setdefault(key, {}).update(mapping)
+
+    async def zrem(self, key, *members):
+        sorted_set = self.store.get(key, {})
+        return sum(sorted_set.pop(str(member), None) is not None for member in members)
+
+    async def zrangebyscore(self, key, min, max, start=None, num=None):
+        members = sorted(
+            (score, member)
+            for member, score in self.store.get(key, {}).items()
+            if (min == "-inf" or score >= float(min)) and score <= float(max)
+        )
+        members = [member for _, member in members]
+        if start is not None:
+            members = members[start : start + num]
+        return members
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakeRedisPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append(getattr(self.redis, name)(*args, **kwargs))
+
+        return queue
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point Watcher's Redis client at an in-memory fake"""
+    import src.redis_client
+    from src.settings import config
+
+    fake = FakeRedis()
+    monkeypatch.setattr(config, "REDIS_URL", "redis://")
+    monkeypatch.setattr(src.redis_client, "_redis_client", fake)
+    monkeypatch.setattr(
+        src.redis_client.redis, "from_url", lambda *args, **kwargs: fake
+    )
+
+    yield fake
+
+
 @pytest.fixture()
 async def async_client(client) -> AsyncGenerator:
     async with AsyncClient(
@@ -1,9 +1,29 @@
+from queue import Queue
+from unittest.mock import AsyncMock, Mock
+
 import pytest
+from anyio import to_thread
 from httpx import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import select, text
 
-from src.database.address_lineage_utils import db_rebuild_closure_table_incremental
+import src.lineage_index
+from src import celery_tasks
+from src.closure_rebuilds import pop_pending_closure_rebuild
+from src.database import address_lineage_utils
+from src.database.address_lineage_utils import (
+    _compute_component_closures,
+    _count_lineage_paths,
+    _lineage_components,
+    compute_lineage_closure,
+    db_maintain_closure_components,
+    db_rebuild_closure_table_incremental,
+    db_rebuild_full_closure_table,
+    db_update_closure_edges,
+    find_lineage_cycles,
+)
 from src.database.models.address_lineage import AddressLineageClosure
+from src.lineage_index import LineageIndex
+from src.settings import config
 from src.tests.conftest import AsyncSessionLocal
 from src.tests.fixtures.address_lineage import (
     TEST_ADDRESS_LINEAGE_CHAIN_FIRST_LINK_DATA,
@@ -118,6 +138,39 @@ async def test_update_address_lineage_replaces_existing(async_client: AsyncClien
     assert response.json()["lineage_relationships_created"] == 1
 
 
+@pytest.mark.anyio
+async def test_unchanged_address_lineage_skips_rebuild(
+    async_client: AsyncClient, mock_celery_tasks
+):
+    """Test posting the same lineage again writes nothing and rebuilds nothing"""
+    pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+    pipeline_data["load_lineage"] = True
+    await async_client.post("/pipeline", json=pipeline_data)
+
+    response = await async_client.post(
+        "/address_lineage", json=TEST_ADDRESS_LINEAGE_MULTIPLE_SOURCES_AND_TARGETS_DATA
+    )
+    assert response.status_code == 201
+    assert "connected_addresses" in mock_celery_tasks.call_args.kwargs
+
+    async with AsyncSessionLocal() as session:
+        lineage_ids_query = text("SELECT id FROM address_lineage ORDER BY id")
+        lineage_ids = (await session.exec(lineage_ids_query)).scalars().all()
+
+    mock_celery_tasks.reset_mock()
+    response = await async_client.post(
+        "/address_lineage", json=TEST_ADDRESS_LINEAGE_MULTIPLE_SOURCES_AND_TARGETS_DATA
+    )
+    assert response.json()["lineage_relationships_created"] == 4
+    assert not any(
+        "connected_addresses" in call.kwargs
+        for call in mock_celery_tasks.call_args_list
+    )
+
+    async with AsyncSessionLocal() as session:
+        assert (await session.exec(lineage_ids_query)).scalars().all() == lineage_ids
+
+
 @pytest.mark.anyio
 async def test_closure_table_rebuild_function(async_client: AsyncClient):
     """Test the closure table rebuild function directly"""
@@ -262,3 +315,800 @@ async def test_closure_table_transitive_paths(async_client: AsyncClient):
         assert len(all_closure_records) == 6, (
             f"Expected 6 closure records, got {len(all_closure_records)}"
         )
+
+
+@pytest.mark.anyio
+async def test_compute_lineage_closure_diamond():
+    """Every path of a diamond is kept, each with its own lineage_path"""
+    closure = compute_lineage_closure({1, 2, 3, 4}, {(1, 2), (1, 3), (2, 4), (3, 4)})
+
+    assert sorted(closure) == [
+        (1, 1, 0, (1,)),
+        (1, 2, 1, (1, 2)),
+        (1, 3, 1, (1, 3)),
+        (1, 4, 2, (1, 2, 4)),
+        (1, 4, 2, (1, 3, 4)),
+        (2, 2, 0, (2,)),
+        (2, 4, 1, (2, 4)),
+        (3, 3, 0, (3,)),
+        (3, 4, 1, (3, 4)),
+        (4, 4, 0, (4,)),
+    ]
+
+
+@pytest.mark.anyio
+async def test_compute_lineage_closure_max_paths():
+    """Only the shortest depths of each pair are kept, with their lowest path"""
+    edges = {(1, 2), (2, 3), (3, 4), (1, 3), (1, 4)}
+
+    def paths_to_4(max_paths):
+        return sorted(
+            path
+            for path in compute_lineage_closure({1}, edges, max_paths)
+            if path[1] == 4
+        )
+
+    assert paths_to_4(0) == [
+        (1, 4, 1, (1, 4)),
+        (1, 4, 2, (1, 3, 4)),
+        (1, 4, 3, (1, 2, 3, 4)),
+    ]
+    assert paths_to_4(1) == [(1, 4, 1, (1, 4))]
+    assert paths_to_4(2) == [(1, 4, 1, (1, 4)), (1, 4, 2, (1, 3, 4))]
+
+    # Without a cap in reach, every depth keeps the path a rebuild would keep
+    diamond_edges = {
+        (layer * 3 + i, (layer + 1) * 3 + j)
+        for layer in range(3)
+        for i in range(3)
+        for j in range(3)
+    }
+    lowest_paths = {}
+    for source, target, depth, lineage_path in compute_lineage_closure(
+        range(12), diamond_edges
+    ):
+        key = (source, target, depth)
+        lowest_paths[key] = min(lowest_paths.get(key, lineage_path), lineage_path)
+    assert sorted(compute_lineage_closure(range(12), diamond_edges, 10)) == sorted(
+        (*key, lineage_path) for key, lineage_path in lowest_paths.items()
+    )
+
+    # Paths are counted without walking them, capped just past the limit
+    walked = sum(1 for _ in compute_lineage_closure(range(12), diamond_edges))
+    assert _count_lineage_paths(range(12), diamond_edges, walked) == walked
+    assert _count_lineage_paths(range(12), diamond_edges, 10) == 11
+
+
+@pytest.mark.anyio
+async def test_closure_table_rebuild_path_limit(async_client: AsyncClient, monkeypatch):
+    """Test a closure past the path limit only keeps shortest paths"""
+    monkeypatch.setattr(config, "WATCHER_LINEAGE_CLOSURE_PATH_LIMIT", 5)
+
+    pipeline_ids = []
+    for name in ["Pipeline 1", "Pipeline 2"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    # A -> B, A -> C, then B -> C, 7 paths with A -> C at depths 1 and 2
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[0],
+            "source_addresses": [_lineage_address("A")],
+            "target_addresses": [_lineage_address("B"), _lineage_address("C")],
+        },
+    )
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[1],
+            "source_addresses": [_lineage_address("B")],
+            "target_addresses": [_lineage_address("C")],
+        },
+    )
+
+    async with AsyncSessionLocal() as session:
+        await db_rebuild_closure_table_incremental(
+            session=session, connected_addresses={1}, pipeline_id=pipeline_ids[1]
+        )
+        closure_records = (
+            await session.exec(
+                select(
+                    AddressLineageClosure.source_address_id,
+                    AddressLineageClosure.target_address_id,
+                    AddressLineageClosure.depth,
+                )
+            )
+        ).all()
+
+    assert sorted(closure_records) == [
+        (1, 1, 0),
+        (1, 2, 1),
+        (1, 3, 1),
+        (2, 2, 0),
+        (2, 3, 1),
+        (3, 3, 0),
+    ]
+
+    # Joining every path through B -> C in place would go past the limit too
+    async with AsyncSessionLocal() as session:
+        assert not await db_update_closure_edges(session, {(2, 3)}, pipeline_ids[1])
+        assert len((await session.exec(select(AddressLineageClosure.depth))).all()) == 6
+
+
+@pytest.mark.anyio
+async def test_closure_table_rebuild_discovers_component(async_client: AsyncClient):
+    """Test a rebuild seeded with one address covers its whole component"""
+    for name in ["Pipeline 1", "Pipeline 2"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        await async_client.post("/pipeline", json=pipeline_data)
+
+    await async_client.post(
+        "/address_lineage", json=TEST_ADDRESS_LINEAGE_CHAIN_FIRST_LINK_DATA
+    )
+    await async_client.post(
+        "/address_lineage", json=TEST_ADDRESS_LINEAGE_CHAIN_SECOND_LINK_DATA
+    )
+
+    async with AsyncSessionLocal() as session:
+        # Only the last address of 1 -> 2 -> 3 is passed in
+        await db_rebuild_closure_table_incremental(
+            session=session, connected_addresses={3}, pipeline_id=2
+        )
+
+        closure_records = (
+            await session.exec(
+                select(
+                    AddressLineageClosure.source_address_id,
+                    AddressLineageClosure.target_address_id,
+                    AddressLineageClosure.depth,
+                )
+            )
+        ).all()
+
+    assert sorted(closure_records) == [
+        (1, 1, 0),
+        (1, 2, 1),
+        (1, 3, 2),
+        (2, 2, 0),
+        (2, 3, 1),
+        (3, 3, 0),
+    ]
+
+
+@pytest.mark.anyio
+async def test_closure_table_rebuild_diamond(async_client: AsyncClient):
+    """Test equal length paths through a diamond keep one closure row"""
+
+    def address(name):
+        return {
+            "name": name,
+            "address_type_name": "databricks",
+            "address_type_group_name": "database",
+        }
+
+    pipeline_ids = []
+    for name in ["Pipeline 1", "Pipeline 2"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    # A -> B, A -> C, then B -> D, C -> D
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[0],
+            "source_addresses": [address("A")],
+            "target_addresses": [address("B"), address("C")],
+        },
+    )
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[1],
+            "source_addresses": [address("B"), address("C")],
+            "target_addresses": [address("D")],
+        },
+    )
+
+    async with AsyncSessionLocal() as session:
+        await db_rebuild_closure_table_incremental(
+            session=session, connected_addresses={1}, pipeline_id=pipeline_ids[1]
+        )
+
+        diamond_paths = (
+            (
+                await session.exec(
+                    select(AddressLineageClosure.lineage_path)
+                    .where(AddressLineageClosure.source_address_id == 1)
+                    .where(AddressLineageClosure.target_address_id == 4)
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+    assert diamond_paths == [[1, 2, 4]]
+
+
+def _lineage_address(name):
+    return {
+        "name": name,
+        "address_type_name": "databricks",
+        "address_type_group_name": "database",
+    }
+
+
+@pytest.mark.anyio
+async def test_closure_table_rebuild_keeps_unchanged_rows(async_client: AsyncClient):
+    """Test a rebuild only deletes and inserts the closure rows that changed"""
+    pipeline_ids = []
+    for name in ["Pipeline 1", "Pipeline 2"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    # A -> B, A -> C, then B -> D, C -> D
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[0],
+            "source_addresses": [_lineage_address("A")],
+            "target_addresses": [_lineage_address("B"), _lineage_address("C")],
+        },
+    )
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[1],
+            "source_addresses": [_lineage_address("B"), _lineage_address("C")],
+            "target_addresses": [_lineage_address("D")],
+        },
+    )
+
+    closure_rows_query = text("""
+        SELECT source_address_id, target_address_id, depth, ctid::text AS row_id
+        FROM address_lineage_closure
+    """)
+
+    async with AsyncSessionLocal() as session:
+        await db_rebuild_closure_table_incremental(
+            session=session, connected_addresses={1}, pipeline_id=pipeline_ids[1]
+        )
+        rows_before = {
+            (row.source_address_id, row.target_address_id, row.depth): row.row_id
+            for row in (await session.exec(closure_rows_query)).all()
+        }
+
+    # Drop B -> D
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[1],
+            "source_addresses": [_lineage_address("C")],
+            "target_addresses": [_lineage_address("D")],
+        },
+    )
+
+    async with AsyncSessionLocal() as session:
+        await db_rebuild_closure_table_incremental(
+            session=session, connected_addresses={3, 4}, pipeline_id=pipeline_ids[1]
+        )
+        rows_after = {
+            (row.source_address_id, row.target_address_id, row.depth): row.row_id
+            for row in (await session.exec(closure_rows_query)).all()
+        }
+
+    assert set(rows_before) - set(rows_after) == {(2, 4, 1)}
+    # A -> D switches from [1, 2, 4] to [1, 3, 4], every other row is untouched
+    assert {key for key in rows_after if rows_after[key] != rows_before[key]} == {
+        (1, 4, 2)
+    }
+
+
+@pytest.mark.anyio
+async def test_closure_edge_changes_match_rebuild(
+    async_client: AsyncClient, mock_celery_tasks
+):
+    """Test applying edge changes in place ends with the closure of a rebuild"""
+    pipeline_ids = []
+    for name in ["Pipeline 1", "Pipeline 2", "Pipeline 3"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    closure_query = select(
+        AddressLineageClosure.source_address_id,
+        AddressLineageClosure.target_address_id,
+        AddressLineageClosure.depth,
+        AddressLineageClosure.lineage_path,
+    )
+
+    lineage_posts = [
+        # A -> B, A -> C
+        (0, ["A"], ["B", "C"]),
+        # B -> D, C -> D
+        (1, ["B", "C"], ["D"]),
+        # D -> E
+        (2, ["D"], ["E"]),
+        # Drop B -> D, the lowest path from A to D and E
+        (1, ["C"], ["D"]),
+        # Drop A -> C, A no longer reaches D and E
+        (0, ["A"], ["B"]),
+    ]
+    for pipeline_index, sources, targets in lineage_posts:
+        await async_client.post(
+            "/address_lineage",
+            json={
+                "pipeline_id": pipeline_ids[pipeline_index],
+                "source_addresses": [_lineage_address(name) for name in sources],
+                "target_addresses": [_lineage_address(name) for name in targets],
+            },
+        )
+        task_kwargs = mock_celery_tasks.call_args.kwargs
+
+        async with AsyncSessionLocal() as session:
+            assert await db_update_closure_edges(
+                session,
+                {tuple(edge) for edge in task_kwargs["changed_edges"]},
+                task_kwargs["pipeline_id"],
+            )
+            updated_closure = sorted((await session.exec(closure_query)).all())
+
+            await db_rebuild_closure_table_incremental(
+                session=session,
+                connected_addresses={1, 2, 3, 4, 5}
+                & {address_id for row in updated_closure for address_id in row[:2]},
+                pipeline_id=task_kwargs["pipeline_id"],
+            )
+            rebuilt_closure = sorted((await session.exec(closure_query)).all())
+
+        assert updated_closure == rebuilt_closure
+
+    assert (1, 4, 2, [1, 3, 4]) not in rebuilt_closure
+    assert (3, 5, 2, [3, 4, 5]) in rebuilt_closure
+
+
+@pytest.mark.anyio
+async def test_closure_edge_changes_closing_cycle_together(async_client: AsyncClient):
+    """Test edges merged from two posts that form a cycle rebuild the component"""
+    pipeline_ids = []
+    for name in ["Pipeline 1", "Pipeline 2"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    # A -> B and B -> A in the same debounce window
+    for pipeline_id, source, target in zip(pipeline_ids, ["A", "B"], ["B", "A"]):
+        await async_client.post(
+            "/address_lineage",
+            json={
+                "pipeline_id": pipeline_id,
+                "source_addresses": [_lineage_address(source)],
+                "target_addresses": [_lineage_address(target)],
+            },
+        )
+
+    async with AsyncSessionLocal() as session:
+        assert not await db_update_closure_edges(
+            session, {(1, 2), (2, 1)}, pipeline_ids[0]
+        )
+        assert (await session.exec(select(AddressLineageClosure))).all() == []
+
+        await db_maintain_closure_components(
+            session, {1: pipeline_ids[0], 2: pipeline_ids[1]}, {(1, 2), (2, 1)}
+        )
+        closure_records = (
+            (await session.exec(select(AddressLineageClosure))).scalars().all()
+        )
+
+    assert sorted(
+        (
+            record.source_address_id,
+            record.target_address_id,
+            record.depth,
+            record.lineage_path,
+        )
+        for record in closure_records
+    ) == [
+        (1, 1, 0, [1]),
+        (1, 2, 1, [1, 2]),
+        (2, 1, 1, [2, 1]),
+        (2, 2, 0, [2]),
+    ]
+
+
+@pytest.mark.anyio
+async def test_closure_rebuild_final_failure_alert(monkeypatch):
+    """Test the last failed closure rebuild attempt awaits its Slack alert"""
+    mock_send_slack_message = AsyncMock()
+    monkeypatch.setattr(celery_tasks, "send_slack_message", mock_send_slack_message)
+    monkeypatch.setattr(
+        celery_tasks,
+        "_run_async_address_lineage_closure_rebuild",
+        AsyncMock(side_effect=RuntimeError("closure failed")),
+    )
+    monkeypatch.setattr(
+        celery_tasks,
+        "pop_pending_closure_rebuild",
+        AsyncMock(return_value=({1: 7}, {(1, 2)})),
+    )
+    monkeypatch.setattr(celery_tasks, "restore_pending_closure_rebuild", AsyncMock())
+
+    for task, kwargs in [
+        (
+            celery_tasks.address_lineage_closure_rebuild_task,
+            {"connected_addresses": [1], "pipeline_id": 7},
+        ),
+        (celery_tasks.pending_address_lineage_closure_rebuild_task, {}),
+    ]:
+        mock_send_slack_message.reset_mock()
+        monkeypatch.setattr(task, "update_state", Mock())
+
+        def run_last_attempt():
+            # The request context is thread local, like on a worker
+            task.push_request(retries=task.max_retries)
+            try:
+                task.run(**kwargs)
+            finally:
+                task.pop_request()
+
+        with pytest.raises(RuntimeError, match="closure failed"):
+            await to_thread.run_sync(run_last_attempt)
+
+        mock_send_slack_message.assert_awaited_once()
+        assert "Rebuild Failed" in mock_send_slack_message.await_args.kwargs["title"]
+
+
+@pytest.mark.anyio
+async def test_closure_rebuild_debounce(
+    async_client: AsyncClient, mock_celery_tasks, fake_redis
+):
+    """Test lineage posts within the debounce window share one rebuild"""
+    pipeline_ids = []
+    for name in ["Pipeline 1", "Pipeline 2", "Pipeline 3"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    # A -> B, B -> C, and the unrelated X -> Y
+    for pipeline_id, source, target in zip(
+        pipeline_ids, ["A", "B", "X"], ["B", "C", "Y"]
+    ):
+        await async_client.post(
+            "/address_lineage",
+            json={
+                "pipeline_id": pipeline_id,
+                "source_addresses": [_lineage_address(source)],
+                "target_addresses": [_lineage_address(target)],
+            },
+        )
+
+    mock_celery_tasks.apply_async.assert_called_once()
+    assert not any(
+        "connected_addresses" in call.kwargs
+        for call in mock_celery_tasks.call_args_list
+    )
+
+    address_pipelines, changed_edges = await pop_pending_closure_rebuild()
+    assert address_pipelines == {
+        1: pipeline_ids[0],
+        2: pipeline_ids[1],
+        3: pipeline_ids[1],
+        4: pipeline_ids[2],
+        5: pipeline_ids[2],
+    }
+    assert changed_edges == {(1, 2), (2, 3), (4, 5)}
+    assert await pop_pending_closure_rebuild() == ({}, set())
+
+    async with AsyncSessionLocal() as session:
+        assert (
+            await db_maintain_closure_components(
+                session, address_pipelines, changed_edges
+            )
+            == 2
+        )
+        closure_records = (
+            await session.exec(
+                select(
+                    AddressLineageClosure.source_address_id,
+                    AddressLineageClosure.target_address_id,
+                    AddressLineageClosure.depth,
+                )
+            )
+        ).all()
+
+    assert sorted(closure_records) == [
+        (1, 1, 0),
+        (1, 2, 1),
+        (1, 3, 2),
+        (2, 2, 0),
+        (2, 3, 1),
+        (3, 3, 0),
+        (4, 4, 0),
+        (4, 5, 1),
+        (5, 5, 0),
+    ]
+
+    # The next post schedules a new rebuild
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[2],
+            "source_addresses": [_lineage_address("X")],
+            "target_addresses": [_lineage_address("C")],
+        },
+    )
+    assert mock_celery_tasks.apply_async.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_find_lineage_cycles():
+    """Only strongly connected components that loop are reported"""
+    edges = {(1, 2), (2, 3), (3, 1), (3, 4), (4, 5), (5, 4), (6, 6), (7, 8)}
+
+    assert find_lineage_cycles({1, 7, 9}, edges) == [[1, 2, 3], [4, 5], [6]]
+    assert find_lineage_cycles(range(100), {(i, i + 1) for i in range(99)}) == []
+
+
+@pytest.mark.anyio
+async def test_closure_table_rebuild_with_cycle(async_client: AsyncClient):
+    """Test lineage looping back on itself is rebuilt and reported"""
+    pipeline_ids = []
+    for name in ["Pipeline 1", "Pipeline 2", "Pipeline 3"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    # A -> B -> A, then B -> C
+    for pipeline_id, source, target in zip(
+        pipeline_ids, ["A", "B", "B"], ["B", "A", "C"]
+    ):
+        await async_client.post(
+            "/address_lineage",
+            json={
+                "pipeline_id": pipeline_id,
+                "source_addresses": [_lineage_address(source)],
+                "target_addresses": [_lineage_address(target)],
+            },
+        )
+
+    async with AsyncSessionLocal() as session:
+        await db_rebuild_closure_table_incremental(
+            session=session, connected_addresses={1}, pipeline_id=pipeline_ids[1]
+        )
+        closure_records = (
+            (await session.exec(select(AddressLineageClosure))).scalars().all()
+        )
+
+    assert sorted(
+        (
+            record.source_address_id,
+            record.target_address_id,
+            record.depth,
+            record.lineage_path,
+        )
+        for record in closure_records
+    ) == [
+        (1, 1, 0, [1]),
+        (1, 2, 1, [1, 2]),
+        (1, 3, 2, [1, 2, 3]),
+        (2, 1, 1, [2, 1]),
+        (2, 2, 0, [2]),
+        (2, 3, 1, [2, 3]),
+        (3, 3, 0, [3]),
+    ]
+
+    response = await async_client.get("/address_lineage/cycles")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"address_ids": [1, 2], "pipeline_ids": pipeline_ids[:2]}
+    ]
+
+
+@pytest.mark.anyio
+async def test_lineage_index_replays_changes(monkeypatch):
+    """Test replayed changes end with the index of a fresh load"""
+    index = LineageIndex(3, [1, 1, 2, 3], [2, 3, 4, 4])
+    changes = [(4, 2, 4, True), (5, 4, 5, False), (6, 2, 4, False), (7, 3, 4, True)]
+    index.apply_changes(changes)
+
+    edges = [(1, 2), (1, 3), (2, 4), (4, 5)]
+    loaded = LineageIndex(7, *zip(*edges))
+    assert index.version == 7
+    assert sorted(index.edges()) == sorted(loaded.edges()) == edges
+    for address_id in range(1, 6):
+        for upstream in (False, True):
+            assert index.traverse(address_id, upstream) == loaded.traverse(
+                address_id, upstream
+            )
+
+    assert index.traverse(1) == [(2, 1), (3, 1), (4, 2), (5, 3)]
+    assert index.traverse(5, upstream=True, max_depth=2) == [(4, 1), (2, 2)]
+    assert index.path(1, 5) == [1, 2, 4, 5]
+    assert index.path(3, 5) is None
+
+    # Past the overlay limit the changes are folded into the arrays
+    monkeypatch.setattr(src.lineage_index, "LINEAGE_INDEX_OVERLAY_LIMIT", 1)
+    index.apply_changes([(8, 3, 5, False)])
+    assert not index._removed and not any(index._added_downstream.values())
+    assert index.traverse(1) == [(2, 1), (3, 1), (4, 2), (5, 2)]
+
+
+@pytest.mark.anyio
+async def test_traverse_lineage(async_client: AsyncClient):
+    """Test traversals follow lineage changes posted after the index loaded"""
+    pipeline_ids = []
+    for name in ["Pipeline 1", "Pipeline 2"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    report = {
+        "name": "D",
+        "address_type_name": "looker",
+        "address_type_group_name": "dashboard",
+    }
+
+    # A -> B, A -> C, then B -> D, C -> D
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[0],
+            "source_addresses": [_lineage_address("A")],
+            "target_addresses": [_lineage_address("B"), _lineage_address("C")],
+        },
+    )
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[1],
+            "source_addresses": [_lineage_address("B"), _lineage_address("C")],
+            "target_addresses": [report],
+        },
+    )
+
+    response = await async_client.get("/lineage/traverse", params={"address_id": 1})
+    assert response.status_code == 200
+    assert response.json() == {
+        "address_id": 1,
+        "direction": "downstream",
+        "lineage_version": 4,
+        "addresses": [
+            {"address_id": 2, "depth": 1},
+            {"address_id": 3, "depth": 1},
+            {"address_id": 4, "depth": 2},
+        ],
+    }
+
+    response = await async_client.get(
+        "/lineage/traverse", params={"address_id": 1, "address_type_name": "Looker"}
+    )
+    assert response.json()["addresses"] == [{"address_id": 4, "depth": 2}]
+
+    response = await async_client.get(
+        "/lineage/traverse",
+        params={"address_id": 4, "direction": "upstream", "max_depth": 1},
+    )
+    assert response.json()["addresses"] == [
+        {"address_id": 2, "depth": 1},
+        {"address_id": 3, "depth": 1},
+    ]
+
+    response = await async_client.get(
+        "/lineage/path", params={"source_address_id": 1, "target_address_id": 4}
+    )
+    assert response.json()["address_ids"] == [1, 2, 4]
+
+    # Drop B -> D, the index replays the change instead of loading again
+    await async_client.post(
+        "/address_lineage",
+        json={
+            "pipeline_id": pipeline_ids[1],
+            "source_addresses": [_lineage_address("C")],
+            "target_addresses": [report],
+        },
+    )
+    index = src.lineage_index._lineage_index
+
+    response = await async_client.get(
+        "/lineage/path", params={"source_address_id": 1, "target_address_id": 4}
+    )
+    assert response.json()["lineage_version"] == 5
+    assert response.json()["address_ids"] == [1, 3, 4]
+    assert src.lineage_index._lineage_index is index
+
+    response = await async_client.get(
+        "/lineage/path", params={"source_address_id": 2, "target_address_id": 4}
+    )
+    assert response.json()["address_ids"] == []
+
+
+@pytest.mark.anyio
+async def test_full_closure_rebuild_matches_component_rebuilds(
+    async_client: AsyncClient, monkeypatch
+):
+    """Test rebuilding the whole closure on a process pool repairs every component"""
+    pipeline_ids = []
+    for name in ["Pipeline 1", "Pipeline 2", "Pipeline 3", "Pipeline 4"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"load_lineage": True, "name": name})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    # A -> B, A -> C, B -> D, C -> D, and apart from it E -> F -> E
+    for pipeline_id, sources, targets in zip(
+        pipeline_ids,
+        [["A"], ["B", "C"], ["E"], ["F"]],
+        [["B", "C"], ["D"], ["F"], ["E"]],
+    ):
+        await async_client.post(
+            "/address_lineage",
+            json={
+                "pipeline_id": pipeline_id,
+                "source_addresses": [_lineage_address(name) for name in sources],
+                "target_addresses": [_lineage_address(name) for name in targets],
+            },
+        )
+
+    closure_rows_query = text("""
+        SELECT source_address_id, target_address_id, depth, lineage_path
+        FROM address_lineage_closure
+        ORDER BY source_address_id, target_address_id, depth
+    """)
+
+    async with AsyncSessionLocal() as session:
+        for connected_addresses in [{1}, {5}]:
+            await db_rebuild_closure_table_incremental(
+                session=session,
+                connected_addresses=connected_addresses,
+                pipeline_id=pipeline_ids[0],
+            )
+        expected = (await session.exec(closure_rows_query)).all()
+
+        # Lose part of one component and add a path that does not exist
+        await session.exec(
+            text("DELETE FROM address_lineage_closure WHERE source_address_id = 1")
+        )
+        await session.exec(
+            text("""
+                INSERT INTO address_lineage_closure
+                VALUES (4, 1, 1, ARRAY[4, 1])
+            """)
+        )
+        await session.commit()
+
+        result = await db_rebuild_full_closure_table(session, max_workers=2)
+        assert (await session.exec(closure_rows_query)).all() == expected
+
+    assert result == {
+        "components": 2,
+        "closure_rows": len(expected),
+        "deleted": 1,
+        "inserted": 4,
+    }
+    # Workers hand rows back in fixed size chunks, then mark the batch done
+    monkeypatch.setattr(address_lineage_utils, "CLOSURE_REBUILD_CHUNK_ROWS", 2)
+    chunks = Queue()
+    _compute_component_closures([([1, 2, 3], [(1, 2), (2, 3)])], chunks)
+    assert [chunks.get() for _ in range(chunks.qsize())] == [
+        [(1, 1, 0, (1,)), (1, 2, 1, (1, 2))],
+        [(1, 3, 2, (1, 2, 3)), (2, 2, 0, (2,))],
+        [(2, 3, 1, (2, 3)), (3, 3, 0, (3,))],
+        None,
+    ]
+    assert _lineage_components([7], [(1, 2), (3, 2), (5, 6)]) == [
+        ([1, 2, 3], [(1, 2), (3, 2)]),
+        ([5, 6], [(5, 6)]),
+        ([7], []),
+    ]
@@ -4,9 +4,11 @@ from httpx import AsyncClient
 from sqlalchemy import select
 
 from src.database.anomaly_detection_utils import (
+    db_backfill_anomalies_for_pipelines,
     db_detect_anomalies_for_pipeline_execution,
 )
 from src.database.models.anomaly_detection import (
+    AnomalyDetectionBaselineSample,
     AnomalyDetectionResult,
     AnomalyDetectionRule,
 )
@@ -592,6 +594,7 @@ async def test_unflag_anomaly(async_client: AsyncClient, mock_anomaly_alert):
         execution = await session.get(PipelineExecution, anomalous_execution_id)
         assert execution.anomaly_flags is not None
         assert execution.anomaly_flags.get("duration_seconds", False) is True
+        assert execution.anomaly_flag_mask == 1
 
     # Now test unflagging the anomaly
     unflag_data = {
@@ -608,6 +611,7 @@ async def test_unflag_anomaly(async_client: AsyncClient, mock_anomaly_alert):
         execution = await session.get(PipelineExecution, anomalous_execution_id)
         assert execution.anomaly_flags is not None
         assert execution.anomaly_flags.get("duration_seconds", False) is False
+        assert execution.anomaly_flag_mask == 0
 
     # Verify the anomaly detection result was deleted
     async with AsyncSessionLocal() as session:
@@ -617,3 +621,347 @@ async def test_unflag_anomaly(async_client: AsyncClient, mock_anomaly_alert):
             )
         )
         assert results.scalars().all() == []
+
+
+@pytest.mark.anyio
+async def test_anomaly_detection_backfill_queues_chunks(
+    async_client: AsyncClient, mock_celery_tasks
+):
+    for i in range(1, 4):
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update({"name": f"Backfill Pipeline {i}"})
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        rule_data = TEST_ANOMALY_DETECTION_RULE_DURATION_SECONDS_POST_DATA.copy()
+        rule_data.update({"pipeline_id": response.json()["id"]})
+        await async_client.post("/anomaly_detection_rule", json=rule_data)
+
+    response = await async_client.post(
+        "/anomaly_detection_backfill",
+        json={
+            "start_date": pendulum.now("UTC").subtract(days=7).isoformat(),
+            "pipelines_per_chunk": 2,
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {"status": "queued", "pipelines": 3, "chunks": 2}
+    assert mock_celery_tasks.call_count == 2
+    assert mock_celery_tasks.call_args_list[0][1]["pipeline_ids"] == [1, 2]
+    assert mock_celery_tasks.call_args_list[1][1]["pipeline_ids"] == [3]
+
+
+@pytest.mark.anyio
+async def test_anomaly_detection_backfill_invalid_range(async_client: AsyncClient):
+    now = pendulum.now("UTC")
+    response = await async_client.post(
+        "/anomaly_detection_backfill",
+        json={
+            "start_date": now.isoformat(),
+            "end_date": now.subtract(days=1).isoformat(),
+        },
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_anomaly_detection_backfill_flags_history(
+    async_client: AsyncClient, mock_anomaly_alert
+):
+    response = await async_client.post("/pipeline", json=TEST_PIPELINE_POST_DATA)
+    pipeline_id = response.json()["id"]
+
+    # Executions are recorded before the rule exists, so nothing is scored live
+    execution_ids = []
+    for i in range(1, 7):
+        response = await async_client.post(
+            "/start_pipeline_execution", json=TEST_PIPELINE_EXECUTION_START_DATA
+        )
+        execution_ids.append(response.json()["id"])
+
+        post_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+        if i == 6:
+            end_date = pendulum.now("UTC").add(days=5)
+        else:
+            end_date = pendulum.now("UTC").add(minutes=30 + (i * 10))
+        post_data.update({"id": execution_ids[-1], "end_date": end_date.isoformat()})
+        response = await async_client.post("/end_pipeline_execution", json=post_data)
+        assert response.status_code == 204
+
+    response = await async_client.post(
+        "/anomaly_detection_rule",
+        json=TEST_ANOMALY_DETECTION_RULE_DURATION_SECONDS_POST_DATA,
+    )
+    assert response.status_code == 201
+
+    async with AsyncSessionLocal() as session:
+        summary = await db_backfill_anomalies_for_pipelines(
+            session,
+            [pipeline_id],
+            pendulum.now("UTC").subtract(days=1),
+            pendulum.now("UTC").add(days=30),
+        )
+    assert summary == {"pipelines": 1, "executions_scored": 6, "anomalies": 1}
+
+    # Backfilled anomalies are historical, no alert is sent
+    mock_anomaly_alert.assert_not_called()
+
+    async with AsyncSessionLocal() as session:
+        results = (await session.exec(select(AnomalyDetectionResult))).scalars().all()
+        assert len(results) == 1
+        assert results[0].pipeline_execution_id == execution_ids[-1]
+        assert results[0].context["execution_count"] == 5
+
+        # Dated when the execution ran, not when the backfill scored it
+        execution = await session.get(PipelineExecution, execution_ids[-1])
+        assert results[0].detected_at == execution.end_date
+        assert execution.anomaly_flags == {"duration_seconds": True}
+        assert execution.anomaly_flag_mask == 1
+
+    # Re-running the same range is idempotent
+    async with AsyncSessionLocal() as session:
+        summary = await db_backfill_anomalies_for_pipelines(
+            session,
+            [pipeline_id],
+            pendulum.now("UTC").subtract(days=1),
+            pendulum.now("UTC").add(days=30),
+        )
+    assert summary["anomalies"] == 1
+
+
+@pytest.mark.anyio
+async def test_anomaly_detection_sampled_baseline(
+    async_client: AsyncClient, mock_anomaly_alert
+):
+    response = await async_client.post("/pipeline", json=TEST_PIPELINE_POST_DATA)
+    pipeline_id = response.json()["id"]
+
+    rule_data = TEST_ANOMALY_DETECTION_RULE_DURATION_SECONDS_POST_DATA.copy()
+    rule_data.update({"baseline_sample_size": 5, "z_threshold": 3.0})
+    response = await async_client.post("/anomaly_detection_rule", json=rule_data)
+    assert response.status_code == 201
+    rule_id = response.json()["id"]
+
+    for i in range(1, 10):
+        response = await async_client.post(
+            "/start_pipeline_execution", json=TEST_PIPELINE_EXECUTION_START_DATA
+        )
+        execution_id = response.json()["id"]
+
+        post_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+        if i == 9:
+            end_date = pendulum.now("UTC").add(seconds=999999)
+        else:
+            end_date = pendulum.now("UTC").add(minutes=40 + (i % 2) * 10)
+        post_data.update({"id": execution_id, "end_date": end_date.isoformat()})
+        response = await async_client.post("/end_pipeline_execution", json=post_data)
+        assert response.status_code == 204
+
+        async with AsyncSessionLocal() as session:
+            await db_detect_anomalies_for_pipeline_execution(
+                session, pipeline_id, execution_id
+            )
+
+    mock_anomaly_alert.assert_called_once()
+
+    async with AsyncSessionLocal() as session:
+        baseline_sample = (
+            await session.exec(
+                select(AnomalyDetectionBaselineSample).where(
+                    AnomalyDetectionBaselineSample.rule_id == rule_id
+                )
+            )
+        ).scalar_one()
+        # Reservoir stays bounded, the anomaly is kept out of it
+        assert len(baseline_sample.sample) == 5
+        assert baseline_sample.seen_count == 8
+
+        result = (
+            await session.exec(
+                select(AnomalyDetectionResult).where(
+                    AnomalyDetectionResult.pipeline_execution_id == execution_id
+                )
+            )
+        ).scalar_one()
+        assert result.context["execution_count"] == 5
+        assert result.context["baseline_sample_size"] == 5
+
+    # Changing the sample size resets the reservoir
+    response = await async_client.patch(
+        "/anomaly_detection_rule", json={"id": rule_id, "baseline_sample_size": 10}
+    )
+    assert response.status_code == 200
+    async with AsyncSessionLocal() as session:
+        baseline_samples = (
+            (await session.exec(select(AnomalyDetectionBaselineSample))).scalars().all()
+        )
+        assert baseline_samples == []
+
+
+@pytest.mark.anyio
+async def test_end_pipeline_execution_cached_baseline_precheck(
+    async_client: AsyncClient, mock_celery_tasks, fake_redis
+):
+    response = await async_client.post("/pipeline", json=TEST_PIPELINE_POST_DATA)
+    pipeline_id = response.json()["id"]
+
+    response = await async_client.post(
+        "/anomaly_detection_rule",
+        json=TEST_ANOMALY_DETECTION_RULE_DURATION_SECONDS_POST_DATA,
+    )
+    rule_id = response.json()["id"]
+
+    async def end_execution(minutes):
+        response = await async_client.post(
+            "/start_pipeline_execution", json=TEST_PIPELINE_EXECUTION_START_DATA
+        )
+        execution_id = response.json()["id"]
+        post_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+        end_date = pendulum.now("UTC").add(minutes=minutes)
+        post_data.update({"id": execution_id, "end_date": end_date.isoformat()})
+        mock_celery_tasks.reset_mock()
+        response = await async_client.post("/end_pipeline_execution", json=post_data)
+        assert response.status_code == 204
+        return execution_id
+
+    # No cached baseline yet, every execution is queued
+    for i in range(1, 8):
+        execution_id = await end_execution(40 + (i % 2) * 10)
+        mock_celery_tasks.assert_called_once()
+
+    # Detection caches the threshold range for the pipeline hour
+    async with AsyncSessionLocal() as session:
+        await db_detect_anomalies_for_pipeline_execution(
+            session, pipeline_id, execution_id
+        )
+    assert len(fake_redis.store) == 1
+
+    # Normal values are settled inline
+    await end_execution(45)
+    mock_celery_tasks.assert_not_called()
+
+    # Values outside the cached range still go to the worker
+    await end_execution(600)
+    mock_celery_tasks.assert_called_once()
+
+    # Changing the rule drops the cached range
+    response = await async_client.patch(
+        "/anomaly_detection_rule", json={"id": rule_id, "z_threshold": 2.5}
+    )
+    assert response.status_code == 200
+    assert fake_redis.store == {}
+
+    await end_execution(45)
+    mock_celery_tasks.assert_called_once()
+
+    # A sampled rule keeps every execution going to the worker
+    response = await async_client.patch(
+        "/anomaly_detection_rule", json={"id": rule_id, "baseline_sample_size": 5}
+    )
+    assert response.status_code == 200
+    async with AsyncSessionLocal() as session:
+        await db_detect_anomalies_for_pipeline_execution(
+            session, pipeline_id, execution_id
+        )
+    assert fake_redis.store == {}
+
+    await end_execution(45)
+    mock_celery_tasks.assert_called_once()
+
+
+@pytest.mark.anyio
+async def test_get_anomalies_feed(async_client: AsyncClient):
+    pipeline_ids = []
+    for name in ["Feed Pipeline 1", "Feed Pipeline 2"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data["name"] = name
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    rule_ids = {}
+    for pipeline_id in pipeline_ids:
+        for rule_data in [
+            TEST_ANOMALY_DETECTION_RULE_DURATION_SECONDS_POST_DATA,
+            TEST_ANOMALY_DETECTION_RULE_INSERTS_POST_DATA,
+        ]:
+            rule_data = rule_data.copy()
+            rule_data["pipeline_id"] = pipeline_id
+            response = await async_client.post(
+                "/anomaly_detection_rule", json=rule_data
+            )
+            rule_ids[(pipeline_id, rule_data["metric_field"])] = response.json()["id"]
+
+    # Pipeline 1 gets three anomalies, pipeline 2 gets one
+    detected_at = pendulum.now("UTC").subtract(hours=1)
+    anomalies = [
+        (pipeline_ids[0], "duration_seconds"),
+        (pipeline_ids[0], "inserts"),
+        (pipeline_ids[0], "duration_seconds"),
+        (pipeline_ids[1], "inserts"),
+    ]
+    async with AsyncSessionLocal() as session:
+        for i, (pipeline_id, metric_field) in enumerate(anomalies):
+            start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+            start_data["pipeline_id"] = pipeline_id
+            response = await async_client.post(
+                "/start_pipeline_execution", json=start_data
+            )
+            session.add(
+                AnomalyDetectionResult(
+                    pipeline_execution_id=response.json()["id"],
+                    rule_id=rule_ids[(pipeline_id, metric_field)],
+                    violation_value=100,
+                    z_score=4,
+                    historical_mean=10,
+                    std_deviation_value=2,
+                    z_threshold=3,
+                    threshold_min_value=4,
+                    threshold_max_value=16,
+                    detected_at=detected_at.add(minutes=i),
+                )
+            )
+        await session.commit()
+
+    response = await async_client.get("/anomalies", params={"limit": 3})
+    assert response.status_code == 200
+    first_page = response.json()
+    assert [anomaly["pipeline_execution_id"] for anomaly in first_page["data"]] == [
+        4,
+        3,
+        2,
+    ]
+    assert first_page["data"][0]["pipeline_name"] == "feed pipeline 2"
+    assert first_page["summary"] == [
+        {
+            "pipeline_id": pipeline_ids[0],
+            "pipeline_name": "feed pipeline 1",
+            "anomalies": 3,
+        },
+        {
+            "pipeline_id": pipeline_ids[1],
+            "pipeline_name": "feed pipeline 2",
+            "anomalies": 1,
+        },
+    ]
+
+    response = await async_client.get(
+        "/anomalies", params={"limit": 3, "cursor": first_page["next_cursor"]}
+    )
+    second_page = response.json()
+    assert [anomaly["pipeline_execution_id"] for anomaly in second_page["data"]] == [1]
+    assert second_page["next_cursor"] is None
+    assert second_page["summary"] is None
+
+    response = await async_client.get(
+        "/anomalies",
+        params={"pipeline_id": pipeline_ids[0], "metric_field": "duration_seconds"},
+    )
+    filtered = response.json()
+    assert [anomaly["pipeline_execution_id"] for anomaly in filtered["data"]] == [3, 1]
+    assert filtered["summary"][0]["anomalies"] == 2
+
+    response = await async_client.get(
+        "/anomalies", params={"start_date": detected_at.add(minutes=2).isoformat()}
+    )
+    assert len(response.json()["data"]) == 2
+
+    response = await async_client.get("/anomalies", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
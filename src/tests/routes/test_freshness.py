@@ -1,13 +1,38 @@
 import pendulum
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
 from sqlmodel import Session
 
-from src.database.freshness_utils import db_check_pipeline_freshness
+from src.celery_tasks import _seed_freshness_deadlines
+from src.database.address_lineage_utils import db_rebuild_closure_table_incremental
+from src.database.freshness_utils import (
+    db_check_pipeline_freshness,
+    db_check_pipeline_freshness_deadlines,
+    db_check_pipeline_freshness_shard,
+    db_complete_pipeline_freshness_shards,
+    db_refresh_pipeline_freshness_deadlines,
+)
+from src.database.models.address import Address
+from src.database.models.freshness_pipeline_log import (
+    FreshnessPipelineImpact,
+    FreshnessPipelineLog,
+)
 from src.database.models.pipeline import Pipeline
 from src.database.models.pipeline_type import PipelineType
+from src.freshness_deadlines import (
+    FRESHNESS_DEADLINES_KEY,
+    pop_expired_freshness_deadlines,
+)
 from src.tests.conftest import AsyncSessionLocal
-from src.tests.fixtures.pipeline import TEST_PIPELINE_FRESHNESS_DATA
+from src.tests.fixtures.pipeline import (
+    TEST_PIPELINE_FRESHNESS_DATA,
+    TEST_PIPELINE_POST_DATA,
+)
+from src.tests.fixtures.pipeline_execution import (
+    TEST_PIPELINE_EXECUTION_END_DATA,
+    TEST_PIPELINE_EXECUTION_START_DATA,
+)
 from src.tests.fixtures.pipeline_type import TEST_PIPELINE_TYPE_POST_DATA
 
 
@@ -96,6 +121,10 @@ async def test_pipeline_freshness_check_failure(
     )
 
     db_session.add(pipeline)
+    await db_session.flush()
+    await db_refresh_pipeline_freshness_deadlines(
+        db_session, pipeline_ids=[pipeline.id]
+    )
     await db_session.commit()
 
     async with AsyncSessionLocal() as session:
@@ -105,3 +134,281 @@ async def test_pipeline_freshness_check_failure(
     call_args = mock_slack_notifications.call_args
     assert "Pipeline Freshness Check" in call_args[1]["message"]
     assert "Late Pipeline" in call_args[1]["details"]["Failed Pipelines"]
+
+    # Already logged failures are not inserted or alerted on again
+    mock_slack_notifications.reset_mock()
+    async with AsyncSessionLocal() as session:
+        result = await db_check_pipeline_freshness(session)
+    assert result == {"status": "warning"}
+    mock_slack_notifications.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_freshness_sharded_check(db_session: Session, mock_slack_notifications):
+    """Test shards only find stale pipelines and the callback logs and alerts"""
+    pipeline_type = PipelineType(name="audit", group_name="databricks")
+    db_session.add(pipeline_type)
+    await db_session.flush()
+
+    twelve_hours_ago = pendulum.now("UTC").subtract(hours=12)
+    for name in ("Sharded Pipeline A", "Sharded Pipeline B"):
+        db_session.add(
+            Pipeline(
+                name=name,
+                pipeline_type_id=pipeline_type.id,
+                last_target_insert=twelve_hours_ago,
+                freshness_number=1,
+                freshness_datepart="hour",
+                input_hash="test_hash",
+            )
+        )
+    await db_session.flush()
+    await db_refresh_pipeline_freshness_deadlines(db_session)
+    await db_session.commit()
+
+    shard_results = []
+    for shard in range(2):
+        async with AsyncSessionLocal() as session:
+            shard_results.append(
+                await db_check_pipeline_freshness_shard(session, shard, 2)
+            )
+
+    # Nothing is logged until the callback can alert on it too
+    assert [len(result["fail_results"]) for result in shard_results] == [1, 1]
+    mock_slack_notifications.assert_not_called()
+    async with AsyncSessionLocal() as session:
+        assert (await session.exec(select(FreshnessPipelineLog.id))).all() == []
+
+    async with AsyncSessionLocal() as session:
+        result = await db_complete_pipeline_freshness_shards(session, shard_results)
+    assert result == {"status": "warning"}
+    mock_slack_notifications.assert_called_once()
+    assert "2 NEW pipeline(s)" in mock_slack_notifications.call_args[1]["message"]
+
+    async with AsyncSessionLocal() as session:
+        assert len((await session.exec(select(FreshnessPipelineLog.id))).all()) == 2
+
+
+@pytest.mark.anyio
+async def test_freshness_deadline_maintained(
+    async_client: AsyncClient, mock_slack_notifications
+):
+    """Test freshness_deadline follows DML and mute changes"""
+    pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+    pipeline_data.update({"freshness_number": 1, "freshness_datepart": "hour"})
+    response = await async_client.post("/pipeline", json=pipeline_data)
+    assert response.status_code == 201
+    pipeline_id = response.json()["id"]
+
+    # No DML yet, so nothing to check
+    async with AsyncSessionLocal() as session:
+        pipeline = await session.get(Pipeline, pipeline_id)
+        assert pipeline.freshness_deadline is None
+
+    end_date = pendulum.now("UTC").subtract(hours=2)
+    start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+    start_data.update({"start_date": end_date.subtract(minutes=5).isoformat()})
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+    assert response.status_code == 201
+
+    end_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+    end_data.update({"id": response.json()["id"], "end_date": end_date.isoformat()})
+    response = await async_client.post("/end_pipeline_execution", json=end_data)
+    assert response.status_code == 204
+
+    async with AsyncSessionLocal() as session:
+        pipeline = await session.get(Pipeline, pipeline_id)
+        assert pipeline.freshness_deadline == end_date.add(hours=1)
+
+    async with AsyncSessionLocal() as session:
+        await db_check_pipeline_freshness(session)
+    mock_slack_notifications.assert_called_once()
+    assert (
+        "test pipeline 1"
+        in (mock_slack_notifications.call_args[1]["details"]["Failed Pipelines"])
+    )
+
+    # Muting the pipeline type clears the deadline of its pipelines
+    response = await async_client.patch(
+        "/pipeline_type",
+        json={"id": pipeline.pipeline_type_id, "mute_freshness_check": True},
+    )
+    assert response.status_code == 200
+
+    async with AsyncSessionLocal() as session:
+        pipeline = await session.get(Pipeline, pipeline_id)
+        assert pipeline.freshness_deadline is None
+
+
+@pytest.mark.anyio
+async def test_freshness_deadline_scheduling(
+    async_client: AsyncClient, fake_redis, mock_slack_notifications
+):
+    pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+    pipeline_data.update({"freshness_number": 1, "freshness_datepart": "hour"})
+    response = await async_client.post("/pipeline", json=pipeline_data)
+    pipeline_id = response.json()["id"]
+
+    stale_end = pendulum.now("UTC").subtract(hours=2)
+    start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+    start_data.update({"start_date": stale_end.subtract(minutes=5).isoformat()})
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+
+    end_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+    end_data.update({"id": response.json()["id"], "end_date": stale_end.isoformat()})
+    await async_client.post("/end_pipeline_execution", json=end_data)
+
+    deadlines = fake_redis.store[FRESHNESS_DEADLINES_KEY]
+    assert deadlines[str(pipeline_id)] == stale_end.add(hours=1).timestamp()
+
+    # Only the expired deadline is claimed, and only once
+    assert await pop_expired_freshness_deadlines(pendulum.now("UTC")) == [pipeline_id]
+    assert await pop_expired_freshness_deadlines(pendulum.now("UTC")) == []
+
+    async with AsyncSessionLocal() as session:
+        result = await db_check_pipeline_freshness_deadlines(session, [pipeline_id])
+    assert result == {"status": "warning"}
+    mock_slack_notifications.assert_called_once()
+
+    # A longer interval moves the deadline, muting drops it
+    response = await async_client.patch(
+        "/pipeline", json={"id": pipeline_id, "freshness_number": 3}
+    )
+    assert response.status_code == 200
+    assert deadlines[str(pipeline_id)] == stale_end.add(hours=3).timestamp()
+
+    response = await async_client.patch(
+        "/pipeline", json={"id": pipeline_id, "mute_freshness_check": True}
+    )
+    assert response.status_code == 200
+    assert str(pipeline_id) not in deadlines
+
+
+@pytest.mark.anyio
+async def test_freshness_deadline_post_pipeline_and_seed(
+    async_client: AsyncClient, fake_redis
+):
+    """Test POST /pipeline syncs a changed deadline and the scheduled check
+    registers deadlines that never reached Redis"""
+    pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+    pipeline_data.update({"freshness_number": 1, "freshness_datepart": "hour"})
+    response = await async_client.post("/pipeline", json=pipeline_data)
+    pipeline_id = response.json()["id"]
+    assert "freshness_changed" not in response.json()
+
+    end_date = pendulum.now("UTC").subtract(minutes=10)
+    start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+    start_data.update({"start_date": end_date.subtract(minutes=5).isoformat()})
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+
+    end_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+    end_data.update({"id": response.json()["id"], "end_date": end_date.isoformat()})
+    await async_client.post("/end_pipeline_execution", json=end_data)
+
+    deadlines = fake_redis.store[FRESHNESS_DEADLINES_KEY]
+    assert deadlines[str(pipeline_id)] == end_date.add(hours=1).timestamp()
+
+    # A changed pipeline definition moves the deadline in Redis too
+    pipeline_data.update({"freshness_number": 3})
+    response = await async_client.post("/pipeline", json=pipeline_data)
+    assert response.status_code == 200
+    assert deadlines[str(pipeline_id)] == end_date.add(hours=3).timestamp()
+
+    # Deadlines missing from Redis are registered again by the scheduled check
+    deadlines.clear()
+    async with AsyncSessionLocal() as session:
+        await _seed_freshness_deadlines(session)
+    assert fake_redis.store[FRESHNESS_DEADLINES_KEY] == {
+        str(pipeline_id): end_date.add(hours=3).timestamp()
+    }
+
+
+@pytest.mark.anyio
+async def test_freshness_downstream_impact(
+    async_client: AsyncClient, mock_slack_notifications
+):
+    """Test a stale pipeline flags every address and pipeline downstream of it"""
+    pipeline_ids = []
+    for name in ["Raw Orders", "Orders Model", "Orders Report"]:
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update(
+            {"name": name, "freshness_number": 1, "freshness_datepart": "hour"}
+        )
+        response = await async_client.post("/pipeline", json=pipeline_data)
+        pipeline_ids.append(response.json()["id"])
+
+    # raw_orders -> orders -> orders_model -> orders_report
+    address_names = ["Raw Orders", "Orders", "Orders Model", "Orders Report"]
+    for pipeline_id, source_name, target_name in zip(
+        pipeline_ids, address_names, address_names[1:]
+    ):
+        response = await async_client.post(
+            "/address_lineage",
+            json={
+                "pipeline_id": pipeline_id,
+                "source_addresses": [
+                    {
+                        "name": source_name,
+                        "address_type_name": "databricks",
+                        "address_type_group_name": "database",
+                    }
+                ],
+                "target_addresses": [
+                    {
+                        "name": target_name,
+                        "address_type_name": "databricks",
+                        "address_type_group_name": "database",
+                    }
+                ],
+            },
+        )
+        assert response.status_code == 201
+
+    async with AsyncSessionLocal() as session:
+        address_ids = set((await session.exec(select(Address.id))).scalars().all())
+        await db_rebuild_closure_table_incremental(
+            session, address_ids, pipeline_ids[0]
+        )
+
+    # Only the first pipeline goes stale
+    end_date = pendulum.now("UTC").subtract(hours=2)
+    start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+    start_data.update(
+        {
+            "pipeline_id": pipeline_ids[0],
+            "start_date": end_date.subtract(minutes=5).isoformat(),
+        }
+    )
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+    end_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+    end_data.update({"id": response.json()["id"], "end_date": end_date.isoformat()})
+    await async_client.post("/end_pipeline_execution", json=end_data)
+
+    async with AsyncSessionLocal() as session:
+        await db_check_pipeline_freshness(session)
+
+    mock_slack_notifications.assert_called_once()
+    impact_details = mock_slack_notifications.call_args[1]["details"][
+        "Downstream Impact"
+    ]
+    assert "raw orders: 3 address(es), 2 downstream pipeline(s)" in impact_details
+    assert "(orders model, orders report)" in impact_details
+
+    async with AsyncSessionLocal() as session:
+        impacts = (
+            (
+                await session.exec(
+                    select(FreshnessPipelineImpact).order_by(
+                        FreshnessPipelineImpact.depth
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+    assert [impact.depth for impact in impacts] == [0, 1, 2]
+    assert [impact.downstream_pipeline_ids for impact in impacts] == [
+        [pipeline_ids[1]],
+        [pipeline_ids[2]],
+        [],
+    ]
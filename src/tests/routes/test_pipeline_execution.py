@@ -1,3 +1,4 @@
+import pendulum
 import pytest
 from httpx import AsyncClient
 from sqlmodel import select
@@ -6,6 +7,11 @@ from src.database.models.pipeline_execution import PipelineExecutionClosure
 from src.database.pipeline_execution_utils import (
     db_maintain_pipeline_execution_closure_table,
 )
+from src.running_executions import (
+    RUNNING_EXECUTIONS_KEY,
+    reconcile_running_executions,
+)
+from src.settings import config
 from src.tests.conftest import AsyncSessionLocal
 from src.tests.fixtures.pipeline import TEST_PIPELINE_POST_DATA
 from src.tests.fixtures.pipeline_execution import (
@@ -186,3 +192,162 @@ async def test_get_pipeline_execution(async_client: AsyncClient):
     assert data["id"] == child_id
     assert data["parent_id"] == parent_id
     assert data["child_executions"] == []
+
+
+async def _start_running_executions(async_client: AsyncClient) -> tuple[int, int]:
+    """Start a stale execution and a recent one, ending a third"""
+    response = await async_client.post("/pipeline", json=TEST_PIPELINE_POST_DATA)
+    pipeline_id = response.json()["id"]
+
+    start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+    start_data.update(
+        {
+            "pipeline_id": pipeline_id,
+            "start_date": pendulum.now("UTC").subtract(days=2).isoformat(),
+        }
+    )
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+    stale_id = response.json()["id"]
+
+    start_data["start_date"] = pendulum.now("UTC").subtract(minutes=5).isoformat()
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+    recent_id = response.json()["id"]
+
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+    end_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+    end_data["id"] = response.json()["id"]
+    await async_client.post("/end_pipeline_execution", json=end_data)
+
+    return stale_id, recent_id
+
+
+@pytest.mark.anyio
+async def test_running_and_stale_pipeline_executions(async_client: AsyncClient):
+    stale_id, recent_id = await _start_running_executions(async_client)
+
+    response = await async_client.get("/pipeline_execution/running")
+    assert response.status_code == 200
+    data = response.json()
+    assert [execution["id"] for execution in data] == [stale_id, recent_id]
+    assert data[0]["running_seconds"] >= 2 * 24 * 60 * 60
+
+    response = await async_client.get(
+        "/pipeline_execution/running", params={"stale_after_minutes": 60}
+    )
+    assert [execution["id"] for execution in response.json()] == [stale_id]
+
+    response = await async_client.get(
+        "/pipeline_execution/running", params={"pipeline_id": 999}
+    )
+    assert response.json() == []
+
+    response = await async_client.post(
+        "/pipeline_execution/close_stale", json={"stale_after_minutes": 60}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"closed_ids": [stale_id]}
+
+    response = await async_client.get(f"/pipeline_execution/{stale_id}")
+    closed = response.json()
+    assert closed["end_date"] is not None
+    assert closed["completed_successfully"] is False
+    assert closed["duration_seconds"] >= 2 * 24 * 60 * 60
+
+    response = await async_client.get("/pipeline_execution/running")
+    assert [execution["id"] for execution in response.json()] == [recent_id]
+
+
+@pytest.mark.anyio
+async def test_running_pipeline_executions_mirror_seed_and_reconcile(
+    async_client: AsyncClient, fake_redis, monkeypatch
+):
+    """Test executions missing from the mirror are seeded and ended ones dropped"""
+    # Started before the mirror was enabled
+    stale_id, recent_id = await _start_running_executions(async_client)
+    monkeypatch.setattr(config, "WATCHER_RUNNING_EXECUTIONS_MIRROR", True)
+    assert RUNNING_EXECUTIONS_KEY not in fake_redis.store
+
+    # Unseeded, so served from the database and seeded for the next reads
+    response = await async_client.get(
+        "/pipeline_execution/running", params={"stale_after_minutes": 60}
+    )
+    assert [execution["id"] for execution in response.json()] == [stale_id]
+    assert set(fake_redis.store[RUNNING_EXECUTIONS_KEY]) == {
+        str(stale_id),
+        str(recent_id),
+    }
+
+    # Ended while its removal from the mirror failed
+    monkeypatch.setattr(config, "WATCHER_RUNNING_EXECUTIONS_MIRROR", False)
+    end_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+    end_data["id"] = recent_id
+    await async_client.post("/end_pipeline_execution", json=end_data)
+    monkeypatch.setattr(config, "WATCHER_RUNNING_EXECUTIONS_MIRROR", True)
+
+    async with AsyncSessionLocal() as session:
+        await reconcile_running_executions(session)
+
+    assert set(fake_redis.store[RUNNING_EXECUTIONS_KEY]) == {str(stale_id)}
+    response = await async_client.get("/pipeline_execution/running")
+    assert [execution["id"] for execution in response.json()] == [stale_id]
+
+
+@pytest.mark.anyio
+async def test_running_pipeline_executions_mirror(
+    async_client: AsyncClient, fake_redis, monkeypatch
+):
+    monkeypatch.setattr(config, "WATCHER_RUNNING_EXECUTIONS_MIRROR", True)
+    stale_id, recent_id = await _start_running_executions(async_client)
+
+    assert set(fake_redis.store[RUNNING_EXECUTIONS_KEY]) == {
+        str(stale_id),
+        str(recent_id),
+    }
+
+    response = await async_client.get(
+        "/pipeline_execution/running", params={"stale_after_minutes": 60}
+    )
+    assert [execution["id"] for execution in response.json()] == [stale_id]
+
+    await async_client.post(
+        "/pipeline_execution/close_stale", json={"stale_after_minutes": 60}
+    )
+    assert set(fake_redis.store[RUNNING_EXECUTIONS_KEY]) == {str(recent_id)}
+
+    response = await async_client.get("/pipeline_execution/running")
+    assert [execution["id"] for execution in response.json()] == [recent_id]
+
+
+@pytest.mark.anyio
+async def test_running_pipeline_executions_mirror_seed_and_reconcile(
+    async_client: AsyncClient, fake_redis, monkeypatch
+):
+    """Test executions missing from the mirror are seeded and ended ones dropped"""
+    # Started before the mirror was enabled
+    stale_id, recent_id = await _start_running_executions(async_client)
+    monkeypatch.setattr(config, "WATCHER_RUNNING_EXECUTIONS_MIRROR", True)
+    assert RUNNING_EXECUTIONS_KEY not in fake_redis.store
+
+    # Unseeded, so served from the database and seeded for the next reads
+    response = await async_client.get(
+        "/pipeline_execution/running", params={"stale_after_minutes": 60}
+    )
+    assert [execution["id"] for execution in response.json()] == [stale_id]
+    assert set(fake_redis.store[RUNNING_EXECUTIONS_KEY]) == {
+        str(stale_id),
+        str(recent_id),
+    }
+
+    # Ended while its removal from the mirror failed
+    monkeypatch.setattr(config, "WATCHER_RUNNING_EXECUTIONS_MIRROR", False)
+    end_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+    end_data["id"] = recent_id
+    await async_client.post("/end_pipeline_execution", json=end_data)
+    monkeypatch.setattr(config, "WATCHER_RUNNING_EXECUTIONS_MIRROR", True)
+
+    async with AsyncSessionLocal() as session:
+        await reconcile_running_executions(session)
+
+    assert set(fake_redis.store[RUNNING_EXECUTIONS_KEY]) == {str(stale_id)}
+    response = await async_client.get("/pipeline_execution/running")
+    assert [execution["id"] for execution in response.json()] == [stale_id]
@@ -1,8 +1,21 @@
+from unittest.mock import MagicMock
+
 import pendulum
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
 
-from src.database.timeliness_utils import db_check_pipeline_execution_timeliness
+from src.database import timeliness_utils
+from src.database.models.monitor_high_water_mark import MonitorHighWaterMark
+from src.database.models.timeliness_pipeline_execution_log import (
+    TimelinessPipelineExecutionLog,
+)
+from src.database.timeliness_utils import (
+    db_check_pipeline_execution_timeliness,
+    db_check_pipeline_execution_timeliness_deadlines,
+    db_check_pipeline_execution_timeliness_shard,
+    db_complete_pipeline_execution_timeliness_shards,
+)
 from src.tests.conftest import AsyncSessionLocal
 from src.tests.fixtures.pipeline import (
     TEST_PIPELINE_POST_DATA,
@@ -11,6 +24,10 @@ from src.tests.fixtures.pipeline_execution import (
     TEST_PIPELINE_EXECUTION_END_DATA,
     TEST_PIPELINE_EXECUTION_START_DATA,
 )
+from src.timeliness_deadlines import (
+    TIMELINESS_DEADLINES_KEY,
+    pop_expired_timeliness_deadlines,
+)
 
 
 @pytest.mark.anyio
@@ -56,3 +73,313 @@ async def test_timeliness_pipeline_execution_failure(
     call_args = mock_slack_notifications.call_args
     assert "Pipeline Execution Timeliness Check" in call_args[1]["message"]
     assert "Failed Executions" in call_args[1]["details"]
+
+
+@pytest.mark.anyio
+async def test_timeliness_pipeline_type_fallback(
+    async_client: AsyncClient, mock_slack_notifications
+):
+    # Pipeline has no timeliness settings of its own, the type's 5 minutes apply
+    response = await async_client.post(
+        "/pipeline_type",
+        json={
+            "name": "extraction",
+            "timeliness_number": 5,
+            "timeliness_datepart": "minute",
+        },
+    )
+    assert response.status_code == 201
+    response = await async_client.post("/pipeline", json=TEST_PIPELINE_POST_DATA)
+    pipeline_id = response.json()["id"]
+
+    async def start_execution(minutes_ago):
+        start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+        start_data.update(
+            {
+                "pipeline_id": pipeline_id,
+                "start_date": pendulum.now("UTC")
+                .subtract(minutes=minutes_ago)
+                .isoformat(),
+            }
+        )
+        response = await async_client.post("/start_pipeline_execution", json=start_data)
+        return response.json()["id"]
+
+    async def end_execution(execution_id, completed_successfully=True):
+        post_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+        post_data.update(
+            {
+                "id": execution_id,
+                "end_date": pendulum.now("UTC").isoformat(),
+                "completed_successfully": completed_successfully,
+            }
+        )
+        response = await async_client.post("/end_pipeline_execution", json=post_data)
+        assert response.status_code == 204
+
+    # Running past the threshold
+    running_id = await start_execution(20)
+    # Completed within the threshold
+    await end_execution(await start_execution(2))
+    # Completed late
+    late_id = await start_execution(10)
+    await end_execution(late_id)
+    # Failed executions are not timeliness failures
+    await end_execution(await start_execution(30), completed_successfully=False)
+    # Still running within the threshold
+    await start_execution(1)
+
+    async with AsyncSessionLocal() as session:
+        result = await db_check_pipeline_execution_timeliness(session, None, 60)
+    assert result == {"status": "warning"}
+
+    async with AsyncSessionLocal() as session:
+        logs = (
+            (
+                await session.exec(
+                    select(TimelinessPipelineExecutionLog).order_by(
+                        TimelinessPipelineExecutionLog.pipeline_execution_id
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+    assert [
+        (log.pipeline_execution_id, log.execution_status, log.used_child_config)
+        for log in logs
+    ] == [(running_id, "running", False), (late_id, "completed", False)]
+    assert all(log.seconds_threshold == 300 for log in logs)
+    assert logs[0].duration_seconds >= 1200
+
+    mock_slack_notifications.assert_called_once()
+
+
+@pytest.mark.anyio
+async def test_timeliness_running_beyond_lookback(
+    async_client: AsyncClient, mock_slack_notifications
+):
+    pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+    pipeline_data.update({"timeliness_number": 2, "timeliness_datepart": "hour"})
+    response = await async_client.post("/pipeline", json=pipeline_data)
+    pipeline_id = response.json()["id"]
+
+    # Started before the 60 minute lookback and still running past 2 hours
+    start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+    start_data.update(
+        {
+            "pipeline_id": pipeline_id,
+            "start_date": pendulum.now("UTC").subtract(hours=3).isoformat(),
+        }
+    )
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+    running_id = response.json()["id"]
+
+    async with AsyncSessionLocal() as session:
+        result = await db_check_pipeline_execution_timeliness(session, None, 60)
+    assert result == {"status": "warning"}
+    mock_slack_notifications.assert_called_once()
+
+    async with AsyncSessionLocal() as session:
+        log = await session.get(TimelinessPipelineExecutionLog, running_id)
+        assert log.execution_status == "running"
+        high_water_mark = await session.get(MonitorHighWaterMark, "timeliness")
+        assert high_water_mark is not None
+
+    # Already logged executions are not evaluated again
+    mock_slack_notifications.reset_mock()
+    async with AsyncSessionLocal() as session:
+        result = await db_check_pipeline_execution_timeliness(session, None, 60)
+    assert result == {"status": "success"}
+    mock_slack_notifications.assert_not_called()
+
+    async with AsyncSessionLocal() as session:
+        assert (
+            await session.get(MonitorHighWaterMark, "timeliness")
+        ).high_water_mark > high_water_mark.high_water_mark
+
+
+@pytest.mark.anyio
+async def test_timeliness_running_without_settings_skipped_once(
+    async_client: AsyncClient, monkeypatch
+):
+    """Test a never closed execution without timeliness settings is only
+    reported as skipped by the first check that sees it"""
+    response = await async_client.post("/pipeline", json=TEST_PIPELINE_POST_DATA)
+
+    start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+    start_data.update(
+        {
+            "pipeline_id": response.json()["id"],
+            "start_date": pendulum.now("UTC").subtract(minutes=5).isoformat(),
+        }
+    )
+    await async_client.post("/start_pipeline_execution", json=start_data)
+
+    mock_logger = MagicMock()
+    monkeypatch.setattr(timeliness_utils, "logger", mock_logger)
+    for _ in range(2):
+        async with AsyncSessionLocal() as session:
+            result = await db_check_pipeline_execution_timeliness(session, None, 60)
+        assert result == {"status": "success"}
+
+    skipped_warnings = [
+        call
+        for call in mock_logger.warning.call_args_list
+        if "incomplete timely settings" in call.args[0]
+    ]
+    assert len(skipped_warnings) == 1
+
+
+@pytest.mark.anyio
+async def test_timeliness_deadline_scheduling(
+    async_client: AsyncClient, fake_redis, mock_slack_notifications
+):
+    pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+    pipeline_data.update({"timeliness_number": 2, "timeliness_datepart": "hour"})
+    response = await async_client.post("/pipeline", json=pipeline_data)
+    pipeline_id = response.json()["id"]
+
+    overdue_start = pendulum.now("UTC").subtract(hours=3)
+    start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+    start_data.update(
+        {"pipeline_id": pipeline_id, "start_date": overdue_start.isoformat()}
+    )
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+    overdue_id = response.json()["id"]
+
+    start_data["start_date"] = pendulum.now("UTC").isoformat()
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+    pending_id = response.json()["id"]
+
+    response = await async_client.post("/start_pipeline_execution", json=start_data)
+    ended_id = response.json()["id"]
+
+    deadlines = fake_redis.store[TIMELINESS_DEADLINES_KEY]
+    assert deadlines[str(overdue_id)] == overdue_start.add(hours=2).timestamp()
+    assert str(ended_id) in deadlines
+
+    # Ending before the deadline cancels it
+    end_data = TEST_PIPELINE_EXECUTION_END_DATA.copy()
+    end_data.update({"id": ended_id, "end_date": pendulum.now("UTC").isoformat()})
+    await async_client.post("/end_pipeline_execution", json=end_data)
+    assert str(ended_id) not in deadlines
+
+    # Only the expired deadline is claimed, and only once
+    assert await pop_expired_timeliness_deadlines(pendulum.now("UTC")) == [overdue_id]
+    assert await pop_expired_timeliness_deadlines(pendulum.now("UTC")) == []
+    assert list(deadlines) == [str(pending_id)]
+
+    async with AsyncSessionLocal() as session:
+        result = await db_check_pipeline_execution_timeliness_deadlines(
+            session, [overdue_id]
+        )
+    assert result == {"status": "warning"}
+    mock_slack_notifications.assert_called_once()
+
+    async with AsyncSessionLocal() as session:
+        log = await session.get(TimelinessPipelineExecutionLog, overdue_id)
+        assert log.execution_status == "running"
+
+
+@pytest.mark.anyio
+async def test_timeliness_log_written_in_batches(
+    async_client: AsyncClient, mock_slack_notifications, monkeypatch
+):
+    monkeypatch.setattr("src.database.db.LOG_WRITE_BATCH_SIZE", 2)
+
+    pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+    pipeline_data.update({"timeliness_number": 1, "timeliness_datepart": "hour"})
+    response = await async_client.post("/pipeline", json=pipeline_data)
+    pipeline_id = response.json()["id"]
+
+    start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+    start_data.update(
+        {
+            "pipeline_id": pipeline_id,
+            "start_date": pendulum.now("UTC").subtract(hours=3).isoformat(),
+        }
+    )
+    execution_ids = []
+    for _ in range(5):
+        response = await async_client.post("/start_pipeline_execution", json=start_data)
+        execution_ids.append(response.json()["id"])
+
+    async with AsyncSessionLocal() as session:
+        result = await db_check_pipeline_execution_timeliness_deadlines(
+            session, execution_ids
+        )
+    assert result == {"status": "warning"}
+    assert "5 new execution(s)" in mock_slack_notifications.call_args[1]["message"]
+
+    async with AsyncSessionLocal() as session:
+        logged = (
+            (
+                await session.exec(
+                    select(TimelinessPipelineExecutionLog.pipeline_execution_id)
+                )
+            )
+            .scalars()
+            .all()
+        )
+    assert sorted(logged) == execution_ids
+
+
+@pytest.mark.anyio
+async def test_timeliness_sharded_check(
+    async_client: AsyncClient, mock_slack_notifications
+):
+    execution_ids = []
+    for name in ("sharded pipeline a", "sharded pipeline b"):
+        pipeline_data = TEST_PIPELINE_POST_DATA.copy()
+        pipeline_data.update(
+            {"name": name, "timeliness_number": 1, "timeliness_datepart": "hour"}
+        )
+        response = await async_client.post("/pipeline", json=pipeline_data)
+
+        start_data = TEST_PIPELINE_EXECUTION_START_DATA.copy()
+        start_data.update(
+            {
+                "pipeline_id": response.json()["id"],
+                "start_date": pendulum.now("UTC").subtract(hours=3).isoformat(),
+            }
+        )
+        response = await async_client.post("/start_pipeline_execution", json=start_data)
+        execution_ids.append(response.json()["id"])
+
+    now_time = pendulum.now("UTC")
+    shard_results = []
+    for shard in range(2):
+        async with AsyncSessionLocal() as session:
+            shard_results.append(
+                await db_check_pipeline_execution_timeliness_shard(
+                    session, shard, 2, 60, now_time
+                )
+            )
+
+    # Pipelines 1 and 2 land in different shards and nothing is logged or
+    # alerted yet, so a callback that never runs loses no alert
+    assert [len(result["fail_results"]) for result in shard_results] == [1, 1]
+    mock_slack_notifications.assert_not_called()
+    async with AsyncSessionLocal() as session:
+        assert await session.get(MonitorHighWaterMark, "timeliness") is None
+        assert (
+            await session.exec(
+                select(TimelinessPipelineExecutionLog.pipeline_execution_id)
+            )
+        ).all() == []
+
+    async with AsyncSessionLocal() as session:
+        result = await db_complete_pipeline_execution_timeliness_shards(
+            session, shard_results, now_time
+        )
+    assert result == {"status": "warning"}
+    mock_slack_notifications.assert_called_once()
+    call_args = mock_slack_notifications.call_args
+    assert "2 new execution(s)" in call_args[1]["message"]
+    assert "sharded pipeline a" in call_args[1]["details"]["Failed Executions"]
+    assert "sharded pipeline b" in call_args[1]["details"]["Failed Executions"]
+
+    async with AsyncSessionLocal() as session:
+        high_water_mark = await session.get(MonitorHighWaterMark, "timeliness")
+        assert high_water_mark.high_water_mark == now_time
@@ -0,0 +1,52 @@
+import pendulum
+import structlog
+
+from src.redis_client import get_redis_client, pop_expired_members
+from src.settings import config
+
+logger = structlog.get_logger(__name__)
+
+TIMELINESS_DEADLINES_KEY = "watcher:timeliness_deadlines"
+
+
+def timeliness_deadlines_enabled() -> bool:
+    return bool(config.REDIS_URL) and bool(
+        config.WATCHER_TIMELINESS_DEADLINE_CHECK_SECONDS
+    )
+
+
+async def schedule_timeliness_deadline(
+    pipeline_execution_id: int, deadline: pendulum.DateTime
+) -> None:
+    """Register when a running execution becomes overdue"""
+    try:
+        await get_redis_client().zadd(
+            TIMELINESS_DEADLINES_KEY,
+            {str(pipeline_execution_id): deadline.timestamp()},
+        )
+    except Exception as e:
+        logger.warning(
+            f"Error scheduling timeliness deadline for execution {pipeline_execution_id}: {e}"
+        )
+
+
+async def cancel_timeliness_deadline(pipeline_execution_id: int) -> None:
+    """Drop the deadline of an execution that ended first"""
+    try:
+        await get_redis_client().zrem(
+            TIMELINESS_DEADLINES_KEY, str(pipeline_execution_id)
+        )
+    except Exception as e:
+        logger.warning(
+            f"Error cancelling timeliness deadline for execution {pipeline_execution_id}: {e}"
+        )
+
+
+async def pop_expired_timeliness_deadlines(now: pendulum.DateTime) -> list[int]:
+    """Claim every execution deadline at or before now"""
+    return [
+        int(member)
+        for member in await pop_expired_members(
+            TIMELINESS_DEADLINES_KEY, now.timestamp()
+        )
+    ]
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
 
 import orjson
 from fastapi.responses import JSONResponse
@@ -24,6 +24,31 @@ class AnomalyMetricFieldEnum(str, Enum):
     THROUGHPUT = "throughput"
 
 
+class LineageDirectionEnum(str, Enum):
+    UPSTREAM = "upstream"
+    DOWNSTREAM = "downstream"
+
+
+# Bit per metric in pipeline_execution.anomaly_flag_mask, never renumber
+ANOMALY_METRIC_FLAG_BITS = {
+    AnomalyMetricFieldEnum.DURATION_SECONDS: 1 << 0,
+    AnomalyMetricFieldEnum.INSERTS: 1 << 1,
+    AnomalyMetricFieldEnum.UPDATES: 1 << 2,
+    AnomalyMetricFieldEnum.SOFT_DELETES: 1 << 3,
+    AnomalyMetricFieldEnum.TOTAL_ROWS: 1 << 4,
+    AnomalyMetricFieldEnum.THROUGHPUT: 1 << 5,
+}
+
+
+def anomaly_flags_to_mask(anomaly_flags: Optional[dict]) -> int:
+    """Convert the anomaly_flags JSONB dict to its anomaly_flag_mask bitmask"""
+    mask = 0
+    for metric, flagged in (anomaly_flags or {}).items():
+        if flagged is True:
+            mask |= ANOMALY_METRIC_FLAG_BITS[AnomalyMetricFieldEnum(metric)]
+    return mask
+
+
 class ValidatorModel(BaseModel):
     @model_validator(mode="before")
     def lowercase_strings(cls, values: dict) -> dict: